@@ -13,12 +13,20 @@ def create_app():
     app = Flask(__name__, template_folder=template_dir, static_folder=static_dir)
     
     # Importar extensiones localmente para evitar imports circulares
-    from app.extensions import db, login_manager, migrate, mail, csrf
+    from app.extensions import db, login_manager, mail, csrf
     
     # Configuración
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
     app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///codexsoto.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    
+    # Pool de conexiones (PostgreSQL) y pragmas WAL (SQLite)
+    from app.utils.database import build_engine_options, build_binds
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    
+    # Réplica de solo lectura opcional para el tráfico público
+    app.config['SQLALCHEMY_BINDS'] = build_binds(os.environ.get('DATABASE_REPLICA_URL'))
+    app.config['REPLICA_STICKY_SECONDS'] = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
     app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
     
     # Configuración de email
@@ -32,23 +40,126 @@ def create_app():
     # Inicializar extensiones
     db.init_app(app)
     login_manager.init_app(app)
-    migrate.init_app(app, db)
     mail.init_app(app)
     csrf.init_app(app)
     
-    # Inicializar analytics
+    # Enrutado primario/réplica (antes del tracker de analytics)
+    from app.utils.database import init_db_routing
+    init_db_routing(app)
+    
+    # Consultas, tiempo de DB y de plantillas por request (cabecera Server-Timing) y log de consultas lentas
+    from app.utils.instrumentation import init_instrumentation
+    app.config['INSTRUMENTATION_ENABLED'] = os.environ.get('INSTRUMENTATION_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+    app.config['SERVER_TIMING_ENABLED'] = os.environ.get('SERVER_TIMING_ENABLED', 'False').lower() in ('1', 'true', 'yes')
+    app.config['SLOW_QUERY_MS'] = int(os.environ.get('SLOW_QUERY_MS', 100))
+    app.config['LATENCY_SAMPLE_SIZE'] = int(os.environ.get('LATENCY_SAMPLE_SIZE', 1000))
+    init_instrumentation(app)
+    
+    # Métricas de Prometheus en /metrics (agregadas entre workers de gunicorn)
+    from app.utils.metrics import init_metrics
+    app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+    init_metrics(app)
+    
+    # {% cache %} para fragmentos de plantillas y bytecode de Jinja compartido en disco
+    from app.utils.template_cache import init_template_cache, DEFAULT_BYTECODE_CACHE_DIR
+    app.config['FRAGMENT_CACHE_SIZE'] = int(os.environ.get('FRAGMENT_CACHE_SIZE', 1000))
+    app.config['FRAGMENT_CACHE_TIMEOUT'] = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', 0))
+    app.config['JINJA_BYTECODE_CACHE_DIR'] = os.environ.get('JINJA_BYTECODE_CACHE_DIR', DEFAULT_BYTECODE_CACHE_DIR)
+    init_template_cache(app)
+    
+    # JSON de la API y del admin: esquemas compilados y cache por (id, updated_at)
+    from app.utils.serializers import init_serializers
+    app.config['SERIALIZER_CACHE_SIZE'] = int(os.environ.get('SERIALIZER_CACHE_SIZE', 5000))
+    init_serializers(app)
+    
+    # Inicializar analytics (tracker en cada request, o desde el log de nginx)
     from app.utils.analytics import init_analytics
+    app.config['ANALYTICS_TRACKER_ENABLED'] = os.environ.get('ANALYTICS_TRACKER_ENABLED', 'True').lower() in ('1', 'true', 'yes')
     init_analytics(app)
     
+    # Filtro de bots del tracker: patrones de user agent, cabeceras y ritmo por IP
+    from app.utils.bots import init_bot_filter
+    app.config['BOT_FILTER_ENABLED'] = os.environ.get('BOT_FILTER_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+    app.config['BOT_MAX_HITS_PER_MINUTE'] = int(os.environ.get('BOT_MAX_HITS_PER_MINUTE', 60))
+    init_bot_filter(app)
+    
+    # País de cada visita desde una base local de rangos IP (CSV), sin llamadas de red
+    from app.utils.geoip import init_geoip
+    app.config['GEOIP_DATABASE'] = os.environ.get('GEOIP_DATABASE')
+    app.config['GEOIP_CACHE_SIZE'] = int(os.environ.get('GEOIP_CACHE_SIZE', 65536))
+    init_geoip(app)
+    
+    # Visitas en vivo para el dashboard (buffer en memoria por worker)
+    from app.utils.live_stats import init_live_stats
+    app.config['LIVE_BUFFER_SIZE'] = int(os.environ.get('LIVE_BUFFER_SIZE', 500))
+    app.config['LIVE_STREAM_INTERVAL'] = float(os.environ.get('LIVE_STREAM_INTERVAL', 2))
+    app.config['LIVE_STREAM_MAX_SECONDS'] = int(os.environ.get('LIVE_STREAM_MAX_SECONDS', 300))
+    # Con workers sync un stream largo bloquea el worker hasta el timeout de gunicorn
+    app.config['LIVE_STREAM_POLLING'] = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread').lower() == 'sync'
+    init_live_stats(app)
+    
+    # Muestreo por visitante de las visitas guardadas (fija o adaptativa a la carga)
+    from app.utils.sampling import init_sampling
+    app.config['ANALYTICS_SAMPLE_RATE'] = int(os.environ.get('ANALYTICS_SAMPLE_RATE', 1))
+    app.config['ANALYTICS_ADAPTIVE_SAMPLING'] = os.environ.get('ANALYTICS_ADAPTIVE_SAMPLING', 'False').lower() in ('1', 'true', 'yes')
+    app.config['ANALYTICS_ADAPTIVE_TARGET'] = float(os.environ.get('ANALYTICS_ADAPTIVE_TARGET', 20))
+    app.config['ANALYTICS_MAX_SAMPLE_RATE'] = int(os.environ.get('ANALYTICS_MAX_SAMPLE_RATE', 64))
+    app.config['ANALYTICS_MAX_PENDING_WRITES'] = int(os.environ.get('ANALYTICS_MAX_PENDING_WRITES', 4))
+    init_sampling(app)
+    
+    # Segundos entre recargas completas de los buckets de /api/analytics/timeseries
+    app.config['TIMESERIES_RELOAD_SECONDS'] = int(os.environ.get('TIMESERIES_RELOAD_SECONDS', 3600))
+    
     # Configuración de Flask-Login
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Por favor inicia sesión para acceder a esta página.'
     login_manager.login_message_category = 'warning'
     
+    # current_user se reconstruye desde una cache TTL por proceso, sin consultar la base de datos
+    from app.utils.user_cache import init_user_cache, load_cached_user
+    app.config['USER_CACHE_TTL'] = int(os.environ.get('USER_CACHE_TTL', 60))
+    init_user_cache(app)
+    
+    # Contadores del dashboard mantenidos por eventos del ORM
+    from app.utils import counters  # noqa: F401 (registrar los eventos)
+    
+    # sitemap.xml y feeds RSS/Atom en disco, regenerados tras los cambios de contenido
+    from app.utils.feeds import init_feeds
+    app.config['FEEDS_DIR'] = os.environ.get('FEEDS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generated'))
+    app.config['SITE_URL'] = os.environ.get('SITE_URL', 'http://localhost')
+    app.config['FEEDS_AUTO_REGENERATE'] = os.environ.get('FEEDS_AUTO_REGENERATE', 'True').lower() in ('1', 'true', 'yes')
+    app.config['FEEDS_DEBOUNCE_SECONDS'] = float(os.environ.get('FEEDS_DEBOUNCE_SECONDS', 5))
+    app.config['FEED_ITEMS'] = int(os.environ.get('FEED_ITEMS', 20))
+    app.config['SITEMAP_MAX_URLS'] = int(os.environ.get('SITEMAP_MAX_URLS', 50000))
+    init_feeds(app)
+    
+    # Páginas públicas congeladas en HTML para nginx, reconstruidas según sus dependencias
+    from app.utils.freeze import init_freeze
+    app.config['FREEZE_ENABLED'] = os.environ.get('FREEZE_ENABLED', 'False').lower() in ('1', 'true', 'yes')
+    app.config['FREEZE_DIR'] = os.environ.get('FREEZE_DIR', os.path.join(app.config['FEEDS_DIR'], 'site'))
+    app.config['FREEZE_DEBOUNCE_SECONDS'] = float(os.environ.get('FREEZE_DEBOUNCE_SECONDS', 5))
+    init_freeze(app)
+    
+    # Contenido relacionado precalculado (TF-IDF), recalculado tras los cambios de contenido
+    from app.utils.related import init_related
+    app.config['RELATED_COUNT'] = int(os.environ.get('RELATED_COUNT', 4))
+    app.config['RELATED_MAX_TERMS'] = int(os.environ.get('RELATED_MAX_TERMS', 5000))
+    app.config['RELATED_AUTO_REFRESH'] = os.environ.get('RELATED_AUTO_REFRESH', 'True').lower() in ('1', 'true', 'yes')
+    app.config['RELATED_DEBOUNCE_SECONDS'] = float(os.environ.get('RELATED_DEBOUNCE_SECONDS', 10))
+    init_related(app)
+    
+    # Cabeceras de cache (Cache-Control, ETag, Surrogate-Key) en las páginas públicas
+    # y purga de la cache de nginx tras los cambios de contenido
+    from app.utils.edge_cache import init_edge_cache
+    app.config['EDGE_CACHE_ENABLED'] = os.environ.get('EDGE_CACHE_ENABLED', 'False').lower() in ('1', 'true', 'yes')
+    app.config['EDGE_CACHE_SECONDS'] = int(os.environ.get('EDGE_CACHE_SECONDS', 600))
+    app.config['EDGE_CACHE_DIR'] = os.environ.get('EDGE_CACHE_DIR')
+    init_edge_cache(app)
+    
     @login_manager.user_loader
     def load_user(user_id):
-        from app.models.user import User
-        return User.query.get(int(user_id))
+        return load_cached_user(user_id)
     
     # Registrar Blueprints
     from app.blueprints.main import main_bp
@@ -61,45 +172,21 @@ def create_app():
     app.register_blueprint(admin_bp, url_prefix='/admin')
     app.register_blueprint(api_bp, url_prefix='/api')
     
-    # Crear tablas si no existen
-    with app.app_context():
-        db.create_all()
-        
-        # Crear usuario admin por defecto
-        from app.models.user import User
-        from app.models.site_config import SiteConfig
-        from app.models.analytics import PageView, VisitorStats
-        from werkzeug.security import generate_password_hash
-        
-        admin_user = User.query.filter_by(username='admin').first()
-        if not admin_user:
-            admin_user = User(
-                username='admin',
-                email=os.environ.get('ADMIN_EMAIL', 'admin@codexsoto.com'),
-                password_hash=generate_password_hash(os.environ.get('ADMIN_PASSWORD', 'admin123')),
-                is_admin=True
-            )
-            db.session.add(admin_user)
-        
-        # Crear configuración por defecto del sitio
-        site_config = SiteConfig.query.first()
-        if not site_config:
-            site_config = SiteConfig(
-                site_name='CodexSoto',
-                site_description='Investigación en IA, Automatizaciones y Cursos',
-                primary_color='#3b82f6',
-                secondary_color='#1e40af',
-                dark_mode=False,
-                hero_title='David Soto',
-                hero_subtitle='Especialista en Inteligencia Artificial y Automatizaciones',
-                about_text='Investigador y desarrollador especializado en IA, machine learning y automatización de procesos.'
-            )
-            db.session.add(site_config)
-        
-        db.session.commit()
+    # Comandos de la CLI (flask bootstrap, flask db, ...)
+    from app.cli import init_cli
+    init_cli(app)
     
     return app
 
 if __name__ == '__main__':
+    # Servidor de desarrollo; en producción se usa gunicorn (ver gunicorn.conf.py)
     app = create_app()
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    
+    # En desarrollo se inicializa la base de datos al arrancar; en producción
+    # se ejecuta `flask bootstrap` una sola vez antes de levantar gunicorn
+    from app.cli import bootstrap_database
+    with app.app_context():
+        bootstrap_database()
+    
+    debug = os.environ.get('FLASK_DEBUG', 'True').lower() in ('1', 'true', 'yes')
+    app.run(debug=debug, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
@@ -0,0 +1,181 @@
+import json
+import os
+import re
+from urllib.parse import parse_qs
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.models.blog import BlogPost
+from app.models.course import Course
+from app.models.project import Project
+from app.models.site_config import SiteConfig
+from app.utils.database import build_async_database_url, build_async_engine_options, get_sqlite_pragmas
+from app.utils.serializers import (LOAD_CHUNK, serializer_cache, post_schema, post_detail_schema,
+                                   course_schema, course_detail_schema, project_schema,
+                                   project_detail_schema, site_config_schema)
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    """Los mismos pragmas que el motor síncrono, a través del adaptador de aiosqlite"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in get_sqlite_pragmas().items():
+            cursor.execute(f'PRAGMA {pragma}={value}')
+    finally:
+        cursor.close()
+
+async def dump_statement(session, schema, statement):
+    """
+    Versión async de Schema.dump_query: consulta (id, updated_at) y carga solo las filas
+    que no están en la cache compartida de serializadores.
+    """
+    model = schema.model
+    versions = (await session.execute(statement.with_only_columns(model.id, model.updated_at))).all()
+    results = [serializer_cache.get((schema.name, item_id, updated_at)) for item_id, updated_at in versions]
+    missing = [item_id for (item_id, _), data in zip(versions, results) if data is None]
+    if not missing:
+        return results
+
+    loaded = {}
+    for start in range(0, len(missing), LOAD_CHUNK):
+        chunk = missing[start:start + LOAD_CHUNK]
+        for obj in (await session.scalars(select(model).where(model.id.in_(chunk)))):
+            data = schema.serialize(obj)
+            if obj.updated_at is not None:
+                serializer_cache.set((schema.name, obj.id, obj.updated_at), data)
+            loaded[obj.id] = data
+    return [data if data is not None else loaded.get(item_id)
+            for (item_id, _), data in zip(versions, results)
+            if data is not None or item_id in loaded]
+
+async def _detail(session, schema, slug, not_found):
+    model = schema.model
+    obj = await session.scalar(select(model).where(model.slug == slug, model.published.is_(True)))
+    if obj is None:
+        return 404, {'error': not_found}
+    return 200, schema.dump(obj)
+
+# Mismas respuestas que los endpoints públicos de app/blueprints/api.py
+
+async def get_posts(session, args):
+    statement = select(BlogPost).where(BlogPost.published.is_(True)).order_by(BlogPost.created_at.desc())
+    return 200, {'posts': await dump_statement(session, post_schema, statement)}
+
+async def get_post(session, args, slug):
+    return await _detail(session, post_detail_schema, slug, 'Post no encontrado')
+
+async def get_courses(session, args):
+    statement = select(Course).where(Course.published.is_(True)).order_by(Course.id)
+    return 200, {'courses': await dump_statement(session, course_schema, statement)}
+
+async def get_course(session, args, slug):
+    return await _detail(session, course_detail_schema, slug, 'Curso no encontrado')
+
+async def get_projects(session, args):
+    statement = select(Project).where(Project.published.is_(True))
+    category = args.get('category', [None])[0]
+    if category:
+        statement = statement.where(Project.category == category)
+    return 200, {'projects': await dump_statement(session, project_schema, statement.order_by(Project.id))}
+
+async def get_project(session, args, slug):
+    return await _detail(session, project_detail_schema, slug, 'Proyecto no encontrado')
+
+async def get_config(session, args):
+    config = await session.scalar(select(SiteConfig).limit(1))
+    if config is None:
+        return 404, {'error': 'Configuración no encontrada'}
+    return 200, site_config_schema.dump(config)
+
+ROUTES = [
+    (re.compile(r'^/api/posts$'), get_posts),
+    (re.compile(r'^/api/posts/(?P<slug>[^/]+)$'), get_post),
+    (re.compile(r'^/api/courses$'), get_courses),
+    (re.compile(r'^/api/courses/(?P<slug>[^/]+)$'), get_course),
+    (re.compile(r'^/api/projects$'), get_projects),
+    (re.compile(r'^/api/projects/(?P<slug>[^/]+)$'), get_project),
+    (re.compile(r'^/api/config$'), get_config),
+]
+
+def _json(data):
+    # Igual que jsonify de Flask: claves ordenadas, compacto y con salto de línea final
+    return (json.dumps(data, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+
+class AsyncApi:
+    """
+    Aplicación ASGI con los endpoints de solo lectura de la API sobre un motor async
+    de SQLAlchemy. Usa los mismos modelos y esquemas que la app Flask, sin Flask.
+    """
+
+    def __init__(self, database_uri):
+        self.database_uri = database_uri
+        self.engine = None
+        self.sessions = None
+
+    def start(self):
+        self.engine = create_async_engine(build_async_database_url(self.database_uri),
+                                          **build_async_engine_options(self.database_uri))
+        if self.database_uri.startswith('sqlite'):
+            event.listen(self.engine.sync_engine, 'connect', _sqlite_pragmas)
+        # Los objetos solo se leen: sin expirar tras el commit ni autoflush
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False, autoflush=False)
+
+    async def stop(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.stop()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, send):
+        if self.engine is None:
+            # Servidores sin lifespan
+            self.start()
+
+        method = scope['method']
+        if method not in ('GET', 'HEAD'):
+            status, data = 405, {'error': 'Método no permitido'}
+        else:
+            status, data = 404, {'error': 'No encontrado'}
+            for pattern, handler in ROUTES:
+                match = pattern.match(scope['path'])
+                if match:
+                    args = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+                    async with self.sessions() as session:
+                        status, data = await handler(session, args, **match.groupdict())
+                    break
+
+        body = _json(data)
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode('latin-1')),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': b'' if method == 'HEAD' else body})
+
+def create_asgi_app():
+    """API async contra la réplica de lectura si existe, si no contra la base principal"""
+    database_uri = (os.environ.get('DATABASE_REPLICA_URL')
+                    or os.environ.get('DATABASE_URL', 'sqlite:///codexsoto.db'))
+    # Flask-SQLAlchemy resuelve las rutas SQLite relativas dentro de instance/
+    prefix = 'sqlite:///'
+    path = database_uri[len(prefix):]
+    if database_uri.startswith(prefix) and path and path != ':memory:' and not os.path.isabs(path):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        database_uri = prefix + os.path.join(root, 'instance', path)
+    return AsyncApi(database_uri)
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, Response, current_app, stream_with_context
 from flask_login import login_required, current_user
 from app.models.blog import BlogPost
 from app.models.course import Course
@@ -7,28 +7,112 @@ from app.models.site_config import SiteConfig
 from app.models.contact import ContactMessage
 from app.extensions import db
 from app.utils.file_upload import save_uploaded_file, delete_uploaded_file
+from app.utils.pagination import keyset_paginate
+from app.utils.slugs import slugify, generate_unique_slug
+from app.utils.counters import get_counters, refresh_model_counters
+from app.utils.content_events import note_content_change
+from app.utils.serializers import contact_message_schema
+from app.utils.live_stats import live_stats
+from app.utils.user_cache import has_admin_rights
+from sqlalchemy import or_
+from sqlalchemy.orm import load_only
 import os
 from werkzeug.utils import secure_filename
 import json
 import re
+import time
 from datetime import datetime
 
 admin_bp = Blueprint('admin', __name__)
 
-def slugify(text):
-    """Convierte un texto en un slug válido para URLs"""
-    # Convertir a minúsculas
-    text = text.lower()
-    # Reemplazar espacios y caracteres especiales con guiones
-    text = re.sub(r'[^\w\s-]', '', text)
-    text = re.sub(r'[-\s]+', '-', text)
-    # Eliminar guiones al inicio y final
-    return text.strip('-')
+# Elementos por página en los listados del admin
+ADMIN_PER_PAGE = 25
+
+# Ordenaciones disponibles en los listados: nombre -> (columna, descendente)
+LISTING_SORTS = {
+    'recent': ('created_at', True),
+    'oldest': ('created_at', False),
+    'title': ('title', False),
+    'title_desc': ('title', True),
+}
+
+def listing_args(sorts=LISTING_SORTS):
+    """Leer búsqueda, filtro, orden y cursor de la query string"""
+    sort = request.args.get('sort', 'recent')
+    if sort not in sorts:
+        sort = 'recent'
+    return {
+        'q': request.args.get('q', '').strip(),
+        'status': request.args.get('status', ''),
+        'sort': sort,
+        'after': request.args.get('after'),
+        'before': request.args.get('before'),
+    }
+
+def paginate_listing(query, model_class, args, search_columns, sorts=LISTING_SORTS):
+    """Aplicar búsqueda y paginación keyset a un listado del admin"""
+    if args['q']:
+        pattern = f"%{args['q']}%"
+        query = query.filter(or_(*[column.ilike(pattern) for column in search_columns]))
+    
+    column_name, descending = sorts[args['sort']]
+    return keyset_paginate(
+        query,
+        getattr(model_class, column_name),
+        model_class.id,
+        descending=descending,
+        after=args['after'],
+        before=args['before'],
+        per_page=ADMIN_PER_PAGE
+    )
+
+def selected_ids():
+    """Ids marcados en un formulario de acciones masivas"""
+    ids = []
+    for value in request.form.getlist('ids'):
+        try:
+            ids.append(int(value))
+        except ValueError:
+            continue
+    return ids
+
+def run_bulk_action(model_class, updates, label):
+    """
+    Ejecutar una acción masiva como un único UPDATE o DELETE.
+    `updates` mapea cada acción a los valores a asignar, o a None para eliminar.
+    """
+    action = request.form.get('action')
+    ids = selected_ids()
+    
+    if action not in updates or not ids:
+        flash('Selecciona una acción y al menos un elemento', 'warning')
+        return 0
+    
+    query = model_class.query.filter(model_class.id.in_(ids))
+    try:
+        values = updates[action]
+        if values is None:
+            affected = query.delete(synchronize_session=False)
+        else:
+            if hasattr(model_class, 'updated_at'):
+                values = dict(values, updated_at=datetime.utcnow())
+            affected = query.update(values, synchronize_session=False)
+        # Los UPDATE/DELETE masivos no disparan eventos del ORM
+        refresh_model_counters(model_class)
+        note_content_change(db.session, model_class, ids)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        flash('Error al aplicar la acción. Inténtalo de nuevo.', 'error')
+        return 0
+    
+    flash(f'Acción aplicada a {affected} {label}', 'success')
+    return affected
 
 def admin_required(f):
     """Decorador para requerir permisos de administrador"""
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated or not current_user.is_admin:
+        if not has_admin_rights(current_user):
             flash('No tienes permisos para acceder a esta página', 'error')
             return redirect(url_for('main.index'))
         return f(*args, **kwargs)
@@ -39,12 +123,8 @@ def admin_required(f):
 @login_required
 @admin_required
 def dashboard():
-    # Estadísticas del dashboard
-    total_posts = BlogPost.query.count()
-    published_posts = BlogPost.query.filter_by(published=True).count()
-    total_courses = Course.query.count()
-    total_projects = Project.query.count()
-    unread_messages = ContactMessage.query.filter_by(read=False).count()
+    # Estadísticas del dashboard: una sola fila mantenida por eventos del ORM
+    counters = get_counters()
     
     recent_messages = ContactMessage.query.order_by(ContactMessage.created_at.desc()).limit(5).all()
     
@@ -53,14 +133,71 @@ def dashboard():
     analytics = get_analytics_summary()
     
     return render_template('admin/dashboard.html',
-                         total_posts=total_posts,
-                         published_posts=published_posts,
-                         total_courses=total_courses,
-                         total_projects=total_projects,
-                         unread_messages=unread_messages,
+                         total_posts=counters.total_posts,
+                         published_posts=counters.published_posts,
+                         total_courses=counters.total_courses,
+                         total_projects=counters.total_projects,
+                         unread_messages=counters.unread_messages,
                          recent_messages=recent_messages,
                          analytics=analytics)
 
+@admin_bp.route('/analytics/live')
+@login_required
+@admin_required
+def analytics_live():
+    """Server-Sent Events con las visitas en vivo de este worker (sin consultas a la DB)"""
+    interval = current_app.config.get('LIVE_STREAM_INTERVAL', 2)
+    max_seconds = current_app.config.get('LIVE_STREAM_MAX_SECONDS', 300)
+    try:
+        since = int(request.headers.get('Last-Event-ID') or request.args.get('since') or 0)
+    except ValueError:
+        since = 0
+    
+    def event(last_seq):
+        snapshot = live_stats.snapshot(last_seq)
+        return snapshot['seq'], f"id: {snapshot['seq']}\ndata: {json.dumps(snapshot)}\n\n"
+    
+    def generate():
+        last_seq = since
+        deadline = time.monotonic() + max_seconds
+        # El navegador reintenta a los 3s si la conexión se cierra
+        yield 'retry: 3000\n\n'
+        while time.monotonic() < deadline:
+            last_seq, data = event(last_seq)
+            yield data
+            time.sleep(interval)
+    
+    if current_app.config.get('LIVE_STREAM_POLLING'):
+        # Worker sync: un solo evento y EventSource vuelve a pedir tras el intervalo,
+        # así ninguna petición se acerca al timeout de gunicorn
+        body = f'retry: {int(interval * 1000)}\n\n' + event(since)[1]
+        return Response(body, mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+    
+    # No mantener una conexión de la DB abierta mientras dure el stream
+    db.session.close()
+    
+    # El stream se corta tras max_seconds para liberar el hilo del worker;
+    # EventSource reconecta y continúa desde Last-Event-ID
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+@admin_bp.route('/performance')
+@login_required
+@admin_required
+def performance():
+    """Percentiles por endpoint y consultas lentas de este worker"""
+    from app.utils.instrumentation import instrumentation
+    
+    return render_template('admin/performance.html',
+                         endpoints=instrumentation.endpoints.summary(),
+                         slow_queries=list(instrumentation.slow_queries),
+                         slow_query_ms=instrumentation.slow_query_seconds * 1000,
+                         enabled=instrumentation.enabled,
+                         started_at=instrumentation.started_at,
+                         pid=os.getpid())
+
 # Configuración del sitio
 @admin_bp.route('/config', methods=['GET', 'POST'])
 @login_required
@@ -103,24 +240,27 @@ def site_config():
 @login_required
 @admin_required
 def blog_list():
-    posts = BlogPost.query.order_by(BlogPost.created_at.desc()).all()
-    return render_template('admin/blog_list.html', posts=posts)
-
-def generate_unique_slug(base_slug, model_class, exclude_id=None):
-    """Genera un slug único agregando un número si es necesario"""
-    slug = base_slug
-    counter = 1
+    args = listing_args()
+    query = BlogPost.query.options(load_only(
+        BlogPost.id, BlogPost.title, BlogPost.slug, BlogPost.published, BlogPost.created_at))
+    if args['status'] == 'published':
+        query = query.filter(BlogPost.published.is_(True))
+    elif args['status'] == 'draft':
+        query = query.filter(BlogPost.published.is_(False))
     
-    while True:
-        query = model_class.query.filter_by(slug=slug)
-        if exclude_id:
-            query = query.filter(model_class.id != exclude_id)
-        
-        if not query.first():
-            return slug
-        
-        slug = f"{base_slug}-{counter}"
-        counter += 1
+    posts = paginate_listing(query, BlogPost, args, [BlogPost.title, BlogPost.slug, BlogPost.tags])
+    return render_template('admin/blog_list.html', posts=posts, args=args)
+
+@admin_bp.route('/blog/bulk', methods=['POST'])
+@login_required
+@admin_required
+def blog_bulk():
+    run_bulk_action(BlogPost, {
+        'publish': {'published': True},
+        'unpublish': {'published': False},
+        'delete': None,
+    }, 'posts')
+    return redirect(request.referrer or url_for('admin.blog_list'))
 
 @admin_bp.route('/blog/new', methods=['GET', 'POST'])
 @login_required
@@ -263,8 +403,30 @@ def blog_delete(post_id):
 @login_required
 @admin_required
 def course_list():
-    courses = Course.query.order_by(Course.created_at.desc()).all()
-    return render_template('admin/course_list.html', courses=courses)
+    args = listing_args()
+    query = Course.query.options(load_only(
+        Course.id, Course.title, Course.slug, Course.duration, Course.price,
+        Course.published, Course.featured, Course.created_at))
+    if args['status'] == 'published':
+        query = query.filter(Course.published.is_(True))
+    elif args['status'] == 'draft':
+        query = query.filter(Course.published.is_(False))
+    elif args['status'] == 'featured':
+        query = query.filter(Course.featured.is_(True))
+    
+    courses = paginate_listing(query, Course, args, [Course.title, Course.slug, Course.level])
+    return render_template('admin/course_list.html', courses=courses, args=args)
+
+@admin_bp.route('/courses/bulk', methods=['POST'])
+@login_required
+@admin_required
+def course_bulk():
+    run_bulk_action(Course, {
+        'publish': {'published': True},
+        'unpublish': {'published': False},
+        'delete': None,
+    }, 'cursos')
+    return redirect(request.referrer or url_for('admin.course_list'))
 
 @admin_bp.route('/courses/new', methods=['GET', 'POST'])
 @login_required
@@ -414,8 +576,30 @@ def course_delete(course_id):
 @login_required
 @admin_required
 def project_list():
-    projects = Project.query.order_by(Project.created_at.desc()).all()
-    return render_template('admin/project_list.html', projects=projects)
+    args = listing_args()
+    query = Project.query.options(load_only(
+        Project.id, Project.title, Project.slug, Project.category, Project.technologies,
+        Project.published, Project.featured, Project.created_at))
+    if args['status'] == 'published':
+        query = query.filter(Project.published.is_(True))
+    elif args['status'] == 'draft':
+        query = query.filter(Project.published.is_(False))
+    elif args['status'] in ('research', 'automation'):
+        query = query.filter(Project.category == args['status'])
+    
+    projects = paginate_listing(query, Project, args, [Project.title, Project.slug, Project.technologies])
+    return render_template('admin/project_list.html', projects=projects, args=args)
+
+@admin_bp.route('/projects/bulk', methods=['POST'])
+@login_required
+@admin_required
+def project_bulk():
+    run_bulk_action(Project, {
+        'publish': {'published': True},
+        'unpublish': {'published': False},
+        'delete': None,
+    }, 'proyectos')
+    return redirect(request.referrer or url_for('admin.project_list'))
 
 @admin_bp.route('/projects/new', methods=['GET', 'POST'])
 @login_required
@@ -562,28 +746,48 @@ def project_delete(project_id):
 @login_required
 @admin_required
 def contact_list():
-    messages = ContactMessage.query.order_by(ContactMessage.created_at.desc()).all()
-    unread_count = ContactMessage.query.filter_by(read=False).count()
-    total_count = len(messages)
+    # El asunto es opcional, así que solo se ordena por fecha
+    sorts = {key: LISTING_SORTS[key] for key in ('recent', 'oldest')}
+    args = listing_args(sorts)
+    query = ContactMessage.query.options(load_only(
+        ContactMessage.id, ContactMessage.name, ContactMessage.email,
+        ContactMessage.subject, ContactMessage.read, ContactMessage.created_at))
+    if args['status'] == 'unread':
+        query = query.filter(ContactMessage.read.is_(False))
+    elif args['status'] == 'read':
+        query = query.filter(ContactMessage.read.is_(True))
+    
+    messages = paginate_listing(
+        query, ContactMessage, args,
+        [ContactMessage.name, ContactMessage.email, ContactMessage.subject],
+        sorts=sorts
+    )
+    
+    counters = get_counters()
+    
     return render_template('admin/messages_list.html', 
                          messages=messages,
-                         unread_count=unread_count,
-                         total_count=total_count)
+                         args=args,
+                         unread_count=counters.unread_messages,
+                         total_count=counters.total_messages)
+
+@admin_bp.route('/messages/bulk', methods=['POST'])
+@login_required
+@admin_required
+def contact_bulk():
+    run_bulk_action(ContactMessage, {
+        'mark_read': {'read': True},
+        'mark_unread': {'read': False},
+        'delete': None,
+    }, 'mensajes')
+    return redirect(request.referrer or url_for('admin.contact_list'))
 
 @admin_bp.route('/messages/<int:message_id>')
 @login_required
 @admin_required
 def message_detail(message_id):
     message = ContactMessage.query.get_or_404(message_id)
-    return jsonify({
-        'id': message.id,
-        'name': message.name,
-        'email': message.email,
-        'subject': message.subject,
-        'message': message.message,
-        'read': message.read,
-        'created_at': message.created_at.strftime('%d/%m/%Y %H:%M')
-    })
+    return jsonify(contact_message_schema.dump(message))
 
 @admin_bp.route('/messages/<int:message_id>/read', methods=['POST'])
 @login_required
@@ -1,28 +1,22 @@
 from flask import Blueprint, jsonify, request
+from flask_login import current_user
+from functools import wraps
+from datetime import datetime, timedelta, timezone
 from app.models.blog import BlogPost
 from app.models.course import Course
 from app.models.project import Project
 from app.models.site_config import SiteConfig
+from app.utils.user_cache import has_admin_rights
+from app.utils.serializers import (post_schema, post_detail_schema, course_schema, course_detail_schema,
+                                   project_schema, project_detail_schema, site_config_schema)
 
 api_bp = Blueprint('api', __name__)
 
 @api_bp.route('/posts')
 def get_posts():
     """Obtener todos los posts publicados"""
-    posts = BlogPost.query.filter_by(published=True).order_by(BlogPost.created_at.desc()).all()
-    
-    posts_data = []
-    for post in posts:
-        posts_data.append({
-            'id': post.id,
-            'title': post.title,
-            'slug': post.slug,
-            'summary': post.summary,
-            'created_at': post.created_at.isoformat(),
-            'updated_at': post.updated_at.isoformat()
-        })
-    
-    return jsonify({'posts': posts_data})
+    query = BlogPost.query.filter_by(published=True).order_by(BlogPost.created_at.desc())
+    return jsonify({'posts': post_schema.dump_query(query)})
 
 @api_bp.route('/posts/<slug>')
 def get_post(slug):
@@ -32,38 +26,13 @@ def get_post(slug):
     if not post:
         return jsonify({'error': 'Post no encontrado'}), 404
     
-    post_data = {
-        'id': post.id,
-        'title': post.title,
-        'slug': post.slug,
-        'content': post.content,
-        'summary': post.summary,
-        'created_at': post.created_at.isoformat(),
-        'updated_at': post.updated_at.isoformat()
-    }
-    
-    return jsonify(post_data)
+    return jsonify(post_detail_schema.dump(post))
 
 @api_bp.route('/courses')
 def get_courses():
     """Obtener todos los cursos publicados"""
-    courses = Course.query.filter_by(published=True).all()
-    
-    courses_data = []
-    for course in courses:
-        courses_data.append({
-            'id': course.id,
-            'title': course.title,
-            'slug': course.slug,
-            'short_description': course.short_description,
-            'price': course.price,
-            'duration': course.duration,
-            'level': course.level,
-            'featured': course.featured,
-            'created_at': course.created_at.isoformat()
-        })
-    
-    return jsonify({'courses': courses_data})
+    query = Course.query.filter_by(published=True).order_by(Course.id)
+    return jsonify({'courses': course_schema.dump_query(query)})
 
 @api_bp.route('/courses/<slug>')
 def get_course(slug):
@@ -73,20 +42,7 @@ def get_course(slug):
     if not course:
         return jsonify({'error': 'Curso no encontrado'}), 404
     
-    course_data = {
-        'id': course.id,
-        'title': course.title,
-        'slug': course.slug,
-        'description': course.description,
-        'short_description': course.short_description,
-        'price': course.price,
-        'duration': course.duration,
-        'level': course.level,
-        'featured': course.featured,
-        'created_at': course.created_at.isoformat()
-    }
-    
-    return jsonify(course_data)
+    return jsonify(course_detail_schema.dump(course))
 
 @api_bp.route('/projects')
 def get_projects():
@@ -97,24 +53,7 @@ def get_projects():
     if category:
         query = query.filter_by(category=category)
     
-    projects = query.all()
-    
-    projects_data = []
-    for project in projects:
-        projects_data.append({
-            'id': project.id,
-            'title': project.title,
-            'slug': project.slug,
-            'short_description': project.short_description,
-            'category': project.category,
-            'technologies': project.technologies.split(',') if project.technologies else [],
-            'github_url': project.github_url,
-            'demo_url': project.demo_url,
-            'featured': project.featured,
-            'created_at': project.created_at.isoformat()
-        })
-    
-    return jsonify({'projects': projects_data})
+    return jsonify({'projects': project_schema.dump_query(query.order_by(Project.id))})
 
 @api_bp.route('/projects/<slug>')
 def get_project(slug):
@@ -124,21 +63,7 @@ def get_project(slug):
     if not project:
         return jsonify({'error': 'Proyecto no encontrado'}), 404
     
-    project_data = {
-        'id': project.id,
-        'title': project.title,
-        'slug': project.slug,
-        'description': project.description,
-        'short_description': project.short_description,
-        'category': project.category,
-        'technologies': project.technologies.split(',') if project.technologies else [],
-        'github_url': project.github_url,
-        'demo_url': project.demo_url,
-        'featured': project.featured,
-        'created_at': project.created_at.isoformat()
-    }
-    
-    return jsonify(project_data)
+    return jsonify(project_detail_schema.dump(project))
 
 @api_bp.route('/config')
 def get_config():
@@ -148,16 +73,52 @@ def get_config():
     if not config:
         return jsonify({'error': 'Configuración no encontrada'}), 404
     
-    config_data = {
-        'site_name': config.site_name,
-        'site_description': config.site_description,
-        'hero_title': config.hero_title,
-        'hero_subtitle': config.hero_subtitle,
-        'about_text': config.about_text,
-        'contact_email': config.contact_email,
-        'linkedin_url': config.linkedin_url,
-        'github_url': config.github_url,
-        'twitter_url': config.twitter_url
-    }
-    
-    return jsonify(config_data)
+    return jsonify(site_config_schema.dump(config))
+
+def admin_api_required(f):
+    """Restringir un endpoint a administradores respondiendo JSON en lugar de redirigir"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not has_admin_rights(current_user):
+            return jsonify({'error': 'No autorizado'}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+def parse_datetime_arg(name, default):
+    """Fecha ISO 8601 del query string como UTC sin zona (las horas de la base son UTC)"""
+    value = request.args.get(name)
+    if not value:
+        return default
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} no es una fecha ISO 8601 válida')
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+@api_bp.route('/analytics/timeseries')
+@admin_api_required
+def analytics_timeseries():
+    """Vistas por hora, día o semana en un rango, con filtros opcionales"""
+    from app.utils.timeseries import GRANULARITY_HOURS, get_timeseries
+    
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in GRANULARITY_HOURS:
+        return jsonify({'error': 'granularity debe ser hour, day o week'}), 400
+    
+    try:
+        end = parse_datetime_arg('end', datetime.utcnow())
+        start = parse_datetime_arg('start', end - timedelta(days=30))
+        if start >= end:
+            return jsonify({'error': 'start debe ser anterior a end'}), 400
+        series = get_timeseries(
+            start, end, granularity,
+            page=request.args.get('page'),
+            device=request.args.get('device'),
+            browser=request.args.get('browser')
+        )
+    except (ValueError, TypeError, OverflowError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(series)
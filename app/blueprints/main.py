@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask import Blueprint, render_template, request, flash, redirect, url_for, current_app, send_from_directory, abort
 from flask_mail import Message
 from app.models.blog import BlogPost
 from app.models.course import Course
@@ -6,9 +6,16 @@ from app.models.project import Project
 from app.models.site_config import SiteConfig
 from app.models.contact import ContactMessage
 from app.extensions import db, mail
+from app.utils.metrics import metrics
+from app.utils.related import related_items
+import os
+import time
 
 main_bp = Blueprint('main', __name__)
 
+# Posts por página del listado del blog
+BLOG_PER_PAGE = 6
+
 @main_bp.route('/')
 def index():
     config = SiteConfig.query.first()
@@ -56,14 +63,15 @@ def course_detail(slug):
     
     return render_template('course_detail.html', 
                          config=config,
-                         course=course)
+                         course=course,
+                         related=related_items('courses', course.id))
 
 @main_bp.route('/blog')
 def blog():
     config = SiteConfig.query.first()
     page = request.args.get('page', 1, type=int)
     posts = BlogPost.query.filter_by(published=True).order_by(BlogPost.created_at.desc()).paginate(
-        page=page, per_page=6, error_out=False)
+        page=page, per_page=BLOG_PER_PAGE, error_out=False)
     
     return render_template('blog.html', 
                          config=config,
@@ -76,7 +84,8 @@ def blog_post(slug):
     
     return render_template('blog_post.html', 
                          config=config,
-                         post=post)
+                         post=post,
+                         related=related_items('blog', post.id))
 
 @main_bp.route('/contacto', methods=['GET', 'POST'])
 def contact():
@@ -105,6 +114,7 @@ def contact():
             return redirect(url_for('main.contact'))
         
         # Enviar email (opcional)
+        mail_start = time.perf_counter()
         try:
             recipient_email = 'admin@codexsoto.com'
             if config and config.contact_email:
@@ -116,7 +126,9 @@ def contact():
                 body=f'Nombre: {name}\nEmail: {email}\n\nMensaje:\n{message}'
             )
             mail.send(msg)
+            metrics.observe_mail(time.perf_counter() - mail_start, ok=True)
         except Exception as e:
+            metrics.observe_mail(time.perf_counter() - mail_start, ok=False)
             print(f"Error enviando email: {e}")
         
         flash('Mensaje enviado correctamente. Te contactaré pronto.', 'success')
@@ -131,4 +143,25 @@ def project_detail(slug):
     
     return render_template('project_detail.html', 
                          config=config,
-                         project=project)
+                         project=project,
+                         related=related_items('projects', project.id))
+
+@main_bp.route('/sitemap.xml')
+@main_bp.route('/<any("feed.xml", "atom.xml"):filename>')
+@main_bp.route('/sitemap-<int:part>.xml')
+def feed_file(filename='sitemap.xml', part=None):
+    """Sitemap y feeds pregenerados; en producción nginx los sirve directamente"""
+    from app.utils.feeds import generate_feeds
+    
+    if part is not None:
+        filename = f'sitemap-{part}.xml'
+    feeds_dir = current_app.config['FEEDS_DIR']
+    if not os.path.exists(os.path.join(feeds_dir, 'sitemap.xml')):
+        generate_feeds()
+    if not os.path.exists(os.path.join(feeds_dir, filename)):
+        abort(404)
+    
+    mimetypes = {'feed.xml': 'application/rss+xml', 'atom.xml': 'application/atom+xml'}
+    # conditional=True responde 304 a If-None-Match / If-Modified-Since
+    return send_from_directory(feeds_dir, filename, mimetype=mimetypes.get(filename, 'application/xml'),
+                               conditional=True, max_age=300)
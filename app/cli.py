@@ -0,0 +1,227 @@
+import os
+import click
+from flask.cli import AppGroup, ScriptInfo, with_appcontext
+from app.extensions import db
+
+class LazyMigrateGroup(click.Group):
+    """Grupo `flask db` que carga Flask-Migrate (y alembic) solo al invocarlo"""
+    
+    def _migrate_group(self, ctx):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as db_cli_group
+        
+        app = ctx.ensure_object(ScriptInfo).load_app()
+        if 'migrate' not in app.extensions:
+            Migrate(app, db)
+        return db_cli_group
+    
+    def list_commands(self, ctx):
+        return self._migrate_group(ctx).list_commands(ctx)
+    
+    def get_command(self, ctx, name):
+        return self._migrate_group(ctx).get_command(ctx, name)
+
+def bootstrap_database():
+    """Crea las tablas, el usuario admin y la configuración por defecto del sitio"""
+    from werkzeug.security import generate_password_hash
+    from app.models.user import User
+    from app.models.site_config import SiteConfig
+    from app.models.analytics import PageView, VisitorStats  # noqa: F401 (registrar tablas)
+    from app.models.related import RelatedContent  # noqa: F401
+    from app.utils.counters import reconcile_counters
+
+    db.create_all()
+
+    # Crear usuario admin por defecto
+    created_admin = False
+    admin_user = User.query.filter_by(username='admin').first()
+    if not admin_user:
+        admin_user = User(
+            username='admin',
+            email=os.environ.get('ADMIN_EMAIL', 'admin@codexsoto.com'),
+            password_hash=generate_password_hash(os.environ.get('ADMIN_PASSWORD', 'admin123')),
+            is_admin=True
+        )
+        db.session.add(admin_user)
+        created_admin = True
+
+    # Crear configuración por defecto del sitio
+    created_config = False
+    site_config = SiteConfig.query.first()
+    if not site_config:
+        site_config = SiteConfig(
+            site_name='CodexSoto',
+            site_description='Investigación en IA, Automatizaciones y Cursos',
+            primary_color='#3b82f6',
+            secondary_color='#1e40af',
+            dark_mode=False,
+            hero_title='David Soto',
+            hero_subtitle='Especialista en Inteligencia Artificial y Automatizaciones',
+            about_text='Investigador y desarrollador especializado en IA, machine learning y automatización de procesos.'
+        )
+        db.session.add(site_config)
+        created_config = True
+
+    db.session.commit()
+
+    # Crear (o corregir) la fila de contadores del dashboard
+    reconcile_counters()
+    return created_admin, created_config
+
+@click.command('bootstrap')
+@with_appcontext
+def bootstrap_command():
+    """Inicializa la base de datos con los datos por defecto"""
+    created_admin, created_config = bootstrap_database()
+    click.echo('✓ Tablas creadas')
+    click.echo('✓ Usuario admin creado' if created_admin else '• Usuario admin ya existe')
+    click.echo('✓ Configuración del sitio creada' if created_config else '• Configuración del sitio ya existe')
+
+content_cli = AppGroup('content', help='Importar y exportar posts, cursos y proyectos')
+
+def _detect_format(path, fmt):
+    if fmt:
+        return fmt
+    return 'markdown' if os.path.isdir(path) or not os.path.splitext(path)[1] else 'jsonl'
+
+@content_cli.command('import')
+@click.argument('content_type', type=click.Choice(['blog', 'courses', 'projects']))
+@click.argument('path', type=click.Path(exists=True))
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'markdown']),
+              help='Formato de entrada (por defecto según la ruta)')
+@click.option('--chunk-size', default=1000, show_default=True, help='Registros por INSERT')
+@click.option('--workers', type=int, help='Procesos para las imágenes (por defecto, uno por CPU)')
+def content_import_command(content_type, path, fmt, chunk_size, workers):
+    """Importar contenido desde JSONL o un directorio de Markdown"""
+    import time
+    from app.utils.content_io import import_content
+    
+    start = time.perf_counter()
+    imported, skipped = import_content(content_type, path, _detect_format(path, fmt),
+                                       chunk_size=chunk_size, workers=workers)
+    elapsed = time.perf_counter() - start
+    click.echo(f'✓ {imported} registros importados en {elapsed:.2f}s')
+    if skipped:
+        click.echo(f'• {skipped} registros omitidos por campos obligatorios vacíos')
+
+@content_cli.command('export')
+@click.argument('content_type', type=click.Choice(['blog', 'courses', 'projects']))
+@click.argument('path', type=click.Path())
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'markdown']),
+              help='Formato de salida (por defecto según la ruta)')
+@click.option('--published-only', is_flag=True, help='Exportar solo el contenido publicado')
+def content_export_command(content_type, path, fmt, published_only):
+    """Exportar contenido a JSONL o a un directorio de Markdown"""
+    from app.utils.content_io import export_content
+    
+    count = export_content(content_type, path, _detect_format(path, fmt), published_only=published_only)
+    click.echo(f'✓ {count} registros exportados a {path}')
+
+@content_cli.command('feeds')
+def content_feeds_command():
+    """Regenerar sitemap.xml y los feeds RSS/Atom"""
+    from app.utils.feeds import generate_feeds
+    
+    total, files = generate_feeds()
+    click.echo(f'✓ {total} URLs en el sitemap; archivos: {", ".join(files)}')
+
+@content_cli.command('related')
+@click.option('--count', type=int, help='Relacionados por registro (por defecto, RELATED_COUNT)')
+def content_related_command(count):
+    """Recalcular el contenido relacionado (TF-IDF y similitud coseno)"""
+    import time
+    from app.utils.related import refresh_related
+    
+    start = time.perf_counter()
+    updated, total = refresh_related(count=count)
+    elapsed = time.perf_counter() - start
+    click.echo(f'✓ {total} registros procesados en {elapsed:.2f}s, {updated} listas actualizadas')
+
+@click.command('freeze')
+@click.option('--workers', type=int, help='Procesos de renderizado (por defecto, uno por CPU)')
+@with_appcontext
+def freeze_command(workers):
+    """Renderizar las páginas públicas a HTML estático para nginx"""
+    import time
+    from app.utils.freeze import freeze_site
+    
+    start = time.perf_counter()
+    rendered, removed, total = freeze_site(workers=workers)
+    elapsed = time.perf_counter() - start
+    click.echo(f'✓ {rendered} páginas renderizadas en {elapsed:.2f}s ({total} en total)')
+    if removed:
+        click.echo(f'• {removed} páginas eliminadas')
+
+cache_cli = AppGroup('cache', help='Cache de páginas de nginx')
+
+@cache_cli.command('purge')
+@click.argument('keys', nargs=-1)
+def cache_purge_command(keys):
+    """Purgar las páginas con alguna de las claves (p. ej. blog:12 blog:list); sin claves, todas"""
+    from flask import current_app
+    from app.utils.edge_cache import purge_surrogate_keys
+    
+    if not current_app.config.get('EDGE_CACHE_DIR'):
+        raise click.ClickException('EDGE_CACHE_DIR no está configurado')
+    purged = purge_surrogate_keys(keys)
+    click.echo(f'✓ {purged} páginas purgadas')
+
+counters_cli = AppGroup('counters', help='Contadores del dashboard')
+
+@counters_cli.command('reconcile')
+def counters_reconcile_command():
+    """Recalcular los contadores del dashboard y corregir las desviaciones"""
+    from app.utils.counters import reconcile_counters
+    
+    drift = reconcile_counters()
+    if not drift:
+        click.echo('✓ Contadores al día')
+        return
+    for name, (stored, actual) in sorted(drift.items()):
+        click.echo(f'• {name}: {stored} -> {actual}')
+    click.echo(f'✓ {len(drift)} contadores corregidos')
+
+analytics_cli = AppGroup('analytics', help='Mantenimiento de las estadísticas de visitas')
+
+@analytics_cli.command('rollup')
+def analytics_rollup_command():
+    """Reconstruir los buckets horarios de vistas desde las páginas vistas"""
+    from app.utils.analytics import rebuild_rollup
+    
+    buckets = rebuild_rollup()
+    click.echo(f'✓ {buckets} buckets horarios reconstruidos')
+
+@analytics_cli.command('sessions')
+@click.option('--full', is_flag=True, help='Recalcular todo el histórico ignorando la marca de agua')
+@click.option('--gap', default=30, show_default=True, help='Minutos de inactividad que cierran una sesión')
+@click.option('--chunk-size', default=5000, show_default=True, help='Filas leídas por bloque')
+def analytics_sessions_command(full, gap, chunk_size):
+    """Calcular rebote y duración media de sesión por día"""
+    from app.utils.sessionization import sessionize
+    
+    days, hits = sessionize(full=full, gap_minutes=gap, chunk_size=chunk_size)
+    click.echo(f'✓ {hits} visitas procesadas, {days} días actualizados')
+
+@analytics_cli.command('ingest-log')
+@click.argument('path', default=lambda: os.environ.get('NGINX_ACCESS_LOG', '/var/log/nginx/access.log'))
+@click.option('--follow', is_flag=True, help='Seguir el log como tail -F')
+@click.option('--interval', default=1.0, show_default=True, help='Segundos entre lecturas con --follow')
+@click.option('--batch-size', default=5000, show_default=True, help='Visitas por INSERT')
+@click.option('--rollup-only', is_flag=True, help='Cargar solo los buckets horarios, sin filas en page_view')
+def analytics_ingest_log_command(path, follow, interval, batch_size, rollup_only):
+    """Cargar páginas vistas desde el access.log de nginx"""
+    from app.utils.access_log import ingest_access_log
+    
+    lines, loaded, bots = ingest_access_log(path, batch_size=batch_size, pageviews=not rollup_only,
+                                            follow=follow, interval=interval)
+    click.echo(f'✓ {lines} líneas leídas, {loaded} páginas vistas cargadas, {bots} visitas de bots descartadas')
+
+def init_cli(app):
+    """Registrar los comandos de la CLI de flask"""
+    app.cli.add_command(bootstrap_command)
+    app.cli.add_command(freeze_command)
+    app.cli.add_command(LazyMigrateGroup('db', help='Migraciones de base de datos (Flask-Migrate)'))
+    app.cli.add_command(content_cli)
+    app.cli.add_command(cache_cli)
+    app.cli.add_command(counters_cli)
+    app.cli.add_command(analytics_cli)
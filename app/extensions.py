@@ -1,12 +1,14 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
-from flask_migrate import Migrate
 from flask_mail import Mail
 from flask_wtf.csrf import CSRFProtect
+from app.utils.database import RoutingSession
 
 # Instancias globales
-db = SQLAlchemy()
+# RoutingSession envía las lecturas públicas a la réplica (ver app/utils/database.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
-migrate = Migrate()
 mail = Mail()
 csrf = CSRFProtect()
+
+# Flask-Migrate (alembic) se inicializa al usar `flask db`, ver app/cli.py
@@ -5,5 +5,7 @@ from .course import Course
 from .project import Project
 from .site_config import SiteConfig
 from .contact import ContactMessage
+from .counters import ContentCounters
+from .related import RelatedContent
 
-__all__ = ['User', 'BlogPost', 'Course', 'Project', 'SiteConfig', 'ContactMessage']
+__all__ = ['User', 'BlogPost', 'Course', 'Project', 'SiteConfig', 'ContactMessage', 'ContentCounters', 'RelatedContent']
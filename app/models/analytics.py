@@ -3,6 +3,11 @@ from datetime import datetime
 import json
 
 class PageView(db.Model):
+    __table_args__ = (
+        # Recorrido ordenado por visitante y hora de la sesionización
+        db.Index('ix_page_view_visitor_time', 'ip_address', 'created_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     ip_address = db.Column(db.String(45))  # IPv6 puede ser hasta 45 caracteres
     user_agent = db.Column(db.Text)
@@ -11,6 +16,8 @@ class PageView(db.Model):
     country = db.Column(db.String(100))
     device = db.Column(db.String(50))  # mobile, desktop, tablet
     browser = db.Column(db.String(50))
+    # Visitas que representa la fila con el muestreo del tracker (1 = sin muestreo)
+    sample_weight = db.Column(db.Integer, default=1, server_default='1', nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __repr__(self):
@@ -37,3 +44,58 @@ class VisitorStats(db.Model):
     
     def __repr__(self):
         return f'<VisitorStats {self.date}: {self.unique_visitors} visitors>'
+
+class PageViewRollup(db.Model):
+    """Vistas agregadas por hora, página, dispositivo y navegador"""
+    __tablename__ = 'page_view_rollup'
+    __table_args__ = (
+        db.UniqueConstraint('hour', 'page', 'device', 'browser', name='uq_rollup_bucket'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    hour = db.Column(db.Integer, nullable=False, index=True)  # Horas UTC desde 1970-01-01
+    page = db.Column(db.String(255), nullable=False)
+    device = db.Column(db.String(50), nullable=False)
+    browser = db.Column(db.String(50), nullable=False)
+    views = db.Column(db.Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f'<PageViewRollup {self.hour} {self.page}: {self.views}>'
+
+class AnalyticsWatermark(db.Model):
+    """Hasta dónde ha procesado cada trabajo incremental de analytics"""
+    __tablename__ = 'analytics_watermark'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    position = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<AnalyticsWatermark {self.name}: {self.position}>'
+
+class AccessLogCursor(db.Model):
+    """Posición leída de cada access.log de nginx (inode y offset en bytes)"""
+    __tablename__ = 'access_log_cursor'
+    
+    path = db.Column(db.String(500), primary_key=True)
+    inode = db.Column(db.BigInteger)
+    offset = db.Column(db.BigInteger, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<AccessLogCursor {self.path}: {self.offset}>'
+
+class BotHitStats(db.Model):
+    """Visitas automatizadas descartadas por el tracker, por día y motivo"""
+    __tablename__ = 'bot_hit_stats'
+    __table_args__ = (
+        db.UniqueConstraint('date', 'reason', name='uq_bot_hits_day_reason'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    reason = db.Column(db.String(20), nullable=False)  # user_agent, empty_ua, headers, rate
+    hits = db.Column(db.Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f'<BotHitStats {self.date} {self.reason}: {self.hits}>'
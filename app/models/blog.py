@@ -10,7 +10,7 @@ class BlogPost(db.Model):
     tags = db.Column(db.String(500))  # Tags separados por comas
     image_url = db.Column(db.String(255))  # Cambiado de featured_image a image_url
     published = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def __repr__(self):
@@ -0,0 +1,20 @@
+from app.extensions import db
+from datetime import datetime
+
+class ContentCounters(db.Model):
+    """Fila única con los contadores del dashboard, mantenida por eventos del ORM"""
+    __tablename__ = 'content_counters'
+
+    id = db.Column(db.Integer, primary_key=True)
+    total_posts = db.Column(db.Integer, default=0, nullable=False)
+    published_posts = db.Column(db.Integer, default=0, nullable=False)
+    total_courses = db.Column(db.Integer, default=0, nullable=False)
+    published_courses = db.Column(db.Integer, default=0, nullable=False)
+    total_projects = db.Column(db.Integer, default=0, nullable=False)
+    published_projects = db.Column(db.Integer, default=0, nullable=False)
+    total_messages = db.Column(db.Integer, default=0, nullable=False)
+    unread_messages = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ContentCounters posts={self.total_posts} messages={self.total_messages}>'
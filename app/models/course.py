@@ -15,7 +15,7 @@ class Course(db.Model):
     video_url = db.Column(db.String(255))  # URL del video promocional
     published = db.Column(db.Boolean, default=False)
     featured = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def __repr__(self):
@@ -14,7 +14,7 @@ class Project(db.Model):
     image_url = db.Column(db.String(255))  # Cambiado de featured_image a image_url
     published = db.Column(db.Boolean, default=False)
     featured = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def __repr__(self):
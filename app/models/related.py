@@ -0,0 +1,25 @@
+from app.extensions import db
+
+class RelatedContent(db.Model):
+    """
+    Contenido relacionado precalculado: los vecinos más parecidos de cada post, curso
+    o proyecto, con el título y el slug copiados para mostrarlos sin otra consulta
+    """
+    __tablename__ = 'related_content'
+    __table_args__ = (
+        # También es el índice de la consulta de las páginas de detalle
+        db.UniqueConstraint('kind', 'item_id', 'position', name='uq_related_content_item'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # blog, courses, projects
+    item_id = db.Column(db.Integer, nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+    related_kind = db.Column(db.String(20), nullable=False)
+    related_id = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    slug = db.Column(db.String(200), nullable=False)
+    score = db.Column(db.Float, nullable=False)  # Similitud coseno
+    
+    def __repr__(self):
+        return f'<RelatedContent {self.kind}:{self.item_id} -> {self.related_kind}:{self.related_id}>'
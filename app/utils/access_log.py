@@ -0,0 +1,209 @@
+import calendar
+import os
+import re
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from flask import current_app
+from app.extensions import db
+from app.models.analytics import AccessLogCursor, PageView
+from app.utils.analytics import add_bot_hits, add_rollup_views, hour_bucket, is_trackable_path, parse_user_agent
+from app.utils.bots import DEFAULT_BOT_MAX_HITS_PER_MINUTE, RateTracker, classify_request
+from app.utils.geoip import lookup_country
+
+# Formato `main` de nginx.conf:
+# $remote_addr - $remote_user [$time_local] "$request" $status $body_bytes_sent
+# "$http_referer" "$http_user_agent" "$http_x_forwarded_for"
+LOG_LINE = re.compile(
+    r'(?P<remote_addr>\S+) - \S+ \[(?P<time>[^\]]+)\] '
+    r'"(?P<method>[A-Z]+) (?P<target>\S+)[^"]*" (?P<status>\d{3}) \S+ '
+    r'"(?P<referrer>[^"]*)" "(?P<user_agent>[^"]*)" "(?P<forwarded_for>[^"]*)"'
+)
+
+MONTHS = {name: index for index, name in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), start=1)}
+
+DEFAULT_ACCESS_LOG = '/var/log/nginx/access.log'
+
+# Visitas por INSERT al cargar el log
+DEFAULT_LOG_BATCH = 5000
+
+# Bytes leídos del archivo por lectura
+READ_SIZE = 1024 * 1024
+
+def parse_log_time(value):
+    """'10/Oct/2024:13:55:36 +0200' -> datetime UTC sin zona (más rápido que strptime)"""
+    moment = datetime(
+        int(value[7:11]), MONTHS[value[3:6]], int(value[0:2]),
+        int(value[12:14]), int(value[15:17]), int(value[18:20])
+    )
+    sign = -1 if value[21] == '-' else 1
+    offset = timedelta(hours=int(value[22:24]), minutes=int(value[24:26]))
+    return moment - sign * offset
+
+def parse_log_line(line):
+    """Convertir una línea del log en una visita, o None si no es una página vista"""
+    match = LOG_LINE.match(line)
+    if match is None or match['method'] != 'GET' or int(match['status']) >= 400:
+        return None
+
+    page = match['target'].split('?', 1)[0]
+    if not is_trackable_path(page):
+        return None
+
+    # Misma regla que get_client_ip: primera IP de X-Forwarded-For si existe
+    forwarded_for = match['forwarded_for']
+    if forwarded_for and forwarded_for != '-':
+        ip_address = forwarded_for.split(',')[0].strip()
+    else:
+        ip_address = match['remote_addr']
+
+    user_agent = '' if match['user_agent'] == '-' else match['user_agent']
+    referrer = '' if match['referrer'] == '-' else match['referrer']
+    device, browser = parse_user_agent(user_agent)
+    return {
+        'ip_address': ip_address[:45],
+        'user_agent': user_agent,
+        'page': page[:255],
+        'referrer': referrer[:500],
+        'country': lookup_country(ip_address),
+        'device': device,
+        'browser': browser,
+        'created_at': parse_log_time(match['time']),
+    }
+
+def read_lines(f, offset):
+    """
+    Leer las líneas completas desde `offset`.
+    Genera (línea, offset tras la línea); una línea sin salto final se deja para la próxima lectura.
+    """
+    f.seek(offset)
+    pending = b''
+    while True:
+        data = f.read(READ_SIZE)
+        if not data:
+            return
+        data = pending + data
+        start = 0
+        while True:
+            end = data.find(b'\n', start)
+            if end == -1:
+                break
+            offset += end + 1 - start
+            yield data[start:end].decode('utf-8', errors='replace'), offset
+            start = end + 1
+        pending = data[start:]
+
+class LogLoader:
+    """Carga las visitas del log por lotes y guarda la posición en la misma transacción"""
+
+    def __init__(self, path, batch_size=DEFAULT_LOG_BATCH, pageviews=True):
+        self.path = path
+        self.batch_size = batch_size
+        self.pageviews = pageviews
+        self.cursor = db.session.get(AccessLogCursor, path)
+        if self.cursor is None:
+            self.cursor = AccessLogCursor(path=path, inode=None, offset=0)
+            db.session.add(self.cursor)
+        self.hits = []
+        self.lines = 0
+        self.loaded = 0
+        # Filtro de bots con la hora de cada línea; el log no trae Accept ni Accept-Language
+        self.filter_bots = current_app.config.get('BOT_FILTER_ENABLED', True)
+        self.rate_tracker = RateTracker(
+            current_app.config.get('BOT_MAX_HITS_PER_MINUTE', DEFAULT_BOT_MAX_HITS_PER_MINUTE)
+        )
+        self.bot_counts = Counter()
+        self.bots = 0
+
+    def flush(self, inode, offset):
+        """Insertar el lote pendiente y avanzar el cursor"""
+        if not self.hits and not self.bot_counts and (self.cursor.inode, self.cursor.offset) == (inode, offset):
+            return
+        if self.bot_counts:
+            add_bot_hits(self.bot_counts)
+            self.bot_counts = Counter()
+        if self.hits:
+            if self.pageviews:
+                db.session.execute(insert(PageView), self.hits)
+            buckets = Counter(
+                (hour_bucket(hit['created_at']), hit['page'], hit['device'], hit['browser'])
+                for hit in self.hits
+            )
+            add_rollup_views(buckets)
+            self.loaded += len(self.hits)
+            self.hits = []
+        self.cursor.inode = inode
+        self.cursor.offset = offset
+        db.session.commit()
+
+    def load_file(self, path, inode, offset):
+        """Procesar un archivo desde `offset` hasta su última línea completa"""
+        with open(path, 'rb') as f:
+            for line, offset in read_lines(f, offset):
+                self.lines += 1
+                hit = parse_log_line(line)
+                if hit is None:
+                    continue
+                if self.filter_bots:
+                    reason = classify_request(
+                        hit['user_agent'], hit['ip_address'], rate_tracker=self.rate_tracker,
+                        now=calendar.timegm(hit['created_at'].utctimetuple())
+                    )
+                    if reason:
+                        self.bot_counts[(hit['created_at'].date(), reason)] += 1
+                        self.bots += 1
+                        continue
+                self.hits.append(hit)
+                if len(self.hits) >= self.batch_size:
+                    self.flush(inode, offset)
+        self.flush(inode, offset)
+        return offset
+
+    def _rotated_path(self):
+        """Archivo al que logrotate movió el log anterior (sin comprimir)"""
+        rotated = f'{self.path}.1'
+        if os.path.exists(rotated) and os.stat(rotated).st_ino == self.cursor.inode:
+            return rotated
+        return None
+
+    def run_once(self):
+        """Leer lo nuevo del log, terminando antes el archivo rotado si cambió"""
+        stat = os.stat(self.path)
+        offset = self.cursor.offset or 0
+
+        if self.cursor.inode is not None and self.cursor.inode != stat.st_ino:
+            # El log rotó: acabar el archivo anterior y empezar el nuevo desde el principio
+            rotated = self._rotated_path()
+            if rotated:
+                self.load_file(rotated, self.cursor.inode, offset)
+            offset = 0
+        elif stat.st_size < offset:
+            # Truncado (copytruncate): empezar de nuevo
+            offset = 0
+
+        return self.load_file(self.path, stat.st_ino, offset)
+
+    def follow(self, interval=1.0):
+        """Seguir el log como `tail -F` hasta que se interrumpa"""
+        while True:
+            try:
+                self.run_once()
+            except FileNotFoundError:
+                # Entre la rotación y la reapertura de nginx el log puede no existir
+                pass
+            time.sleep(interval)
+
+def ingest_access_log(path=DEFAULT_ACCESS_LOG, batch_size=DEFAULT_LOG_BATCH, pageviews=True,
+                      follow=False, interval=1.0):
+    """
+    Cargar páginas vistas desde el access.log de nginx.
+    Retorna (líneas leídas, visitas cargadas, visitas de bots descartadas).
+    """
+    loader = LogLoader(path, batch_size=batch_size, pageviews=pageviews)
+    if follow:
+        loader.follow(interval)
+    else:
+        loader.run_once()
+    return loader.lines, loader.loaded, loader.bots
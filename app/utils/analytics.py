@@ -1,76 +1,127 @@
 from flask import request, g
-from app.models.analytics import PageView, VisitorStats
+from app.models.analytics import PageView, VisitorStats, PageViewRollup, BotHitStats
 from app.extensions import db
-from datetime import datetime, date
+from app.utils.database import use_primary
+from app.utils.live_stats import live_stats
+from app.utils.bots import bot_counter, classify_request, rate_tracker
+from app.utils.geoip import lookup_country
+from app.utils.instrumentation import timed
+from app.utils.metrics import metrics
+from app.utils.sampling import visit_sampler
+from collections import Counter
+from datetime import datetime
 from sqlalchemy import func
+import calendar
 import json
 import re
 
 def init_analytics(app):
     """Inicializar el sistema de analytics"""
     
+    # Con el tracker desactivado las visitas se cargan desde el log de nginx
+    # (flask analytics ingest-log) y el request no hace ningún trabajo de analytics
+    if not app.config.get('ANALYTICS_TRACKER_ENABLED', True):
+        return
+    
     @app.before_request
     def track_page_view():
         """Trackear cada visita a páginas públicas"""
         # Solo trackear páginas públicas (no admin, API, etc.)
         if should_track_page():
-            try:
-                # Obtener información del visitante
-                ip_address = get_client_ip()
-                user_agent = request.headers.get('User-Agent', '')
-                page = request.path
-                referrer = request.headers.get('Referer', '')
-                
-                # Analizar user agent para obtener dispositivo y navegador
-                device, browser = parse_user_agent(user_agent)
-                
-                # Crear registro de vista de página
-                page_view = PageView(
-                    ip_address=ip_address,
-                    user_agent=user_agent,
-                    page=page,
-                    referrer=referrer,
-                    device=device,
-                    browser=browser
-                )
-                
-                db.session.add(page_view)
-                db.session.commit()
-                
-                # Actualizar estadísticas diarias
-                update_daily_stats(page)
-                
-            except Exception as e:
-                # En caso de error, continuar sin trackear
-                db.session.rollback()
-                app.logger.error(f"Error tracking page view: {e}")
+            # Tiempo del tracker en la cabecera Server-Timing
+            with timed('analytics'):
+                try:
+                    # Obtener información del visitante
+                    ip_address = get_client_ip()
+                    user_agent = request.headers.get('User-Agent', '')
+                    page = request.path
+                    referrer = request.headers.get('Referer', '')
+                    
+                    # Descartar bots antes de escribir nada; solo se cuentan por motivo
+                    # y el contador se vuelca cada BOT_STATS_FLUSH_SECONDS
+                    if app.config.get('BOT_FILTER_ENABLED', True):
+                        reason = classify_request(user_agent, ip_address, request.headers, rate_tracker)
+                        if reason:
+                            bot_counter.record(reason)
+                            metrics.count_analytics('bot')
+                            pending_bots = bot_counter.take_due()
+                            if pending_bots:
+                                add_bot_hits(pending_bots)
+                                db.session.commit()
+                            return
+                    
+                    # Analizar user agent para obtener dispositivo y navegador
+                    device, browser = parse_user_agent(user_agent)
+                    
+                    # Alimentar el stream en vivo del dashboard (solo memoria, sin muestreo)
+                    live_stats.record(page, device, browser)
+                    
+                    # Muestreo por visitante: fuera de la muestra no se escribe nada
+                    weight = visit_sampler.weight(ip_address)
+                    if not weight:
+                        metrics.count_analytics('sampled')
+                        return
+                    
+                    # Crear registro de vista de página; representa `weight` visitas
+                    page_view = PageView(
+                        ip_address=ip_address,
+                        user_agent=user_agent,
+                        page=page,
+                        referrer=referrer,
+                        country=lookup_country(ip_address),
+                        device=device,
+                        browser=browser,
+                        sample_weight=weight
+                    )
+                    
+                    with visit_sampler.writing():
+                        db.session.add(page_view)
+                        # Sumar la vista al bucket horario en la misma transacción
+                        add_rollup_views({(hour_bucket(datetime.utcnow()), page, device, browser): weight})
+                        add_bot_hits(bot_counter.take_due())
+                        db.session.commit()
+                        metrics.count_analytics('recorded')
+                        
+                        # Actualizar estadísticas diarias (leyendo del primario lo recién escrito)
+                        with use_primary():
+                            update_daily_stats(page, weight)
+                    
+                except Exception as e:
+                    # En caso de error, continuar sin trackear
+                    db.session.rollback()
+                    metrics.count_analytics('error')
+                    app.logger.error(f"Error tracking page view: {e}")
 
-def should_track_page():
-    """Determinar si se debe trackear la página actual"""
-    path = request.path
-    
-    # No trackear rutas de admin, API, archivos estáticos
-    exclude_patterns = [
-        r'^/admin',
-        r'^/api',
-        r'^/static',
-        r'^/favicon',
-        r'^/_',
-        r'\.css$',
-        r'\.js$',
-        r'\.png$',
-        r'\.jpg$',
-        r'\.jpeg$',
-        r'\.gif$',
-        r'\.ico$'
-    ]
-    
-    for pattern in exclude_patterns:
+# No trackear rutas de admin, API, archivos estáticos
+EXCLUDE_PATTERNS = [
+    r'^/admin',
+    r'^/api',
+    r'^/static',
+    r'^/favicon',
+    r'^/metrics',
+    r'^/_',
+    r'\.css$',
+    r'\.js$',
+    r'\.png$',
+    r'\.jpg$',
+    r'\.jpeg$',
+    r'\.gif$',
+    r'\.ico$',
+    r'\.xml$'
+]
+
+def is_trackable_path(path):
+    """Determinar si una ruta cuenta como página vista"""
+    for pattern in EXCLUDE_PATTERNS:
         if re.search(pattern, path):
             return False
     
     return True
 
+def should_track_page():
+    """Determinar si se debe trackear la página actual"""
+    return is_trackable_path(request.path)
+
 def get_client_ip():
     """Obtener la IP real del cliente"""
     # Intentar obtener IP de headers de proxy
@@ -109,9 +160,87 @@ def parse_user_agent(user_agent):
     
     return device, browser
 
-def update_daily_stats(page):
-    """Actualizar estadísticas diarias"""
-    today = date.today()
+def utc_today():
+    """Día UTC actual: el mismo criterio que la sesionización (created_at se guarda en UTC)"""
+    return datetime.utcnow().date()
+
+def hour_bucket(moment):
+    """Horas UTC transcurridas desde 1970-01-01 (clave del bucket horario)"""
+    return calendar.timegm(moment.utctimetuple()) // 3600
+
+def upsert_counts(model_class, rows, keys, counter):
+    """Sumar `counter` de cada fila a la existente con las mismas claves, o insertarla"""
+    table = model_class.__table__
+    dialect = db.engine.dialect.name
+    
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={counter: table.c[counter] + stmt.excluded[counter]}
+        )
+        db.session.execute(stmt, rows)
+        return
+    
+    # Otros motores: leer y actualizar cada fila
+    for row in rows:
+        existing = model_class.query.filter_by(**{key: row[key] for key in keys}).first()
+        if existing:
+            setattr(existing, counter, getattr(existing, counter) + row[counter])
+        else:
+            db.session.add(model_class(**row))
+
+def add_rollup_views(buckets):
+    """
+    Sumar vistas a los buckets horarios con un upsert.
+    `buckets` mapea (hora, página, dispositivo, navegador) -> vistas.
+    """
+    if not buckets:
+        return
+    rows = [
+        {'hour': hour, 'page': page, 'device': device or 'other', 'browser': browser or 'other', 'views': views}
+        for (hour, page, device, browser), views in buckets.items()
+    ]
+    upsert_counts(PageViewRollup, rows, ('hour', 'page', 'device', 'browser'), 'views')
+
+def add_bot_hits(counts):
+    """Sumar visitas de bots; `counts` mapea (día, motivo) -> visitas"""
+    if not counts:
+        return
+    rows = [{'date': day, 'reason': reason, 'hits': hits} for (day, reason), hits in counts.items()]
+    upsert_counts(BotHitStats, rows, ('date', 'reason'), 'hits')
+
+def rebuild_rollup(chunk_size=10000):
+    """Reconstruir los buckets horarios a partir de todas las páginas vistas"""
+    buckets = Counter()
+    query = db.session.query(PageView.created_at, PageView.page, PageView.device, PageView.browser,
+                             PageView.sample_weight)
+    for created_at, page, device, browser, weight in query.yield_per(chunk_size):
+        if created_at is not None:
+            buckets[(hour_bucket(created_at), page, device, browser)] += weight
+    
+    PageViewRollup.query.delete()
+    add_rollup_views(buckets)
+    db.session.commit()
+    return len(buckets)
+
+def estimated_visitors(*criteria):
+    """
+    Visitantes únicos (por IP) estimados: cada visitante de la muestra cuenta por el
+    menor peso de sus visitas, la tasa más baja con la que se le guardó
+    """
+    per_visitor = db.session.query(
+        func.min(PageView.sample_weight).label('weight')
+    ).filter(PageView.ip_address.isnot(None), *criteria).group_by(PageView.ip_address).subquery()
+    return db.session.query(func.coalesce(func.sum(per_visitor.c.weight), 0)).scalar()
+
+def update_daily_stats(page, weight=1):
+    """Actualizar estadísticas diarias (estimaciones: cada visita suma su peso)"""
+    today = utc_today()
     
     # Obtener o crear registro de estadísticas para hoy
     stats = VisitorStats.query.filter_by(date=today).first()
@@ -125,13 +254,10 @@ def update_daily_stats(page):
         db.session.add(stats)
     
     # Incrementar vistas de página
-    stats.page_views += 1
+    stats.page_views += weight
     
     # Contar visitantes únicos (por IP en el día)
-    unique_ips_today = db.session.query(func.count(func.distinct(PageView.ip_address))).filter(
-        func.date(PageView.created_at) == today
-    ).scalar()
-    stats.unique_visitors = unique_ips_today
+    stats.unique_visitors = estimated_visitors(func.date(PageView.created_at) == today)
     
     # Actualizar páginas más visitadas
     top_pages = get_top_pages_today()
@@ -141,30 +267,35 @@ def update_daily_stats(page):
 
 def get_top_pages_today():
     """Obtener las páginas más visitadas del día"""
-    today = date.today()
+    today = utc_today()
     
     results = db.session.query(
         PageView.page,
-        func.count(PageView.id).label('views')
+        func.sum(PageView.sample_weight).label('views')
     ).filter(
         func.date(PageView.created_at) == today
     ).group_by(PageView.page).order_by(
-        func.count(PageView.id).desc()
+        func.sum(PageView.sample_weight).desc()
     ).limit(10).all()
     
     return {page: views for page, views in results}
 
 def get_analytics_summary():
-    """Obtener resumen de analytics para el dashboard"""
+    """Obtener resumen de analytics para el dashboard (totales estimados con los pesos de muestreo)"""
     try:
-        today = date.today()
+        today = utc_today()
         
         # Estadísticas de hoy
         today_stats = VisitorStats.query.filter_by(date=today).first()
         
-        # Estadísticas totales
-        total_views = db.session.query(func.count(PageView.id)).scalar() or 0
-        total_unique_ips = db.session.query(func.count(func.distinct(PageView.ip_address))).scalar() or 0
+        # Visitas automatizadas descartadas hoy (sin contar las aún no volcadas)
+        bot_hits_today = db.session.query(func.coalesce(func.sum(BotHitStats.hits), 0)).filter(
+            BotHitStats.date == today
+        ).scalar()
+        
+        # Estadísticas totales (estimadas a partir de la muestra)
+        total_views = db.session.query(func.sum(PageView.sample_weight)).scalar() or 0
+        total_unique_ips = estimated_visitors()
         
         # Páginas más visitadas (últimos 7 días)
         from datetime import timedelta
@@ -172,11 +303,11 @@ def get_analytics_summary():
         
         top_pages = db.session.query(
             PageView.page,
-            func.count(PageView.id).label('views')
+            func.sum(PageView.sample_weight).label('views')
         ).filter(
             func.date(PageView.created_at) >= week_ago
         ).group_by(PageView.page).order_by(
-            func.count(PageView.id).desc()
+            func.sum(PageView.sample_weight).desc()
         ).limit(5).all()
         
         # Navegadores más usados (últimos 30 días)
@@ -184,31 +315,44 @@ def get_analytics_summary():
         
         browsers = db.session.query(
             PageView.browser,
-            func.count(PageView.id).label('count')
+            func.sum(PageView.sample_weight).label('count')
         ).filter(
             func.date(PageView.created_at) >= month_ago
         ).group_by(PageView.browser).order_by(
-            func.count(PageView.id).desc()
+            func.sum(PageView.sample_weight).desc()
         ).limit(5).all()
         
         # Dispositivos más usados (últimos 30 días)
         devices = db.session.query(
             PageView.device,
-            func.count(PageView.id).label('count')
+            func.sum(PageView.sample_weight).label('count')
         ).filter(
             func.date(PageView.created_at) >= month_ago
         ).group_by(PageView.device).order_by(
-            func.count(PageView.id).desc()
+            func.sum(PageView.sample_weight).desc()
         ).all()
         
+        # Países (últimos 30 días)
+        countries = db.session.query(
+            PageView.country,
+            func.sum(PageView.sample_weight).label('count')
+        ).filter(
+            func.date(PageView.created_at) >= month_ago,
+            PageView.country.isnot(None)
+        ).group_by(PageView.country).order_by(
+            func.sum(PageView.sample_weight).desc()
+        ).limit(10).all()
+        
         return {
             'today_visitors': today_stats.unique_visitors if today_stats else 0,
             'today_views': today_stats.page_views if today_stats else 0,
+            'bot_hits_today': bot_hits_today,
             'total_views': total_views,
             'total_visitors': total_unique_ips,
             'top_pages': [(page, views) for page, views in top_pages],
             'browsers': [(browser, count) for browser, count in browsers],
-            'devices': [(device, count) for device, count in devices]
+            'devices': [(device, count) for device, count in devices],
+            'countries': [(country, count) for country, count in countries]
         }
     
     except Exception as e:
@@ -216,9 +360,11 @@ def get_analytics_summary():
         return {
             'today_visitors': 0,
             'today_views': 0,
+            'bot_hits_today': 0,
             'total_views': 0,
             'total_visitors': 0,
             'top_pages': [],
             'browsers': [],
-            'devices': []
+            'devices': [],
+            'countries': []
         }
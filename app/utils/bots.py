@@ -0,0 +1,95 @@
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+# Agentes automáticos conocidos: buscadores, redes sociales, monitores, clientes HTTP y navegadores sin interfaz
+BOT_USER_AGENT = re.compile(
+    r'bot\b|bot/|crawl|spider|slurp|scrap|archiver|'
+    r'curl|wget|python-requests|python-urllib|httpx|aiohttp|go-http-client|okhttp|java/|'
+    r'libwww|perl|ruby|php/|node-fetch|axios|postman|insomnia|'
+    r'headless|phantomjs|selenium|puppeteer|playwright|'
+    r'uptime|pingdom|statuscake|monitor|check_http|nagios|zabbix|datadog|newrelic|'
+    r'lighthouse|pagespeed|gtmetrix|'
+    r'facebookexternalhit|facebot|whatsapp|telegram|slack|discord|skype|embedly|preview|'
+    r'ahrefs|semrush|mj12|dotbot|petalbot|bytespider|yandex|baidu|'
+    r'feedfetcher|feedly|rss',
+    re.IGNORECASE
+)
+
+# Máximo de visitas por IP y minuto antes de considerarla automatizada
+DEFAULT_BOT_MAX_HITS_PER_MINUTE = 60
+
+# IPs recordadas por el contador de ritmo antes de limpiar ventanas viejas
+RATE_TRACKER_MAX_IPS = 10000
+
+# Segundos entre escrituras del contador de bots en la base de datos
+BOT_STATS_FLUSH_SECONDS = 60
+
+class RateTracker:
+    """Visitas por IP en ventanas fijas de un minuto, en memoria del proceso"""
+
+    def __init__(self, max_hits=DEFAULT_BOT_MAX_HITS_PER_MINUTE):
+        self.max_hits = max_hits
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def hit(self, ip_address, now=None):
+        """Registrar una visita; True si la IP supera el máximo en el minuto actual"""
+        minute = int((now or time.time()) // 60)
+        with self._lock:
+            window, count = self._windows.get(ip_address, (minute, 0))
+            if window != minute:
+                window, count = minute, 0
+            count += 1
+            self._windows[ip_address] = (window, count)
+            if len(self._windows) > RATE_TRACKER_MAX_IPS:
+                self._windows = {ip: entry for ip, entry in self._windows.items() if entry[0] == minute}
+        return count > self.max_hits
+
+def classify_request(user_agent, ip_address, headers=None, rate_tracker=None, now=None):
+    """
+    Motivo por el que la visita parece automatizada, o None si parece de una persona.
+    `headers` es opcional: el log de nginx no incluye Accept ni Accept-Language.
+    """
+    if not user_agent:
+        return 'empty_ua'
+    if BOT_USER_AGENT.search(user_agent):
+        return 'user_agent'
+    # Los navegadores siempre envían Accept y Accept-Language
+    if headers is not None and (not headers.get('Accept') or not headers.get('Accept-Language')):
+        return 'headers'
+    if rate_tracker is not None and ip_address and rate_tracker.hit(ip_address, now):
+        return 'rate'
+    return None
+
+class BotCounter:
+    """Acumula las visitas de bots por motivo y las escribe cada cierto tiempo"""
+
+    def __init__(self, flush_seconds=BOT_STATS_FLUSH_SECONDS):
+        self.flush_seconds = flush_seconds
+        self._counts = Counter()
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, reason, day=None):
+        with self._lock:
+            # Día UTC, como el de las visitas y el del log de nginx
+            self._counts[(day or datetime.utcnow().date(), reason)] += 1
+
+    def take_due(self):
+        """Devolver y vaciar lo acumulado si ya toca escribirlo"""
+        with self._lock:
+            if not self._counts or time.monotonic() - self._last_flush < self.flush_seconds:
+                return None
+            counts, self._counts = self._counts, Counter()
+            self._last_flush = time.monotonic()
+            return counts
+
+rate_tracker = RateTracker()
+bot_counter = BotCounter()
+
+def init_bot_filter(app):
+    """Configurar el umbral de ritmo del filtro de bots"""
+    rate_tracker.max_hits = app.config.get('BOT_MAX_HITS_PER_MINUTE', DEFAULT_BOT_MAX_HITS_PER_MINUTE)
@@ -0,0 +1,89 @@
+import atexit
+import threading
+from blinker import Namespace
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.models.blog import BlogPost
+from app.models.course import Course
+from app.models.project import Project
+from app.models.site_config import SiteConfig
+
+content_signals = Namespace()
+
+# Se envía después de cada commit que cambió contenido público, con la app como
+# sender (los receptores se conectan con sender=app), la sesión en `session` y
+# changes={'blog': {ids}, 'courses': {ids}, 'projects': {ids}, 'config': {ids}}
+content_changed = content_signals.signal('content-changed')
+
+# Modelo -> nombre del tipo de contenido en `changes`
+CONTENT_KINDS = {
+    BlogPost: 'blog',
+    Course: 'courses',
+    Project: 'projects',
+    SiteConfig: 'config',
+}
+
+CHANGES_KEY = 'content_changes'
+
+def note_content_change(session, model_class, ids):
+    """
+    Anotar cambios que no pasan por los eventos del ORM (UPDATE/DELETE masivos,
+    INSERT en bloque); se notifican con el próximo commit de la sesión.
+    """
+    changes = session.info.setdefault(CHANGES_KEY, {})
+    changes.setdefault(CONTENT_KINDS[model_class], set()).update(ids)
+
+def _record_change(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        note_content_change(session, type(target), [target.id])
+
+for _model in CONTENT_KINDS:
+    for _name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(_model, _name, _record_change)
+
+@event.listens_for(Session, 'after_commit')
+def _send_content_changed(session):
+    changes = session.info.pop(CHANGES_KEY, None)
+    if changes and has_app_context():
+        content_changed.send(current_app._get_current_object(), session=session, changes=changes)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_content_changes(session):
+    session.info.pop(CHANGES_KEY, None)
+
+class Debouncer:
+    """
+    Ejecuta `callback` una sola vez `delay` segundos después del último aviso:
+    una ráfaga de ediciones en el admin produce una única regeneración.
+    """
+
+    def __init__(self, delay, callback):
+        self.delay = delay
+        self.callback = callback
+        self._timer = None
+        self._lock = threading.Lock()
+        # Lo pendiente se ejecuta al salir (p. ej. al terminar `flask content import`)
+        atexit.register(self.flush)
+
+    def trigger(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self):
+        with self._lock:
+            self._timer = None
+        self.callback()
+
+    def flush(self):
+        """Ejecutar ya lo pendiente, si lo hay"""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+            self.callback()
@@ -0,0 +1,257 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from flask import current_app
+from sqlalchemy import insert
+from app.extensions import db
+from app.models.blog import BlogPost
+from app.models.course import Course
+from app.models.project import Project
+from app.utils.file_upload import optimize_image_file
+from app.utils.counters import refresh_model_counters
+from app.utils.content_events import note_content_change
+from app.utils.slugs import slugify, SlugAllocator
+
+# Tipos de contenido: nombre en la CLI -> (modelo, carpeta de uploads, campos obligatorios)
+CONTENT_TYPES = {
+    'blog': (BlogPost, 'uploads/blog', ('title', 'content')),
+    'courses': (Course, 'uploads/courses', ('title', 'description')),
+    'projects': (Project, 'uploads/projects', ('title', 'description', 'category')),
+}
+
+# Campo del cuerpo Markdown en cada modelo
+BODY_FIELD = 'content'
+
+DEFAULT_CHUNK_SIZE = 1000
+
+def content_model(content_type):
+    return CONTENT_TYPES[content_type][0]
+
+def content_columns(model_class):
+    """Columnas importables/exportables (todas salvo el id)"""
+    return [column for column in model_class.__table__.columns if column.name != 'id']
+
+# ---------------------------------------------------------------------------
+# Lectura y escritura de JSONL y Markdown con front matter
+# ---------------------------------------------------------------------------
+
+def read_jsonl(path):
+    """Leer registros de un archivo JSONL, uno por línea"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def write_jsonl(path, records):
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+def parse_front_matter_value(value):
+    """Interpretar un valor del front matter: JSON si es posible, si no texto"""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            return value[1:-1]
+        return value
+
+def parse_markdown(text):
+    """Separar el front matter (clave: valor) del cuerpo Markdown"""
+    record = {}
+    body = text
+    if text.startswith('---'):
+        parts = text.split('\n')
+        for index, line in enumerate(parts[1:], start=1):
+            if line.strip() == '---':
+                body = '\n'.join(parts[index + 1:])
+                break
+            if ':' in line:
+                key, value = line.split(':', 1)
+                record[key.strip()] = parse_front_matter_value(value)
+    record[BODY_FIELD] = body.lstrip('\n')
+    return record
+
+def read_markdown_dir(path):
+    """Leer registros de un directorio de archivos .md con front matter"""
+    for filename in sorted(os.listdir(path)):
+        if not filename.endswith('.md'):
+            continue
+        file_path = os.path.join(path, filename)
+        with open(file_path, encoding='utf-8') as f:
+            record = parse_markdown(f.read())
+        record.setdefault('slug', filename[:-3])
+        record['_source_dir'] = path
+        yield record
+
+def render_markdown(record):
+    lines = ['---']
+    for key, value in record.items():
+        if key == BODY_FIELD or value is None:
+            continue
+        lines.append(f'{key}: {json.dumps(value, ensure_ascii=False)}')
+    lines.append('---')
+    lines.append('')
+    lines.append(record.get(BODY_FIELD) or '')
+    return '\n'.join(lines)
+
+def write_markdown_dir(path, records):
+    os.makedirs(path, exist_ok=True)
+    count = 0
+    for record in records:
+        with open(os.path.join(path, f"{record['slug']}.md"), 'w', encoding='utf-8') as f:
+            f.write(render_markdown(record))
+        count += 1
+    return count
+
+def read_records(path, fmt):
+    if fmt == 'markdown':
+        return read_markdown_dir(path)
+    return read_jsonl(path)
+
+# ---------------------------------------------------------------------------
+# Exportación
+# ---------------------------------------------------------------------------
+
+def serialize_row(row, columns):
+    record = {}
+    for column in columns:
+        value = getattr(row, column.name)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        record[column.name] = value
+    return record
+
+def export_content(content_type, path, fmt='jsonl', published_only=False):
+    """Exportar un tipo de contenido recorriendo la tabla por bloques"""
+    model_class = content_model(content_type)
+    columns = content_columns(model_class)
+
+    query = model_class.query.order_by(model_class.id)
+    if published_only:
+        query = query.filter(model_class.published.is_(True))
+
+    records = (serialize_row(row, columns) for row in query.yield_per(DEFAULT_CHUNK_SIZE))
+    if fmt == 'markdown':
+        return write_markdown_dir(path, records)
+    return write_jsonl(path, records)
+
+# ---------------------------------------------------------------------------
+# Importación
+# ---------------------------------------------------------------------------
+
+def _column_defaults(columns):
+    """Valores por defecto de cada columna para completar los registros"""
+    defaults = {}
+    now = datetime.utcnow()
+    for column in columns:
+        default = column.default
+        if default is None:
+            defaults[column.name] = None
+        elif default.is_callable:
+            defaults[column.name] = now
+        else:
+            defaults[column.name] = default.arg
+    return defaults
+
+def _coerce(column, value):
+    """Convertir valores de texto del archivo al tipo de la columna"""
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if python_type is bool and isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes', 'si', 'sí')
+    if python_type is str and isinstance(value, list):
+        # Tags y tecnologías se guardan separados por comas
+        return ','.join(str(item) for item in value)
+    if python_type in (int, float) and isinstance(value, str):
+        return python_type(value)
+    return value
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _image_source(record):
+    """Ruta local de la imagen a procesar, si el registro trae una"""
+    image = record.get('image') or record.get('image_path')
+    if not image or image.startswith(('http://', 'https://', '/static/')):
+        return None
+    if not os.path.isabs(image) and record.get('_source_dir'):
+        image = os.path.join(record['_source_dir'], image)
+    return image if os.path.exists(image) else None
+
+def import_content(content_type, path, fmt='jsonl', chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """
+    Importar contenido en bloques: un INSERT múltiple por bloque, una sola consulta
+    para reservar los slugs y las imágenes procesadas en paralelo.
+    Retorna (importados, omitidos).
+    """
+    model_class, upload_folder, required = CONTENT_TYPES[content_type]
+    columns = content_columns(model_class)
+    defaults = _column_defaults(columns)
+    slug_allocator = SlugAllocator(model_class)
+
+    upload_path = os.path.join(current_app.static_folder, upload_folder)
+    os.makedirs(upload_path, exist_ok=True)
+
+    imported = skipped = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in _chunks(read_records(path, fmt), chunk_size):
+            valid = [record for record in chunk if all(record.get(field) for field in required)]
+            skipped += len(chunk) - len(valid)
+            if not valid:
+                continue
+
+            # Slugs únicos para todo el bloque, sin consultas por candidato
+            base_slugs = [slugify(record.get('slug') or record['title']) or 'item' for record in valid]
+            slugs = slug_allocator.allocate(base_slugs)
+
+            # Procesar las imágenes locales del bloque en paralelo
+            sources = [_image_source(record) for record in valid]
+            pending = [(index, source) for index, source in enumerate(sources) if source]
+            filenames = pool.map(
+                optimize_image_file,
+                [source for _, source in pending],
+                [upload_path] * len(pending),
+            )
+            image_urls = {}
+            for (index, _), filename in zip(pending, filenames):
+                if filename:
+                    image_urls[index] = f"/static/{upload_folder}/{filename}"
+
+            rows = []
+            for index, (record, slug) in enumerate(zip(valid, slugs)):
+                row = dict(defaults)
+                for column in columns:
+                    if column.name in record:
+                        row[column.name] = _coerce(column, record[column.name])
+                row['slug'] = slug
+                if index in image_urls:
+                    row['image_url'] = image_urls[index]
+                rows.append(row)
+
+            result = db.session.execute(insert(model_class).returning(model_class.id), rows)
+            # El INSERT en bloque no dispara eventos del ORM
+            refresh_model_counters(model_class)
+            note_content_change(db.session, model_class, result.scalars().all())
+            db.session.commit()
+            imported += len(rows)
+
+    return imported, skipped
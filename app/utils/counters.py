@@ -0,0 +1,129 @@
+from sqlalchemy import case, event, func, inspect, select, update
+from app.extensions import db
+from app.models.blog import BlogPost
+from app.models.contact import ContactMessage
+from app.models.counters import ContentCounters
+from app.models.course import Course
+from app.models.project import Project
+
+# Id de la única fila de contadores
+COUNTERS_ROW_ID = 1
+
+# Modelo -> (contador total, atributo filtrado, valor que cuenta, contador filtrado)
+COUNTED_MODELS = {
+    BlogPost: ('total_posts', 'published', True, 'published_posts'),
+    Course: ('total_courses', 'published', True, 'published_courses'),
+    Project: ('total_projects', 'published', True, 'published_projects'),
+    ContactMessage: ('total_messages', 'read', False, 'unread_messages'),
+}
+
+counters_table = ContentCounters.__table__
+
+def _apply_deltas(connection, deltas):
+    """Sumar los deltas a la fila de contadores dentro de la transacción en curso"""
+    values = {name: counters_table.c[name] + delta for name, delta in deltas.items() if delta}
+    if values:
+        connection.execute(
+            update(counters_table).where(counters_table.c.id == COUNTERS_ROW_ID).values(**values)
+        )
+
+def count_model(connection, model_class):
+    """Contar filas totales y filtradas de un modelo con una sola consulta"""
+    total_name, attr, value, flag_name = COUNTED_MODELS[model_class]
+    column = getattr(model_class, attr)
+    total, flagged = connection.execute(
+        select(func.count(), func.coalesce(func.sum(case((column == value, 1), else_=0)), 0))
+        .select_from(model_class)
+    ).one()
+    return {total_name: total, flag_name: flagged}
+
+def refresh_model_counters(model_class, connection=None):
+    """
+    Recalcular los contadores de un modelo en la transacción actual.
+    Necesario tras UPDATE/DELETE masivos o inserts en bloque, que no disparan eventos del ORM.
+    """
+    connection = connection or db.session.connection()
+    connection.execute(
+        update(counters_table)
+        .where(counters_table.c.id == COUNTERS_ROW_ID)
+        .values(**count_model(connection, model_class))
+    )
+
+def reconcile_counters():
+    """
+    Recalcular todos los contadores y crear la fila si no existe.
+    Retorna {contador: (guardado, real)} con las diferencias encontradas.
+    """
+    connection = db.session.connection()
+    actual = {}
+    for model_class in COUNTED_MODELS:
+        actual.update(count_model(connection, model_class))
+
+    counters = db.session.get(ContentCounters, COUNTERS_ROW_ID)
+    if counters is None:
+        counters = ContentCounters(id=COUNTERS_ROW_ID)
+        db.session.add(counters)
+
+    drift = {}
+    for name, value in actual.items():
+        stored = getattr(counters, name)
+        if stored != value:
+            drift[name] = (stored, value)
+            setattr(counters, name, value)
+
+    db.session.commit()
+    return drift
+
+def get_counters():
+    """Leer los contadores del dashboard (una fila); la crea si aún no existe"""
+    counters = db.session.get(ContentCounters, COUNTERS_ROW_ID)
+    if counters is None:
+        reconcile_counters()
+        counters = db.session.get(ContentCounters, COUNTERS_ROW_ID)
+    return counters
+
+def _counts(model_class, value):
+    return value == COUNTED_MODELS[model_class][2]
+
+def _after_insert(mapper, connection, target):
+    total_name, attr, _, flag_name = COUNTED_MODELS[mapper.class_]
+    _apply_deltas(connection, {
+        total_name: 1,
+        flag_name: int(_counts(mapper.class_, getattr(target, attr))),
+    })
+
+def _before_delete(mapper, connection, target):
+    total_name, attr, _, flag_name = COUNTED_MODELS[mapper.class_]
+    state = inspect(target)
+    if attr in state.dict:
+        value = state.dict[attr]
+    else:
+        # Atributo expirado: leerlo antes de que la fila desaparezca
+        column = mapper.columns[attr]
+        value = connection.execute(
+            select(column).where(mapper.primary_key[0] == target.id)
+        ).scalar()
+    _apply_deltas(connection, {
+        total_name: -1,
+        flag_name: -int(_counts(mapper.class_, value)),
+    })
+
+def _after_update(mapper, connection, target):
+    _, attr, _, flag_name = COUNTED_MODELS[mapper.class_]
+    history = inspect(target).attrs[attr].history
+    if not history.has_changes():
+        return
+    if not history.deleted:
+        # Sin el valor anterior no se puede calcular el delta
+        refresh_model_counters(mapper.class_, connection)
+        return
+    old_value = history.deleted[0]
+    new_value = history.added[0] if history.added else None
+    _apply_deltas(connection, {
+        flag_name: int(_counts(mapper.class_, new_value)) - int(_counts(mapper.class_, old_value)),
+    })
+
+for _model_class in COUNTED_MODELS:
+    event.listen(_model_class, 'after_insert', _after_insert)
+    event.listen(_model_class, 'before_delete', _before_delete)
+    event.listen(_model_class, 'after_update', _after_update)
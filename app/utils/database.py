@@ -0,0 +1,212 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+# Valores por defecto del pool para PostgreSQL (por proceso de gunicorn)
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_RECYCLE = 1800  # segundos
+DEFAULT_POOL_TIMEOUT = 30  # segundos
+
+# Pragmas de SQLite
+DEFAULT_SQLITE_BUSY_TIMEOUT = 5000  # milisegundos
+DEFAULT_SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # bytes
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    return value.lower() in ('1', 'true', 'yes')
+
+class TimedQueuePool(QueuePool):
+    """QueuePool que mide cuánto espera cada checkout (métrica db_pool_checkout_seconds)"""
+    
+    # Recibe los segundos de espera; lo asigna init_metrics si /metrics está activo
+    checkout_observer = None
+    
+    def connect(self):
+        observer = self.checkout_observer
+        if observer is None:
+            return super().connect()
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            observer(time.perf_counter() - start)
+
+def build_engine_options(database_uri):
+    """Construir SQLALCHEMY_ENGINE_OPTIONS según el motor de base de datos"""
+    if database_uri.startswith('sqlite'):
+        # SQLite no usa pool de red; el timeout del driver cubre los bloqueos
+        return {
+            'connect_args': {
+                'timeout': _env_int('SQLITE_BUSY_TIMEOUT', DEFAULT_SQLITE_BUSY_TIMEOUT) / 1000,
+                'check_same_thread': False,
+            },
+        }
+
+    return {
+        'poolclass': TimedQueuePool,
+        'pool_size': _env_int('DB_POOL_SIZE', DEFAULT_POOL_SIZE),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', DEFAULT_MAX_OVERFLOW),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', DEFAULT_POOL_RECYCLE),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+    }
+
+# Drivers asyncio equivalentes a los de DATABASE_URL (API ASGI)
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+}
+
+def build_async_database_url(database_uri):
+    """Misma base de datos con el driver asyncio (aiosqlite o asyncpg)"""
+    scheme, separator, rest = database_uri.partition('://')
+    if scheme not in ASYNC_DRIVERS:
+        raise ValueError(f'No hay driver asyncio para {scheme}')
+    return f'{ASYNC_DRIVERS[scheme]}{separator}{rest}'
+
+def build_async_engine_options(database_uri):
+    """Opciones de create_async_engine con los mismos límites que el motor síncrono"""
+    if database_uri.startswith('sqlite'):
+        return {
+            'connect_args': {
+                'timeout': _env_int('SQLITE_BUSY_TIMEOUT', DEFAULT_SQLITE_BUSY_TIMEOUT) / 1000,
+            },
+        }
+
+    return {
+        'pool_size': _env_int('DB_POOL_SIZE', DEFAULT_POOL_SIZE),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', DEFAULT_MAX_OVERFLOW),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', DEFAULT_POOL_RECYCLE),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+    }
+
+def get_sqlite_pragmas():
+    """Pragmas aplicados a cada conexión SQLite nueva"""
+    return {
+        # WAL permite lecturas concurrentes mientras se escribe una página vista
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        # NORMAL es seguro con WAL y evita un fsync por commit
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'mmap_size': _env_int('SQLITE_MMAP_SIZE', DEFAULT_SQLITE_MMAP_SIZE),
+        'busy_timeout': _env_int('SQLITE_BUSY_TIMEOUT', DEFAULT_SQLITE_BUSY_TIMEOUT),
+    }
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Aplicar los pragmas de rendimiento al abrir una conexión SQLite"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in get_sqlite_pragmas().items():
+            cursor.execute(f'PRAGMA {pragma}={value}')
+    finally:
+        cursor.close()
+
+# ---------------------------------------------------------------------------
+# Enrutado de lecturas a una réplica
+# ---------------------------------------------------------------------------
+
+REPLICA_BIND_KEY = 'replica'
+
+# Blueprints cuyas peticiones GET/HEAD pueden leer de la réplica
+DEFAULT_REPLICA_BLUEPRINTS = ('main', 'api')
+
+# Segundos que un admin lee del primario después de escribir
+DEFAULT_REPLICA_STICKY_SECONDS = 10
+
+STICKY_SESSION_KEY = '_db_primary_until'
+
+class RoutingSession(Session):
+    """Sesión que envía las consultas de solo lectura a la réplica cuando la petición lo permite"""
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._should_use_replica(clause):
+            return self._db.engines[REPLICA_BIND_KEY]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+    
+    def _should_use_replica(self, clause):
+        # Solo SELECT sin FOR UPDATE, nunca durante un flush
+        if clause is None or not getattr(clause, 'is_select', False):
+            return False
+        if getattr(clause, '_for_update_arg', None) is not None or self._flushing:
+            return False
+        # Lo que esta transacción ya escribió solo está en el primario
+        if self.info.get('wrote'):
+            return False
+        if not has_request_context() or g.get('db_route') != REPLICA_BIND_KEY:
+            return False
+        return REPLICA_BIND_KEY in self._db.engines
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_session_wrote(session, flush_context):
+    session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _remember_commit(session):
+    session.info.pop('wrote', None)
+    if has_request_context():
+        g.db_committed = True
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _clear_session_wrote(session):
+    session.info.pop('wrote', None)
+
+@contextmanager
+def use_primary():
+    """Forzar que las consultas del bloque usen el primario"""
+    previous = g.get('db_route')
+    g.db_route = None
+    try:
+        yield
+    finally:
+        g.db_route = previous
+
+def build_binds(replica_uri):
+    """Construir SQLALCHEMY_BINDS con la réplica, si está configurada"""
+    if not replica_uri:
+        return {}
+    return {REPLICA_BIND_KEY: {'url': replica_uri, **build_engine_options(replica_uri)}}
+
+def init_db_routing(app):
+    """Registrar la selección de primario/réplica por petición"""
+    app.config.setdefault('REPLICA_BLUEPRINTS', DEFAULT_REPLICA_BLUEPRINTS)
+    app.config.setdefault('REPLICA_STICKY_SECONDS', DEFAULT_REPLICA_STICKY_SECONDS)
+    
+    @app.before_request
+    def select_database_route():
+        """Las lecturas públicas van a la réplica salvo tras una escritura reciente del admin"""
+        g.db_route = None
+        if REPLICA_BIND_KEY not in app.config.get('SQLALCHEMY_BINDS', {}):
+            return
+        if request.method not in ('GET', 'HEAD'):
+            return
+        if request.blueprint not in app.config['REPLICA_BLUEPRINTS']:
+            return
+        if session.get(STICKY_SESSION_KEY, 0) > time.time():
+            return
+        g.db_route = REPLICA_BIND_KEY
+    
+    @app.after_request
+    def keep_admin_on_primary(response):
+        """Tras un commit del admin, sus siguientes lecturas usan el primario"""
+        if g.get('db_committed') and request.blueprint == 'admin':
+            session[STICKY_SESSION_KEY] = time.time() + app.config['REPLICA_STICKY_SECONDS']
+        return response
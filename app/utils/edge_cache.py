@@ -0,0 +1,137 @@
+import os
+import re
+from flask import before_render_template, current_app, g, request, session
+from flask_login import current_user
+from flask_sqlalchemy.pagination import Pagination
+from app.utils.content_events import CONTENT_KINDS, content_changed
+
+# Segundos que nginx guarda una página pública (las purgas la renuevan antes)
+DEFAULT_EDGE_CACHE_SECONDS = 600
+
+# Páginas que listan contenido: dependen de cualquier alta, baja o cambio del tipo
+LIST_KEYS = {
+    'main.index': ('blog', 'courses', 'projects'),
+    'main.research': ('projects',),
+    'main.automation': ('projects',),
+    'main.courses': ('courses',),
+    'main.blog': ('blog',),
+}
+
+# Bytes del inicio de cada archivo de la cache de nginx que contienen las cabeceras
+CACHE_HEADER_BYTES = 16384
+
+CACHE_FILE_RE = re.compile(r'^[0-9a-f]{32}$')
+SURROGATE_KEY_RE = re.compile(rb'^surrogate-key:[ \t]*(.*?)\r?$', re.IGNORECASE | re.MULTILINE)
+
+def _collect(value, found):
+    """Registros de contenido del contexto de una plantilla (sueltos, listas o paginaciones)"""
+    if isinstance(value, Pagination):
+        value = value.items
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            _collect(item, found)
+    elif type(value) in CONTENT_KINDS:
+        found.append(value)
+
+def _before_render_template(sender, template, context, **extra):
+    if request.blueprint != 'main':
+        return
+    records = g.setdefault('_edge_records', [])
+    for value in context.values():
+        _collect(value, records)
+
+def surrogate_keys(endpoint, records):
+    """'blog:12' por registro mostrado y 'blog:list' en las páginas que listan ese tipo"""
+    keys = {f'{CONTENT_KINDS[type(record)]}:{record.id}' for record in records}
+    keys.update(f'{kind}:list' for kind in LIST_KEYS.get(endpoint, ()))
+    return sorted(keys)
+
+def _is_public(response):
+    # Con sesión (usuario, mensajes flash o token CSRF) la página es de un solo visitante
+    return (
+        request.method in ('GET', 'HEAD')
+        and response.status_code == 200
+        and current_user.is_anonymous
+        and not session.modified
+        and current_app.config['SESSION_COOKIE_NAME'] not in request.cookies
+    )
+
+def add_cache_headers(response):
+    """Cache-Control, Last-Modified, ETag y Surrogate-Key de las páginas de main_bp"""
+    records = g.pop('_edge_records', None)
+    if records is None:
+        return response
+
+    # La respuesta cambia con la cookie de sesión
+    response.vary.add('Cookie')
+    if not _is_public(response):
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+    # El navegador revalida siempre (ETag); nginx guarda la página s-maxage segundos
+    response.cache_control.public = True
+    response.cache_control.max_age = 0
+    response.cache_control.s_maxage = current_app.config.get('EDGE_CACHE_SECONDS', DEFAULT_EDGE_CACHE_SECONDS)
+    moments = [record.updated_at for record in records if record.updated_at]
+    if moments:
+        response.last_modified = max(moments)
+    response.headers['Surrogate-Key'] = ' '.join(surrogate_keys(request.endpoint, records))
+    response.add_etag()
+    return response.make_conditional(request)
+
+def _cached_keys(path):
+    with open(path, 'rb') as f:
+        head = f.read(CACHE_HEADER_BYTES)
+    match = SURROGATE_KEY_RE.search(head)
+    return set(match.group(1).decode('latin-1').split()) if match else set()
+
+def purge_surrogate_keys(keys, cache_dir=None):
+    """
+    Eliminar de la cache de nginx (proxy_cache_path) las páginas con alguna de `keys`
+    en su cabecera Surrogate-Key; sin `keys`, todas. nginx guarda las cabeceras de la
+    respuesta en cada archivo y trata uno borrado como un fallo. Retorna las eliminadas.
+    """
+    cache_dir = cache_dir or current_app.config.get('EDGE_CACHE_DIR')
+    if not cache_dir or not os.path.isdir(cache_dir):
+        return 0
+
+    keys = set(keys or ())
+    purged = 0
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            if not CACHE_FILE_RE.match(name):
+                continue
+            path = os.path.join(root, name)
+            try:
+                if not keys or keys & _cached_keys(path):
+                    os.remove(path)
+                    purged += 1
+            except FileNotFoundError:
+                # nginx la reemplazó o expiró mientras se recorría
+                continue
+    return purged
+
+def init_edge_cache(app):
+    """Cabeceras de cache en las páginas públicas y purga de nginx tras los cambios de contenido"""
+    if not app.config.get('EDGE_CACHE_ENABLED', False):
+        return
+
+    before_render_template.connect(_before_render_template, app)
+    app.after_request(add_cache_headers)
+
+    def on_content_changed(sender, changes, **extra):
+        keys = set()
+        for kind, ids in changes.items():
+            keys.add(f'{kind}:list')
+            keys.update(f'{kind}:{item_id}' for item_id in ids)
+        try:
+            purged = purge_surrogate_keys(keys, app.config['EDGE_CACHE_DIR'])
+        except OSError as e:
+            app.logger.error(f"Error purging edge cache: {e}")
+            return
+        if purged:
+            app.logger.info(f"Edge cache: {purged} pages purged for {len(keys)} keys")
+
+    if app.config.get('EDGE_CACHE_DIR'):
+        content_changed.connect(on_content_changed, app, weak=False)
@@ -0,0 +1,242 @@
+import os
+import tempfile
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+from flask import current_app, url_for
+from sqlalchemy import select
+from app.extensions import db
+from app.models.blog import BlogPost
+from app.models.course import Course
+from app.models.project import Project
+from app.models.site_config import SiteConfig
+from app.utils.content_events import Debouncer, content_changed
+
+# Límite del protocolo de sitemaps por archivo (también 50 MB, que no se alcanza antes)
+SITEMAP_MAX_URLS = 50000
+
+# Entradas de los feeds RSS y Atom
+DEFAULT_FEED_ITEMS = 20
+
+# Segundos de espera tras el último cambio antes de regenerar
+DEFAULT_FEEDS_DEBOUNCE = 5
+
+# Páginas fijas del sitio
+SITEMAP_STATIC_ENDPOINTS = ('main.index', 'main.research', 'main.automation', 'main.courses',
+                            'main.blog', 'main.contact')
+
+# Modelo -> endpoint de su página de detalle
+SITEMAP_DETAIL_ENDPOINTS = (
+    (BlogPost, 'main.blog_post'),
+    (Course, 'main.course_detail'),
+    (Project, 'main.project_detail'),
+)
+
+# Filas leídas por bloque al recorrer el contenido publicado
+SITEMAP_CHUNK = 1000
+
+def _w3c(moment):
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ') if moment else None
+
+def write_if_changed(path, data):
+    """
+    Escribir de forma atómica solo si el contenido cambió, para conservar la fecha
+    de modificación (Last-Modified/ETag de nginx) de los archivos iguales.
+    """
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+    return True
+
+def _url_template(endpoint):
+    """URL absoluta con un marcador en lugar del slug (url_for una vez por tipo)"""
+    return url_for(endpoint, slug='__slug__', _external=True).replace('__slug__', '{}')
+
+def iter_sitemap_urls():
+    """(url, lastmod) de las páginas fijas y de todo el contenido publicado"""
+    for endpoint in SITEMAP_STATIC_ENDPOINTS:
+        yield url_for(endpoint, _external=True), None
+    for model_class, endpoint in SITEMAP_DETAIL_ENDPOINTS:
+        template = _url_template(endpoint)
+        query = select(model_class.slug, model_class.updated_at).where(
+            model_class.published.is_(True)
+        ).order_by(model_class.id).execution_options(yield_per=SITEMAP_CHUNK)
+        for slug, updated_at in db.session.execute(query):
+            yield template.format(quote(slug)), updated_at
+
+def _urlset(entries):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for url, lastmod in entries:
+        if lastmod:
+            lines.append(f'<url><loc>{escape(url)}</loc><lastmod>{_w3c(lastmod)}</lastmod></url>')
+        else:
+            lines.append(f'<url><loc>{escape(url)}</loc></url>')
+    lines.append('</urlset>')
+    return '\n'.join(lines).encode('utf-8')
+
+def _sitemap_index(parts, base_url):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for name, lastmod in parts:
+        entry = f'<sitemap><loc>{escape(base_url)}/{name}</loc>'
+        if lastmod:
+            entry += f'<lastmod>{_w3c(lastmod)}</lastmod>'
+        lines.append(entry + '</sitemap>')
+    lines.append('</sitemapindex>')
+    return '\n'.join(lines).encode('utf-8')
+
+def write_sitemaps(output_dir, base_url, max_urls=SITEMAP_MAX_URLS):
+    """
+    Escribir sitemap.xml. Con más de `max_urls` URLs se parte en sitemap-1.xml,
+    sitemap-2.xml... y sitemap.xml pasa a ser el índice. Retorna (urls, archivos).
+    """
+    parts = []
+    written = []
+    total = 0
+    chunk = []
+
+    def flush_part():
+        name = f'sitemap-{len(parts) + 1}.xml'
+        lastmods = [lastmod for _, lastmod in chunk if lastmod]
+        write_if_changed(os.path.join(output_dir, name), _urlset(chunk))
+        parts.append((name, max(lastmods) if lastmods else None))
+
+    for entry in iter_sitemap_urls():
+        chunk.append(entry)
+        total += 1
+        if len(chunk) >= max_urls:
+            flush_part()
+            chunk = []
+
+    if not parts:
+        # Cabe en un solo archivo: sitemap.xml es directamente el urlset
+        write_if_changed(os.path.join(output_dir, 'sitemap.xml'), _urlset(chunk))
+        written.append('sitemap.xml')
+    else:
+        if chunk:
+            flush_part()
+        write_if_changed(os.path.join(output_dir, 'sitemap.xml'), _sitemap_index(parts, base_url))
+        written.append('sitemap.xml')
+        written.extend(name for name, _ in parts)
+
+    # Partes que sobran de una generación anterior con más contenido
+    for name in os.listdir(output_dir):
+        if name.startswith('sitemap-') and name.endswith('.xml') and name not in written:
+            os.remove(os.path.join(output_dir, name))
+    return total, written
+
+def _latest_posts(limit):
+    return BlogPost.query.filter_by(published=True).order_by(
+        BlogPost.created_at.desc()).limit(limit).all()
+
+def _utc(moment):
+    return moment.replace(tzinfo=timezone.utc)
+
+def _rss(config, posts, site_url):
+    title = escape(config.site_name if config else 'CodexSoto')
+    description = escape(config.site_description if config and config.site_description else '')
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">',
+        '<channel>',
+        f'<title>{title}</title>',
+        f'<link>{escape(url_for("main.blog", _external=True))}</link>',
+        f'<description>{description}</description>',
+        '<language>es</language>',
+        f'<atom:link href="{escape(site_url)}/feed.xml" rel="self" type="application/rss+xml"/>',
+    ]
+    if posts:
+        lines.append(f'<lastBuildDate>{format_datetime(_utc(max(post.updated_at for post in posts)))}</lastBuildDate>')
+    for post in posts:
+        link = escape(url_for('main.blog_post', slug=post.slug, _external=True))
+        lines.extend([
+            '<item>',
+            f'<title>{escape(post.title)}</title>',
+            f'<link>{link}</link>',
+            f'<guid isPermaLink="true">{link}</guid>',
+            f'<pubDate>{format_datetime(_utc(post.created_at))}</pubDate>',
+            f'<description>{escape(post.summary or "")}</description>',
+            '</item>',
+        ])
+    lines.extend(['</channel>', '</rss>'])
+    return '\n'.join(lines).encode('utf-8')
+
+def _atom(config, posts, site_url):
+    title = escape(config.site_name if config else 'CodexSoto')
+    blog_url = escape(url_for('main.blog', _external=True))
+    # Sin posts se usa una fecha fija para que el archivo no cambie en cada generación
+    updated = max((post.updated_at for post in posts), default=None) or datetime(1970, 1, 1)
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f'<title>{title}</title>',
+        f'<id>{blog_url}</id>',
+        f'<link href="{blog_url}"/>',
+        f'<link href="{escape(site_url)}/atom.xml" rel="self"/>',
+        f'<updated>{_w3c(updated)}</updated>',
+        f'<author><name>{title}</name></author>',
+    ]
+    for post in posts:
+        link = escape(url_for('main.blog_post', slug=post.slug, _external=True))
+        lines.extend([
+            '<entry>',
+            f'<title>{escape(post.title)}</title>',
+            f'<id>{link}</id>',
+            f'<link href="{link}"/>',
+            f'<published>{_w3c(post.created_at)}</published>',
+            f'<updated>{_w3c(post.updated_at)}</updated>',
+            f'<summary>{escape(post.summary or "")}</summary>',
+            '</entry>',
+        ])
+    lines.append('</feed>')
+    return '\n'.join(lines).encode('utf-8')
+
+def generate_feeds(output_dir=None):
+    """
+    Generar sitemap.xml (partido si hace falta), feed.xml (RSS) y atom.xml en el
+    directorio de FEEDS_DIR. Retorna (urls del sitemap, archivos escritos).
+    """
+    output_dir = output_dir or current_app.config['FEEDS_DIR']
+    site_url = current_app.config.get('SITE_URL', 'http://localhost').rstrip('/')
+    os.makedirs(output_dir, exist_ok=True)
+
+    # url_for(_external=True) con el dominio público, también fuera de un request
+    with current_app.test_request_context(base_url=site_url):
+        total, written = write_sitemaps(output_dir, site_url,
+                                        current_app.config.get('SITEMAP_MAX_URLS', SITEMAP_MAX_URLS))
+        config = SiteConfig.query.first()
+        posts = _latest_posts(current_app.config.get('FEED_ITEMS', DEFAULT_FEED_ITEMS))
+        write_if_changed(os.path.join(output_dir, 'feed.xml'), _rss(config, posts, site_url))
+        write_if_changed(os.path.join(output_dir, 'atom.xml'), _atom(config, posts, site_url))
+    return total, written + ['feed.xml', 'atom.xml']
+
+def init_feeds(app):
+    """Regenerar sitemap y feeds unos segundos después de cada cambio de contenido"""
+    if not app.config.get('FEEDS_AUTO_REGENERATE', True):
+        return
+
+    def regenerate():
+        with app.app_context():
+            try:
+                generate_feeds()
+            except Exception as e:
+                app.logger.error(f"Error generating sitemap and feeds: {e}")
+
+    debouncer = Debouncer(app.config.get('FEEDS_DEBOUNCE_SECONDS', DEFAULT_FEEDS_DEBOUNCE), regenerate)
+
+    def on_content_changed(sender, changes, **extra):
+        debouncer.trigger()
+
+    # Referencia fuerte (blinker guarda los receptores con weakref) y solo para esta app
+    app.extensions['feeds_debouncer'] = debouncer
+    content_changed.connect(on_content_changed, app, weak=False)
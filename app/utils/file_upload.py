@@ -1,9 +1,10 @@
 import os
+import time
 import uuid
 from werkzeug.utils import secure_filename
-from PIL import Image
 import io
 from flask import current_app
+from app.utils.metrics import metrics
 
 # Configuración de archivos permitidos
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
@@ -20,32 +21,59 @@ def generate_unique_filename(filename):
     unique_filename = f"{uuid.uuid4().hex}.{ext}"
     return unique_filename
 
+def render_optimized_image(image_file, max_width=1200, quality=85):
+    """Redimensiona y comprime la imagen; lanza una excepción si no es válida"""
+    # Pillow se importa aquí para no cargarlo al arrancar cada worker
+    from PIL import Image
+    
+    start = time.perf_counter()
+    
+    # Abrir la imagen
+    image = Image.open(image_file)
+    
+    # Convertir a RGB si es necesario (para archivos RGBA o P)
+    if image.mode in ('RGBA', 'P'):
+        image = image.convert('RGB')
+    
+    # Redimensionar si es muy grande
+    if image.width > max_width:
+        ratio = max_width / image.width
+        new_height = int(image.height * ratio)
+        image = image.resize((max_width, new_height), Image.Resampling.LANCZOS)
+    
+    # Guardar la imagen optimizada en memoria
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=quality, optimize=True)
+    output.seek(0)
+    
+    metrics.observe_image(time.perf_counter() - start)
+    return output
+
 def optimize_image(image_file, max_width=1200, quality=85):
     """Optimiza la imagen redimensionándola y comprimiéndola"""
     try:
-        # Abrir la imagen
-        image = Image.open(image_file)
-        
-        # Convertir a RGB si es necesario (para archivos RGBA o P)
-        if image.mode in ('RGBA', 'P'):
-            image = image.convert('RGB')
-        
-        # Redimensionar si es muy grande
-        if image.width > max_width:
-            ratio = max_width / image.width
-            new_height = int(image.height * ratio)
-            image = image.resize((max_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Guardar la imagen optimizada en memoria
-        output = io.BytesIO()
-        image.save(output, format='JPEG', quality=quality, optimize=True)
-        output.seek(0)
-        
-        return output
+        return render_optimized_image(image_file, max_width=max_width, quality=quality)
     except Exception as e:
         current_app.logger.error(f"Error optimizando imagen: {str(e)}")
         return None
 
+def optimize_image_file(source_path, dest_dir, max_width=1200, quality=85):
+    """
+    Optimiza una imagen del disco y la guarda con un nombre único en dest_dir.
+    No necesita contexto de aplicación, así que se puede usar en un pool de procesos.
+    Retorna el nombre del archivo generado o None si la imagen no es válida.
+    """
+    try:
+        with open(source_path, 'rb') as f:
+            optimized = render_optimized_image(f, max_width=max_width, quality=quality)
+    except Exception:
+        return None
+    
+    filename = f"{uuid.uuid4().hex}.jpg"
+    with open(os.path.join(dest_dir, filename), 'wb') as f:
+        f.write(optimized.getvalue())
+    return filename
+
 def save_uploaded_file(file, upload_folder='uploads'):
     """
     Guarda un archivo subido y retorna la URL relativa
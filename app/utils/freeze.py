@@ -0,0 +1,225 @@
+import fcntl
+import json
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+from flask import current_app, url_for
+from sqlalchemy import select
+from werkzeug.exceptions import HTTPException
+from app.extensions import db
+from app.models.blog import BlogPost
+from app.models.course import Course
+from app.models.project import Project
+from app.utils.content_events import Debouncer, content_changed
+from app.utils.feeds import write_if_changed
+
+# Páginas a partir de las cuales se reparte el renderizado entre procesos
+FREEZE_PARALLEL_MIN = 50
+
+# Segundos de espera tras el último cambio antes de reconstruir
+DEFAULT_FREEZE_DEBOUNCE = 5
+
+MANIFEST_NAME = '.manifest.json'
+LOCK_NAME = '.lock'
+
+# Modelo -> (tipo de contenido en `changes`, endpoint de detalle)
+DETAIL_PAGES = (
+    (BlogPost, 'blog', 'main.blog_post'),
+    (Course, 'courses', 'main.course_detail'),
+    (Project, 'projects', 'main.project_detail'),
+)
+
+def _ids(query):
+    return db.session.execute(query).scalars().all()
+
+def _deps(kind, ids):
+    return [f'{kind}:{item_id}' for item_id in ids]
+
+def page_deps():
+    """
+    path -> (endpoint, argumentos de la vista, dependencias) de cada página pública.
+
+    Las dependencias son los registros que muestra la página ('blog:12') y, en el
+    listado del blog, el número de páginas (cambia la paginación de todas). Las
+    consultas son las mismas que las de las vistas de main.py, pero solo de ids.
+    Contacto no se congela: tiene un formulario con token CSRF.
+    """
+    from app.blueprints.main import BLOG_PER_PAGE
+
+    published_projects = select(Project.id).where(Project.published.is_(True))
+    pages = {
+        url_for('main.index'): ('main.index', {}, (
+            _deps('projects', _ids(published_projects.where(Project.featured.is_(True)).limit(3)))
+            + _deps('courses', _ids(select(Course.id).where(
+                Course.published.is_(True), Course.featured.is_(True)).limit(3)))
+            + _deps('blog', _ids(select(BlogPost.id).where(BlogPost.published.is_(True)).order_by(
+                BlogPost.created_at.desc()).limit(3)))
+        )),
+        url_for('main.research'): ('main.research', {}, _deps(
+            'projects', _ids(published_projects.where(Project.category == 'research')))),
+        url_for('main.automation'): ('main.automation', {}, _deps(
+            'projects', _ids(published_projects.where(Project.category == 'automation')))),
+        url_for('main.courses'): ('main.courses', {}, _deps(
+            'courses', _ids(select(Course.id).where(Course.published.is_(True))))),
+    }
+
+    post_ids = _ids(select(BlogPost.id).where(BlogPost.published.is_(True)).order_by(BlogPost.created_at.desc()))
+    page_count = max(1, math.ceil(len(post_ids) / BLOG_PER_PAGE))
+    for page in range(1, page_count + 1):
+        path = url_for('main.blog', page=page) if page > 1 else url_for('main.blog')
+        ids = post_ids[(page - 1) * BLOG_PER_PAGE:page * BLOG_PER_PAGE]
+        pages[path] = ('main.blog', {}, _deps('blog', ids) + [f'blog:pages={page_count}'])
+
+    for model_class, kind, endpoint in DETAIL_PAGES:
+        query = select(model_class.id, model_class.slug).where(model_class.published.is_(True))
+        for item_id, slug in db.session.execute(query):
+            pages[url_for(endpoint, slug=slug)] = (endpoint, {'slug': slug}, [f'{kind}:{item_id}'])
+    return pages
+
+def page_file(path):
+    """
+    Archivo de una página dentro de FREEZE_DIR: / -> index.html, /blog -> blog.html,
+    /blog?page=2 -> blog.page-2.html, /blog/<slug> -> blog/<slug>.html. Las páginas
+    del listado van junto a blog.html y no en blog/: un post con slug 'page-2' chocaría.
+    """
+    url = urlsplit(path)
+    name = unquote(url.path).strip('/') or 'index'
+    page = parse_qs(url.query).get('page')
+    if page:
+        name = f'{name}.page-{page[0]}'
+    return name + '.html'
+
+def render_page(app, path, endpoint, view_args):
+    """HTML de una página llamando directamente a la vista: sin tracker ni before_request"""
+    with app.test_request_context(path, base_url=app.config.get('SITE_URL', 'http://localhost')):
+        try:
+            response = app.make_response(app.view_functions[endpoint](**view_args))
+        except HTTPException:
+            return None
+        return response.get_data() if response.status_code == 200 else None
+
+def _freeze_batch(app, output_dir, batch):
+    results = []
+    with app.app_context():
+        for path, endpoint, view_args in batch:
+            html = render_page(app, path, endpoint, view_args)
+            if html is not None:
+                target = os.path.join(output_dir, page_file(path))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                write_if_changed(target, html)
+            results.append((path, html is not None))
+    return results
+
+# App heredada por los procesos del pool (fork)
+_worker_app = None
+
+def _init_worker(app):
+    global _worker_app
+    _worker_app = app
+    with app.app_context():
+        # Las conexiones abiertas del proceso padre no se pueden compartir
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+def _freeze_batch_worker(output_dir, batch):
+    return _freeze_batch(_worker_app, output_dir, batch)
+
+def _render_pages(app, output_dir, pages, workers):
+    batch = [(path, endpoint, view_args) for path, (endpoint, view_args, _) in pages.items()]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(batch) < FREEZE_PARALLEL_MIN or 'fork' not in multiprocessing.get_all_start_methods():
+        return _freeze_batch(app, output_dir, batch)
+
+    size = math.ceil(len(batch) / (workers * 4))
+    batches = [batch[start:start + size] for start in range(0, len(batch), size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'),
+                             initializer=_init_worker, initargs=(app,)) as pool:
+        for batch_results in pool.map(_freeze_batch_worker, [output_dir] * len(batches), batches):
+            results.extend(batch_results)
+    return results
+
+def _load_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def freeze_site(changes=None, workers=1, output_dir=None):
+    """
+    Renderizar las páginas públicas a HTML en FREEZE_DIR.
+
+    Sin `changes` se renderiza todo. Con `changes` (como en la señal content_changed)
+    solo las páginas que dependen de un registro cambiado, las nuevas y aquellas cuyas
+    dependencias cambiaron (un post publicado desplaza la paginación); un cambio de la
+    configuración del sitio afecta a todas. Retorna (renderizadas, eliminadas, total).
+    """
+    app = current_app._get_current_object()
+    output_dir = output_dir or app.config['FREEZE_DIR']
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+
+    # Un solo proceso a la vez (workers de gunicorn y `flask freeze`)
+    with open(os.path.join(output_dir, LOCK_NAME), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        with app.test_request_context(base_url=app.config.get('SITE_URL', 'http://localhost')):
+            pages = page_deps()
+        previous = _load_manifest(manifest_path)
+
+        if changes is None or 'config' in changes or not previous:
+            pending = pages
+        else:
+            changed = {f'{kind}:{item_id}' for kind, ids in changes.items() for item_id in ids}
+            pending = {
+                path: spec for path, spec in pages.items()
+                if path not in previous or set(spec[2]) != set(previous[path]) or changed.intersection(spec[2])
+            }
+
+        rendered = _render_pages(app, output_dir, pending, workers)
+        missing = {path for path, ok in rendered if not ok}
+
+        removed = [path for path in previous if path not in pages or path in missing]
+        for path in removed:
+            try:
+                os.remove(os.path.join(output_dir, page_file(path)))
+            except FileNotFoundError:
+                pass
+
+        manifest = {path: spec[2] for path, spec in pages.items() if path not in missing}
+        write_if_changed(manifest_path, json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+    return len(rendered) - len(missing), len(removed), len(manifest)
+
+def init_freeze(app):
+    """Reconstruir las páginas afectadas unos segundos después de cada cambio de contenido"""
+    if not app.config.get('FREEZE_ENABLED', False):
+        return
+
+    pending = {}
+    lock = threading.Lock()
+
+    def rebuild():
+        with lock:
+            changes = {kind: set(ids) for kind, ids in pending.items()}
+            pending.clear()
+        with app.app_context():
+            try:
+                # En el proceso de la app se renderiza en serie: son pocas páginas
+                freeze_site(changes)
+            except Exception as e:
+                app.logger.error(f"Error rebuilding frozen pages: {e}")
+
+    debouncer = Debouncer(app.config.get('FREEZE_DEBOUNCE_SECONDS', DEFAULT_FREEZE_DEBOUNCE), rebuild)
+
+    def on_content_changed(sender, changes, **extra):
+        with lock:
+            for kind, ids in changes.items():
+                pending.setdefault(kind, set()).update(ids)
+        debouncer.trigger()
+
+    app.extensions['freeze_debouncer'] = debouncer
+    content_changed.connect(on_content_changed, app, weak=False)
@@ -0,0 +1,184 @@
+import csv
+import socket
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from flask import current_app
+
+# IPs distintas que se recuerdan ya resueltas
+DEFAULT_GEOIP_CACHE_SIZE = 65536
+
+# Códigos que en las bases de rangos significan "desconocido"
+UNKNOWN_COUNTRIES = {'', '-', 'ZZ', 'XX'}
+
+MASK_64 = (1 << 64) - 1
+
+# Prefijo ::ffff:0:0/96 de las IPv4 mapeadas en IPv6
+IPV4_MAPPED = 0xFFFF
+
+def address_number(value):
+    """(versión, entero) de una IP en texto; inet_pton es mucho más rápido que ipaddress"""
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, value), 'big')
+    except OSError:
+        pass
+    try:
+        number = int.from_bytes(socket.inet_pton(socket.AF_INET6, value), 'big')
+    except OSError:
+        raise ValueError(f'IP no válida: {value}')
+    if number >> 32 == IPV4_MAPPED:
+        return 4, number & 0xFFFFFFFF
+    return 6, number
+
+def _parse_address(value):
+    """Dirección de la base: entero ('16777216') o texto ('1.0.0.0', '2001:db8::')"""
+    value = value.strip().strip('"')
+    if value.isdigit():
+        number = int(value)
+        if number <= 0xFFFFFFFF:
+            return number, 4
+        # La base IPv6 de IP2Location guarda los rangos IPv4 como ::ffff:a.b.c.d
+        if number >> 32 == IPV4_MAPPED:
+            return number & 0xFFFFFFFF, 4
+        return number, 6
+    version, number = address_number(value)
+    return number, version
+
+class GeoIPDatabase:
+    """
+    Rangos de IP -> país en arrays ordenados, consultados con búsqueda binaria.
+    IPv4 usa enteros de 32 bits; IPv6 se parte en dos arrays de 64 bits (alto y bajo).
+    """
+
+    def __init__(self, cache_size=DEFAULT_GEOIP_CACHE_SIZE):
+        self.countries = []
+        self.v4_starts = array('I')
+        self.v4_ends = array('I')
+        self.v4_countries = array('H')
+        self.v6_starts_hi = array('Q')
+        self.v6_starts_lo = array('Q')
+        self.v6_ends_hi = array('Q')
+        self.v6_ends_lo = array('Q')
+        self.v6_countries = array('H')
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def __len__(self):
+        return len(self.v4_starts) + len(self.v6_starts_hi)
+
+    def load_csv(self, path):
+        """Cargar un CSV con filas `inicio,fin,país` (columnas extra se ignoran)"""
+        country_index = {}
+        v4, v6 = [], []
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                if len(row) < 3 or row[0].startswith('#'):
+                    continue
+                try:
+                    start, version = _parse_address(row[0])
+                    end, _ = _parse_address(row[1])
+                except ValueError:
+                    # Cabecera u otra línea que no es un rango
+                    continue
+                country = row[2].strip().strip('"').upper()
+                if country in UNKNOWN_COUNTRIES:
+                    continue
+                code = country_index.get(country)
+                if code is None:
+                    code = country_index[country] = len(self.countries)
+                    self.countries.append(country)
+                (v4 if version == 4 else v6).append((start, end, code))
+
+        v4.sort()
+        v6.sort()
+        self.v4_starts = array('I', (start for start, _, _ in v4))
+        self.v4_ends = array('I', (end for _, end, _ in v4))
+        self.v4_countries = array('H', (code for _, _, code in v4))
+        self.v6_starts_hi = array('Q', (start >> 64 for start, _, _ in v6))
+        self.v6_starts_lo = array('Q', (start & MASK_64 for start, _, _ in v6))
+        self.v6_ends_hi = array('Q', (end >> 64 for _, end, _ in v6))
+        self.v6_ends_lo = array('Q', (end & MASK_64 for _, end, _ in v6))
+        self.v6_countries = array('H', (code for _, _, code in v6))
+        self.lookup.cache_clear()
+        return len(self)
+
+    def _lookup_v4(self, number):
+        index = bisect_right(self.v4_starts, number) - 1
+        if index >= 0 and number <= self.v4_ends[index]:
+            return self.countries[self.v4_countries[index]]
+        return None
+
+    def _lookup_v6(self, number):
+        hi, lo = number >> 64, number & MASK_64
+        # Primero por los 64 bits altos y, entre los rangos con el mismo alto, por los bajos
+        first = bisect_left(self.v6_starts_hi, hi)
+        last = bisect_right(self.v6_starts_hi, hi, first)
+        if first < last:
+            index = bisect_right(self.v6_starts_lo, lo, first, last) - 1
+            if index < first:
+                index = first - 1
+        else:
+            index = last - 1
+        if index < 0:
+            return None
+        end_hi = self.v6_ends_hi[index]
+        if hi < end_hi or (hi == end_hi and lo <= self.v6_ends_lo[index]):
+            return self.countries[self.v6_countries[index]]
+        return None
+
+    def _lookup(self, ip_address):
+        """Código ISO del país de una IP, o None"""
+        try:
+            version, number = address_number(ip_address)
+        except (ValueError, TypeError):
+            return None
+        if version == 4:
+            return self._lookup_v4(number)
+        return self._lookup_v6(number)
+
+class LazyGeoIP:
+    """Carga la base configurada la primera vez que se consulta, una vez por proceso"""
+
+    def __init__(self):
+        self.path = None
+        self.cache_size = DEFAULT_GEOIP_CACHE_SIZE
+        self._database = None
+        self._lock = threading.Lock()
+
+    def configure(self, path, cache_size=DEFAULT_GEOIP_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._database = None
+
+    def _load(self):
+        with self._lock:
+            if self._database is None:
+                database = GeoIPDatabase(self.cache_size)
+                try:
+                    database.load_csv(self.path)
+                except OSError as e:
+                    # Sin base no se resuelve el país, pero la visita se registra igual
+                    current_app.logger.error(f"Error loading GeoIP database {self.path}: {e}")
+                self._database = database
+        return self._database
+
+    def country(self, ip_address):
+        if not self.path or not ip_address:
+            return None
+        database = self._database
+        if database is None:
+            database = self._load()
+        return database.lookup(ip_address)
+
+geoip = LazyGeoIP()
+
+def lookup_country(ip_address):
+    """País (código ISO) de una IP según la base local, o None si no hay base o no se encuentra"""
+    return geoip.country(ip_address)
+
+def init_geoip(app):
+    """Configurar la base de rangos IP -> país (se carga en la primera consulta)"""
+    geoip.configure(
+        app.config.get('GEOIP_DATABASE'),
+        app.config.get('GEOIP_CACHE_SIZE', DEFAULT_GEOIP_CACHE_SIZE)
+    )
@@ -0,0 +1,213 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from flask import (before_render_template, current_app, g, has_request_context, request,
+                   request_finished, request_started, template_rendered)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Consultas que tardan más que esto (milisegundos) se registran en el log
+DEFAULT_SLOW_QUERY_MS = 100
+
+# Duraciones recientes que se guardan por endpoint para calcular percentiles
+DEFAULT_LATENCY_SAMPLES = 1000
+
+# Consultas lentas recientes que muestra la página de rendimiento
+SLOW_QUERY_HISTORY = 50
+
+# Caracteres de la sentencia SQL que se guardan de cada consulta lenta
+SLOW_QUERY_MAX_SQL = 1000
+
+class RequestTimings:
+    """Tiempos acumulados durante un request (en segundos)"""
+
+    __slots__ = ('start', 'queries', 'db', 'template', 'template_depth', 'template_start', 'sections')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+        self.template_depth = 0
+        self.template_start = 0.0
+        self.sections = {}
+
+    def server_timing(self, total):
+        """Valor de la cabecera Server-Timing (duraciones en milisegundos)"""
+        metrics = [
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template * 1000:.1f}',
+        ]
+        metrics.extend(f'{name};dur={seconds * 1000:.1f}' for name, seconds in self.sections.items())
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(metrics)
+
+def percentile(ordered, percent):
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    index = max(0, min(len(ordered) - 1, int(round(percent / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+class EndpointStats:
+    """
+    Duraciones recientes por endpoint, en memoria de cada worker.
+    Cada endpoint guarda las últimas `samples` duraciones; los percentiles se
+    calculan al mostrarlos, no en cada request.
+    """
+
+    def __init__(self, samples=DEFAULT_LATENCY_SAMPLES):
+        self.samples = samples
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, queries):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = [deque(maxlen=self.samples), 0, 0]
+            stats[0].append(seconds)
+            stats[1] += 1
+            stats[2] += queries
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+    def summary(self):
+        """Requests, consultas medias y p50/p95/p99 (ms) por endpoint, de más lento a más rápido"""
+        with self._lock:
+            endpoints = [(endpoint, list(durations), count, queries)
+                         for endpoint, (durations, count, queries) in self._endpoints.items()]
+        rows = []
+        for endpoint, durations, count, queries in endpoints:
+            ordered = sorted(durations)
+            rows.append({
+                'endpoint': endpoint,
+                'requests': count,
+                'avg_queries': round(queries / count, 1),
+                'p50': percentile(ordered, 50) * 1000,
+                'p95': percentile(ordered, 95) * 1000,
+                'p99': percentile(ordered, 99) * 1000,
+                'max': ordered[-1] * 1000,
+            })
+        rows.sort(key=lambda row: row['p95'], reverse=True)
+        return rows
+
+class Instrumentation:
+    """Estado de la instrumentación del proceso: umbrales, percentiles y consultas lentas"""
+
+    def __init__(self):
+        self.enabled = False
+        self.server_timing = True
+        self.slow_query_seconds = DEFAULT_SLOW_QUERY_MS / 1000
+        self.endpoints = EndpointStats()
+        self.slow_queries = deque(maxlen=SLOW_QUERY_HISTORY)
+        self.started_at = datetime.utcnow()
+
+    def configure(self, server_timing=True, slow_query_ms=DEFAULT_SLOW_QUERY_MS, samples=DEFAULT_LATENCY_SAMPLES):
+        self.enabled = True
+        self.server_timing = server_timing
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.endpoints = EndpointStats(samples)
+
+    def record_slow_query(self, statement, seconds):
+        endpoint = request.endpoint if has_request_context() else None
+        statement = ' '.join(statement.split())[:SLOW_QUERY_MAX_SQL]
+        self.slow_queries.appendleft({
+            'time': datetime.utcnow(),
+            'ms': seconds * 1000,
+            'endpoint': endpoint,
+            'statement': statement,
+        })
+        current_app.logger.warning(f"Slow query ({seconds * 1000:.1f} ms) in {endpoint or 'no request'}: {statement}")
+
+instrumentation = Instrumentation()
+
+def current_timings():
+    """Tiempos del request en curso, o None fuera de un request o sin instrumentación"""
+    if has_request_context():
+        return g.get('_timings')
+    return None
+
+@contextmanager
+def timed(name):
+    """Sumar la duración del bloque a la sección `name` del request (p. ej. 'analytics')"""
+    timings = current_timings()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.sections[name] = timings.sections.get(name, 0.0) + time.perf_counter() - start
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    timings = current_timings()
+    if timings is not None:
+        timings.queries += 1
+        timings.db += elapsed
+    if elapsed >= instrumentation.slow_query_seconds:
+        instrumentation.record_slow_query(statement, elapsed)
+
+def _handle_error(context):
+    # Una consulta que falla no llega a after_cursor_execute
+    if context.connection is not None and context.connection.info.get('query_start'):
+        context.connection.info['query_start'].pop()
+
+def _request_started(sender, **extra):
+    g._timings = RequestTimings()
+
+def _before_render_template(sender, template, context, **extra):
+    timings = current_timings()
+    if timings is not None:
+        # Solo se mide el render más externo si una plantilla renderiza otra
+        if timings.template_depth == 0:
+            timings.template_start = time.perf_counter()
+        timings.template_depth += 1
+
+def _template_rendered(sender, template, context, **extra):
+    timings = current_timings()
+    if timings is not None and timings.template_depth:
+        timings.template_depth -= 1
+        if timings.template_depth == 0:
+            timings.template += time.perf_counter() - timings.template_start
+
+def _request_finished(sender, response, **extra):
+    timings = g.pop('_timings', None)
+    if timings is None:
+        return
+    total = time.perf_counter() - timings.start
+    endpoint = request.endpoint or f'({response.status_code})'
+    instrumentation.endpoints.record(endpoint, total, timings.queries)
+    # Nunca en las respuestas públicas: nginx las guarda y repetiría los mismos tiempos
+    if instrumentation.server_timing and not response.cache_control.public:
+        response.headers['Server-Timing'] = timings.server_timing(total)
+
+def init_instrumentation(app):
+    """Conectar los eventos del motor y las señales de Flask que miden cada request"""
+    if not app.config.get('INSTRUMENTATION_ENABLED', True):
+        return
+
+    instrumentation.configure(
+        server_timing=app.config.get('SERVER_TIMING_ENABLED', False),
+        slow_query_ms=app.config.get('SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS),
+        samples=app.config.get('LATENCY_SAMPLE_SIZE', DEFAULT_LATENCY_SAMPLES)
+    )
+
+    # Eventos en la clase Engine: cubren el primario y la réplica
+    for name, listener in (('before_cursor_execute', _before_cursor_execute),
+                           ('after_cursor_execute', _after_cursor_execute),
+                           ('handle_error', _handle_error)):
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+
+    request_started.connect(_request_started, app)
+    before_render_template.connect(_before_render_template, app)
+    template_rendered.connect(_template_rendered, app)
+    request_finished.connect(_request_finished, app)
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import deque
+
+# Visitas recientes que se guardan en memoria por proceso
+DEFAULT_LIVE_BUFFER_SIZE = 500
+
+# Ventanas deslizantes: nombre -> segundos
+LIVE_WINDOWS = (('1m', 60), ('5m', 300), ('1h', 3600))
+
+class LiveStats:
+    """
+    Buffer circular de visitas recientes y contadores por segundo de la última hora.
+    Vive en memoria de cada worker: leerlo no consulta la base de datos.
+    """
+
+    def __init__(self, size=DEFAULT_LIVE_BUFFER_SIZE, horizon=3600):
+        self.horizon = horizon
+        self._hits = deque(maxlen=size)
+        self._seq = 0
+        # Un contador por segundo; _stamps guarda a qué segundo pertenece cada posición
+        self._counts = [0] * horizon
+        self._stamps = [0] * horizon
+        self._lock = threading.Lock()
+
+    def resize(self, size):
+        with self._lock:
+            self._hits = deque(self._hits, maxlen=size)
+
+    def record(self, page, device, browser, now=None):
+        """Registrar una visita (llamado por el tracker)"""
+        now = now or time.time()
+        second = int(now)
+        slot = second % self.horizon
+        with self._lock:
+            if self._stamps[slot] != second:
+                self._stamps[slot] = second
+                self._counts[slot] = 0
+            self._counts[slot] += 1
+            self._seq += 1
+            self._hits.append((self._seq, now, page, device, browser))
+
+    def windows(self, now=None):
+        """Visitas en cada ventana deslizante"""
+        second = int(now or time.time())
+        totals = dict.fromkeys((name for name, _ in LIVE_WINDOWS), 0)
+        with self._lock:
+            for slot in range(self.horizon):
+                age = second - self._stamps[slot]
+                if 0 <= age < self.horizon:
+                    count = self._counts[slot]
+                    for name, seconds in LIVE_WINDOWS:
+                        if age < seconds:
+                            totals[name] += count
+        return totals
+
+    def snapshot(self, since=0, now=None):
+        """Estado para el stream: visitas nuevas desde `since` y ventanas"""
+        with self._lock:
+            if since > self._seq:
+                # El cliente viene de otro worker o de antes de un reinicio
+                since = 0
+            hits = [hit for hit in self._hits if hit[0] > since]
+            seq = self._seq
+        return {
+            'seq': seq,
+            'hits': [
+                {'time': int(hit_time), 'page': page, 'device': device, 'browser': browser}
+                for _, hit_time, page, device, browser in hits
+            ],
+            'windows': self.windows(now),
+        }
+
+live_stats = LiveStats()
+
+def init_live_stats(app):
+    """Configurar el tamaño del buffer de visitas en vivo"""
+    live_stats.resize(app.config.get('LIVE_BUFFER_SIZE', DEFAULT_LIVE_BUFFER_SIZE))
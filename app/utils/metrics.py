@@ -0,0 +1,132 @@
+import hmac
+import os
+import time
+from flask import Response, abort, g, request, request_finished, request_started
+
+# Límites de los histogramas (segundos)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+IMAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+MAIL_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Direcciones a las que /metrics responde sin METRICS_TOKEN
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+class Metrics:
+    """
+    Métricas de Prometheus del proceso. Hasta que init_metrics las crea, todos los
+    métodos son no-ops y prometheus_client ni siquiera se importa.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        # Hijos ya resueltos por etiquetas: labels() cuesta más que observe()
+        self._request_children = {}
+
+    def setup(self):
+        # Se importa aquí: en modo multiproceso PROMETHEUS_MULTIPROC_DIR debe existir antes
+        from prometheus_client import Counter, Histogram
+
+        self.request_latency = Histogram(
+            'http_request_duration_seconds', 'Duración de las peticiones por endpoint',
+            ['endpoint', 'method', 'status'], buckets=LATENCY_BUCKETS
+        )
+        self.analytics_events = Counter(
+            'analytics_events_total', 'Visitas procesadas por el tracker según el resultado',
+            ['result']
+        )
+        self.cache_requests = Counter(
+            'cache_requests_total', 'Consultas a las caches en memoria', ['cache', 'result']
+        )
+        self.image_processing = Histogram(
+            'image_processing_seconds', 'Redimensionado y compresión de imágenes', buckets=IMAGE_BUCKETS
+        )
+        self.pool_checkout = Histogram(
+            'db_pool_checkout_seconds', 'Espera por una conexión del pool de la base de datos',
+            buckets=POOL_WAIT_BUCKETS
+        )
+        self.mail_send = Histogram(
+            'mail_send_seconds', 'Duración del envío de emails', ['result'], buckets=MAIL_BUCKETS
+        )
+        self.enabled = True
+
+    def observe_request(self, endpoint, method, status, seconds):
+        key = (endpoint, method, status)
+        child = self._request_children.get(key)
+        if child is None:
+            child = self._request_children[key] = self.request_latency.labels(endpoint, method, status)
+        child.observe(seconds)
+
+    def count_analytics(self, result):
+        """Resultado del tracker: 'recorded', 'bot', 'sampled' (fuera de la muestra) o 'error' (visita perdida)"""
+        if self.enabled:
+            self.analytics_events.labels(result).inc()
+
+    def count_cache(self, cache, hit, count=1):
+        if self.enabled and count:
+            self.cache_requests.labels(cache, 'hit' if hit else 'miss').inc(count)
+
+    def observe_image(self, seconds):
+        if self.enabled:
+            self.image_processing.observe(seconds)
+
+    def observe_mail(self, seconds, ok):
+        if self.enabled:
+            self.mail_send.labels('sent' if ok else 'error').observe(seconds)
+
+metrics = Metrics()
+
+def _request_started(sender, **extra):
+    g._metrics_start = time.perf_counter()
+
+def _request_finished(sender, response, **extra):
+    start = g.pop('_metrics_start', None)
+    if start is None:
+        return
+    # Sin endpoint (404, 405) se agrupa todo en una sola serie
+    endpoint = request.endpoint or 'unmatched'
+    metrics.observe_request(endpoint, request.method, f'{response.status_code // 100}xx',
+                            time.perf_counter() - start)
+
+def generate_metrics():
+    """Texto de /metrics: suma los archivos de todos los workers en modo multiproceso"""
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def init_metrics(app):
+    """Crear las métricas, medir cada request y registrar /metrics"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    if not metrics.enabled:
+        metrics.setup()
+
+    from app.utils.database import TimedQueuePool
+    TimedQueuePool.checkout_observer = metrics.pool_checkout.observe
+
+    request_started.connect(_request_started, app)
+    request_finished.connect(_request_finished, app)
+
+    token = app.config.get('METRICS_TOKEN')
+    if not token:
+        app.logger.info("METRICS_TOKEN not set: /metrics only answers requests from localhost")
+
+    def metrics_view():
+        """Métricas en formato de texto de Prometheus (con token, o sin él solo desde localhost)"""
+        if token:
+            if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+                abort(401)
+        elif request.remote_addr not in LOCAL_ADDRESSES:
+            abort(401)
+        data, content_type = generate_metrics()
+        return Response(data, content_type=content_type)
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,92 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+from sqlalchemy.types import DateTime
+
+class KeysetPage:
+    """Página de resultados paginada por cursor (keyset)"""
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+def encode_cursor(sort_value, item_id):
+    """Codificar la posición (valor de orden, id) en un token para la URL"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, item_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, sort_column):
+    """Decodificar un cursor; devuelve None si no es válido"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if sort_value is not None and isinstance(sort_column.type, DateTime):
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(item_id)
+    except (ValueError, TypeError):
+        return None
+
+def _after(sort_column, id_column, position, descending):
+    """Condición 'después de position' en el orden dado"""
+    sort_value, item_id = position
+    if descending:
+        return or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < item_id))
+    return or_(sort_column > sort_value, and_(sort_column == sort_value, id_column > item_id))
+
+def keyset_paginate(query, sort_column, id_column, descending=True, after=None, before=None, per_page=25):
+    """
+    Paginar una consulta por (sort_column, id) sin OFFSET.
+    `after` y `before` son cursores devueltos en páginas anteriores.
+    """
+    after_position = decode_cursor(after, sort_column) if after else None
+    before_position = decode_cursor(before, sort_column) if before else None
+
+    if before_position:
+        # Recorrer hacia atrás invirtiendo el orden y dar la vuelta al resultado
+        query = query.filter(_after(sort_column, id_column, before_position, not descending))
+        order = (sort_column.asc(), id_column.asc()) if descending else (sort_column.desc(), id_column.desc())
+    else:
+        if after_position:
+            query = query.filter(_after(sort_column, id_column, after_position, descending))
+        order = (sort_column.desc(), id_column.desc()) if descending else (sort_column.asc(), id_column.asc())
+
+    rows = query.order_by(*order).limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if before_position:
+        rows.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, after_position is not None
+
+    key = sort_column.key
+    next_cursor = prev_cursor = None
+    if rows and has_next:
+        next_cursor = encode_cursor(getattr(rows[-1], key), rows[-1].id)
+    if rows and has_prev:
+        prev_cursor = encode_cursor(getattr(rows[0], key), rows[0].id)
+
+    return KeysetPage(rows, per_page, next_cursor=next_cursor, prev_cursor=prev_cursor)
@@ -0,0 +1,280 @@
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from html import unescape
+import numpy as np
+from flask import url_for
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.blog import BlogPost
+from app.models.course import Course
+from app.models.project import Project
+from app.models.related import RelatedContent
+from app.utils.content_events import Debouncer, content_changed, note_content_change
+
+# Vecinos guardados por registro
+DEFAULT_RELATED_COUNT = 4
+
+# Segundos de espera tras el último cambio antes de recalcular
+DEFAULT_RELATED_DEBOUNCE = 10
+
+# Términos del vocabulario (los que aparecen en más documentos)
+DEFAULT_RELATED_MAX_TERMS = 5000
+
+# Filas de la matriz de similitud calculadas por bloque (bloque x documentos)
+SIMILARITY_CHUNK = 512
+
+# Similitud mínima para considerar dos registros relacionados
+MIN_SCORE = 0.05
+
+# Tipo de contenido -> (modelo, endpoint de detalle, campos con su peso)
+# Los campos cortos y descriptivos (título, tags, tecnologías) pesan más que el texto
+RELATED_SOURCES = {
+    'blog': (BlogPost, 'main.blog_post', {'title': 3, 'tags': 3, 'summary': 2, 'content': 1}),
+    'courses': (Course, 'main.course_detail', {'title': 3, 'level': 1, 'description': 2, 'content': 1}),
+    'projects': (Project, 'main.project_detail', {'title': 3, 'technologies': 3, 'category': 2,
+                                                   'description': 2, 'content': 1}),
+}
+
+# Etiqueta de cada tipo en la sección de relacionados
+KIND_LABELS = {'blog': 'Artículo', 'courses': 'Curso', 'projects': 'Proyecto'}
+
+TAG_RE = re.compile(r'<[^>]+>')
+WORD_RE = re.compile(r'[a-z0-9][a-z0-9+#]*')
+
+# Palabras vacías en español e inglés (sin tildes, como quedan tras normalizar)
+STOPWORDS = frozenset('''
+    a al algo algunos ante antes asi aun bien cada como con contra cual cuando de del desde
+    donde dos el ella ellas ellos en entre era es esa ese eso esta estan este esto estos fue
+    ha hay hasta la las le les lo los mas me mi muy nada ni no nos o otra otro para pero
+    poco por porque que se ser si sin sino sobre solo son su sus tambien tan te tiene todo
+    todos tu un una uno unos y ya yo
+    about an and are as at be but by can do for from has have how in into is it its of on
+    or that the their this to use using was we what when which will with you your
+'''.split())
+
+def tokenize(text):
+    """Palabras en minúsculas y sin tildes de un texto (puede tener HTML)"""
+    # NFKD separa las tildes de la letra y la conversión a ASCII las descarta
+    text = unicodedata.normalize('NFKD', unescape(TAG_RE.sub(' ', text)).lower())
+    text = text.encode('ascii', 'ignore').decode('ascii')
+    return [word for word in WORD_RE.findall(text)
+            if len(word) > 2 and word not in STOPWORDS and not word.isdigit()]
+
+# (tipo, id) -> (updated_at, términos) ya tokenizados en este proceso
+_terms_cache = {}
+
+def _terms(fields, values):
+    terms = Counter()
+    for weight, value in zip(fields.values(), values):
+        if value:
+            for word in tokenize(value):
+                terms[word] += weight
+    return terms
+
+def _documents():
+    """
+    (tipo, id, título, slug, términos con su peso) de todo el contenido publicado.
+    Solo se leen y tokenizan los textos de los registros nuevos o con otro updated_at
+    que en el cálculo anterior: tras una edición se procesa un registro, no todos.
+    """
+    documents = []
+    seen = set()
+    for kind, (model_class, _, fields) in RELATED_SOURCES.items():
+        query = select(model_class.id, model_class.title, model_class.slug, model_class.updated_at).where(
+            model_class.published.is_(True)).order_by(model_class.id)
+        rows = db.session.execute(query).all()
+        missing = [item_id for item_id, _, _, updated_at in rows
+                   if _terms_cache.get((kind, item_id), (None,))[0] != updated_at or updated_at is None]
+        columns = [getattr(model_class, name) for name in fields]
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            loaded = select(model_class.id, model_class.updated_at, *columns).where(model_class.id.in_(chunk))
+            for item_id, updated_at, *values in db.session.execute(loaded):
+                _terms_cache[(kind, item_id)] = (updated_at, _terms(fields, values))
+
+        for item_id, title, slug, _ in rows:
+            cached = _terms_cache.get((kind, item_id))
+            if cached is not None:
+                documents.append((kind, item_id, title, slug, cached[1]))
+                seen.add((kind, item_id))
+    # Olvidar los registros borrados o despublicados
+    for key in set(_terms_cache) - seen:
+        del _terms_cache[key]
+    return documents
+
+def tfidf_matrix(term_counts, max_terms=DEFAULT_RELATED_MAX_TERMS):
+    """
+    Matriz TF-IDF (documentos x términos) con filas de norma 1, para que el producto
+    de dos filas sea su similitud coseno. Un término que aparece en un solo documento
+    no aporta a ninguna similitud, así que solo entran los que están en dos o más.
+    """
+    document_frequency = Counter()
+    for terms in term_counts:
+        document_frequency.update(terms.keys())
+    shared = [(count, term) for term, count in document_frequency.items() if count > 1]
+    shared.sort(reverse=True)
+    vocabulary = {term: index for index, (_, term) in enumerate(shared[:max_terms])}
+
+    matrix = np.zeros((len(term_counts), len(vocabulary)), dtype=np.float32)
+    if not vocabulary:
+        return matrix
+    for row, terms in enumerate(term_counts):
+        for term, count in terms.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                matrix[row, column] = count
+
+    # tf sublineal (1 + log) por idf suavizado
+    documents = len(term_counts)
+    idf = np.array([math.log((1 + documents) / (1 + document_frequency[term])) + 1 for term in vocabulary],
+                   dtype=np.float32)
+    present = matrix > 0
+    matrix[present] = 1 + np.log(matrix[present])
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+def top_neighbors(matrix, count, chunk=SIMILARITY_CHUNK):
+    """
+    Índices y similitudes de los `count` vecinos más parecidos de cada fila. La matriz
+    de similitud se calcula por bloques de filas (un producto de matrices cada uno)
+    para no tener en memoria la de documentos x documentos entera.
+    """
+    documents = matrix.shape[0]
+    count = min(count, documents - 1)
+    if count <= 0:
+        return np.empty((documents, 0), dtype=np.int64), np.empty((documents, 0), dtype=np.float32)
+
+    indices = np.empty((documents, count), dtype=np.int64)
+    scores = np.empty((documents, count), dtype=np.float32)
+    for start in range(0, documents, chunk):
+        similarity = matrix[start:start + chunk] @ matrix.T
+        rows = np.arange(similarity.shape[0])
+        # Un registro no es vecino de sí mismo
+        similarity[rows, rows + start] = -1
+        # argpartition deja los `count` mayores sin ordenar; se ordenan solo esos
+        best = np.argpartition(-similarity, count - 1, axis=1)[:, :count]
+        best_scores = np.take_along_axis(similarity, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        indices[start:start + chunk] = np.take_along_axis(best, order, axis=1)
+        scores[start:start + chunk] = np.take_along_axis(best_scores, order, axis=1)
+    return indices, scores
+
+def compute_related(count=DEFAULT_RELATED_COUNT, max_terms=DEFAULT_RELATED_MAX_TERMS):
+    """(tipo, id) -> [(tipo, id, título, slug, similitud), ...] del contenido publicado"""
+    documents = _documents()
+    matrix = tfidf_matrix([terms for *_, terms in documents], max_terms)
+    indices, scores = top_neighbors(matrix, count)
+
+    related = {}
+    for row, (kind, item_id, *_) in enumerate(documents):
+        related[(kind, item_id)] = [
+            documents[index][:4] + (round(float(score), 4),)
+            for index, score in zip(indices[row], scores[row]) if score >= MIN_SCORE
+        ]
+    return related
+
+def _stored_related():
+    query = select(
+        RelatedContent.kind, RelatedContent.item_id, RelatedContent.related_kind,
+        RelatedContent.related_id, RelatedContent.title, RelatedContent.slug
+    ).order_by(RelatedContent.kind, RelatedContent.item_id, RelatedContent.position)
+    stored = {}
+    for kind, item_id, *neighbor in db.session.execute(query).yield_per(5000):
+        stored.setdefault((kind, item_id), []).append(tuple(neighbor))
+    return stored
+
+def refresh_related(count=None, max_terms=None):
+    """
+    Recalcular los relacionados de todo el contenido publicado y guardar solo las
+    listas que cambiaron (vecinos, orden, título o slug): editar un post reescribe
+    las filas de los registros afectados, no la tabla entera. Las páginas de detalle
+    cuya lista cambió se notifican con content_changed para la cache y el sitio
+    congelado. Retorna (listas actualizadas, registros).
+    """
+    from flask import current_app
+
+    count = count or current_app.config.get('RELATED_COUNT', DEFAULT_RELATED_COUNT)
+    max_terms = max_terms or current_app.config.get('RELATED_MAX_TERMS', DEFAULT_RELATED_MAX_TERMS)
+    related = compute_related(count, max_terms)
+    stored = _stored_related()
+
+    # Las similitudes varían un poco con cada cambio del idf: no cuentan como cambio
+    changed = [key for key, neighbors in related.items()
+               if [neighbor[:4] for neighbor in neighbors] != stored.get(key, [])]
+    changed.extend(key for key in stored if key not in related)
+    if not changed:
+        return 0, len(related)
+
+    rows = [
+        {'kind': kind, 'item_id': item_id, 'position': position, 'related_kind': neighbor[0],
+         'related_id': neighbor[1], 'title': neighbor[2], 'slug': neighbor[3], 'score': neighbor[4]}
+        for kind, item_id in changed
+        for position, neighbor in enumerate(related.get((kind, item_id), ()))
+    ]
+    # Sesión propia marcada: su content_changed no vuelve a disparar el recálculo
+    with Session(db.engine, info={'related_refresh': True}) as session:
+        for start in range(0, len(changed), 500):
+            keys = changed[start:start + 500]
+            session.execute(delete(RelatedContent).where(
+                tuple_(RelatedContent.kind, RelatedContent.item_id).in_(keys)))
+        if rows:
+            try:
+                session.execute(insert(RelatedContent), rows)
+            except IntegrityError:
+                # Otro proceso (worker de gunicorn) guardó las mismas listas a la vez
+                session.rollback()
+                return 0, len(related)
+        for kind, (model_class, _, _) in RELATED_SOURCES.items():
+            ids = [item_id for changed_kind, item_id in changed if changed_kind == kind]
+            if ids:
+                note_content_change(session, model_class, ids)
+        session.commit()
+    return len(changed), len(related)
+
+def related_items(kind, item_id):
+    """Relacionados de un registro para la plantilla: una consulta por el índice"""
+    rows = RelatedContent.query.filter_by(kind=kind, item_id=item_id).order_by(RelatedContent.position).all()
+    return [
+        {
+            'kind': row.related_kind,
+            'label': KIND_LABELS[row.related_kind],
+            'title': row.title,
+            'url': url_for(RELATED_SOURCES[row.related_kind][1], slug=row.slug),
+        }
+        for row in rows
+    ]
+
+def init_related(app):
+    """Recalcular los relacionados unos segundos después de cada cambio de contenido"""
+    if not app.config.get('RELATED_AUTO_REFRESH', True):
+        return
+
+    lock = threading.Lock()
+
+    def refresh():
+        # Un recálculo a la vez por proceso
+        with lock, app.app_context():
+            try:
+                updated, total = refresh_related()
+            except Exception as e:
+                app.logger.error(f"Error refreshing related content: {e}")
+                return
+            if updated:
+                app.logger.info(f"Related content: {updated} of {total} lists updated")
+
+    debouncer = Debouncer(app.config.get('RELATED_DEBOUNCE_SECONDS', DEFAULT_RELATED_DEBOUNCE), refresh)
+
+    def on_content_changed(sender, changes, session=None, **extra):
+        # La configuración del sitio no afecta, ni los avisos del propio recálculo
+        if set(changes) - {'config'} and not (session is not None and session.info.get('related_refresh')):
+            debouncer.trigger()
+
+    app.extensions['related_debouncer'] = debouncer
+    content_changed.connect(on_content_changed, app, weak=False)
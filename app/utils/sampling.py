@@ -0,0 +1,113 @@
+import hashlib
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Tasa máxima en modo adaptativo: se guarda al menos 1 de cada N visitantes
+DEFAULT_MAX_SAMPLE_RATE = 64
+
+# Visitas guardadas por segundo y por worker a partir de las cuales sube la tasa
+DEFAULT_ADAPTIVE_TARGET = 20
+
+# Escrituras del tracker en curso en el worker a partir de las cuales sube la tasa
+DEFAULT_MAX_PENDING_WRITES = 4
+
+# Segundos de tráfico que se promedian para elegir la tasa
+SAMPLING_WINDOW = 10
+
+def power_of_two(value):
+    """Menor potencia de dos >= value (mínimo 1)"""
+    return 1 << max(math.ceil(math.log2(value)), 0) if value > 1 else 1
+
+def visitor_hash(visitor):
+    """Hash estable del visitante (igual en todos los workers y reinicios)"""
+    digest = hashlib.blake2b((visitor or '').encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+class VisitSampler:
+    """
+    Muestreo de las visitas que se guardan, por visitante: con tasa N se guardan todas
+    las visitas de 1 de cada N visitantes (según el hash de su IP) y cada una lleva
+    peso N. Así las sesiones quedan completas y los totales se estiman sumando pesos.
+
+    Las tasas son potencias de dos: un visitante guardado con tasa 2N también lo está
+    con tasa N, de modo que al subir o bajar la tasa las muestras quedan anidadas.
+    En modo adaptativo la tasa sube con las visitas por segundo del worker y con las
+    escrituras del tracker en curso (la cola de la base de datos), y baja al pasar el pico.
+    """
+
+    def __init__(self):
+        self.base_rate = 1
+        self.rate = 1
+        self.adaptive = False
+        self.max_rate = DEFAULT_MAX_SAMPLE_RATE
+        self.target = DEFAULT_ADAPTIVE_TARGET
+        self.max_pending = DEFAULT_MAX_PENDING_WRITES
+        self.pending = 0
+        self._seconds = deque()
+        self._lock = threading.Lock()
+
+    def configure(self, rate=1, adaptive=False, max_rate=DEFAULT_MAX_SAMPLE_RATE,
+                  target=DEFAULT_ADAPTIVE_TARGET, max_pending=DEFAULT_MAX_PENDING_WRITES):
+        with self._lock:
+            self.base_rate = power_of_two(rate)
+            self.rate = self.base_rate
+            self.adaptive = adaptive
+            self.max_rate = max(power_of_two(max_rate), self.base_rate)
+            self.target = target
+            self.max_pending = max_pending
+            self._seconds.clear()
+
+    def _adapt(self, second):
+        # Visitas por segundo en la ventana, sin contar el segundo en curso
+        past = [count for stamp, count in self._seconds if stamp < second]
+        if not past:
+            return
+        observed = sum(past) / SAMPLING_WINDOW
+        rate = power_of_two(max(observed / self.target, self.base_rate))
+        if self.pending >= self.max_pending:
+            rate = max(rate, self.rate * 2)
+        self.rate = min(rate, self.max_rate)
+
+    def weight(self, visitor, now=None):
+        """Peso de la visita si se guarda, o 0 si queda fuera de la muestra"""
+        if self.adaptive:
+            second = int(now or time.time())
+            with self._lock:
+                if self._seconds and self._seconds[-1][0] == second:
+                    self._seconds[-1][1] += 1
+                else:
+                    # Un segundo nuevo: se recalcula la tasa una vez por segundo
+                    while self._seconds and self._seconds[0][0] <= second - SAMPLING_WINDOW:
+                        self._seconds.popleft()
+                    self._adapt(second)
+                    self._seconds.append([second, 1])
+        rate = self.rate
+        if rate == 1:
+            return 1
+        return rate if visitor_hash(visitor) % rate == 0 else 0
+
+    @contextmanager
+    def writing(self):
+        """Marcar una escritura del tracker en curso"""
+        with self._lock:
+            self.pending += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+visit_sampler = VisitSampler()
+
+def init_sampling(app):
+    """Configurar la tasa de muestreo del tracker"""
+    visit_sampler.configure(
+        rate=app.config.get('ANALYTICS_SAMPLE_RATE', 1),
+        adaptive=app.config.get('ANALYTICS_ADAPTIVE_SAMPLING', False),
+        max_rate=app.config.get('ANALYTICS_MAX_SAMPLE_RATE', DEFAULT_MAX_SAMPLE_RATE),
+        target=app.config.get('ANALYTICS_ADAPTIVE_TARGET', DEFAULT_ADAPTIVE_TARGET),
+        max_pending=app.config.get('ANALYTICS_MAX_PENDING_WRITES', DEFAULT_MAX_PENDING_WRITES),
+    )
@@ -0,0 +1,227 @@
+import keyword
+import re
+import threading
+from collections import OrderedDict
+from html import unescape
+from app.models.blog import BlogPost
+from app.models.contact import ContactMessage
+from app.models.course import Course
+from app.models.project import Project
+from app.models.site_config import SiteConfig
+from app.utils.metrics import metrics
+
+# Objetos serializados que se guardan por proceso
+DEFAULT_SERIALIZER_CACHE_SIZE = 5000
+
+# Ids por consulta al cargar las filas que no están en la cache
+LOAD_CHUNK = 500
+
+TAG_RE = re.compile(r'<[^>]+>')
+
+def isoformat(value):
+    return value.isoformat() if value is not None else None
+
+def comma_list(value):
+    return value.split(',') if value else []
+
+def short_text(value, length=200):
+    """Texto plano de una descripción (puede tener HTML), cortado en una palabra"""
+    if not value:
+        return ''
+    text = ' '.join(unescape(TAG_RE.sub(' ', value)).split())
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(' ', 1)[0] + '…'
+
+def date_format(fmt):
+    return lambda value: value.strftime(fmt) if value is not None else None
+
+class Field:
+    """Campo de un esquema: atributo de origen (por defecto, el mismo nombre) y conversión"""
+
+    def __init__(self, source=None, convert=None):
+        self.source = source
+        self.convert = convert
+
+class SerializerCache:
+    """LRU de objetos ya serializados, indexado por (esquema, id, updated_at)"""
+
+    def __init__(self, size=DEFAULT_SERIALIZER_CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, size):
+        self.size = size
+        self.clear()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def set(self, key, data):
+        if not self.size:
+            return
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+serializer_cache = SerializerCache()
+
+class Schema:
+    """
+    Esquema declarativo de un modelo: {'nombre': 'atributo' | Field(...)}.
+
+    Los campos se compilan una sola vez en una función que arma el dict con accesos
+    directos a los atributos. Si el modelo tiene updated_at, cada objeto serializado
+    se guarda con (id, updated_at) y no se vuelve a serializar mientras no cambie;
+    los dicts devueltos son compartidos y no se deben modificar.
+    """
+
+    def __init__(self, name, model, fields):
+        self.name = name
+        self.model = model
+        self.fields = dict(fields)
+        self.cached = hasattr(model, 'updated_at')
+        self.serialize = self._compile()
+
+    def extend(self, name, fields):
+        """Esquema con los campos de este más `fields` (p. ej. la versión de detalle)"""
+        return Schema(name, self.model, {**self.fields, **fields})
+
+    def _compile(self):
+        namespace = {}
+        items = []
+        for index, (name, field) in enumerate(self.fields.items()):
+            if not isinstance(field, Field):
+                field = Field(field)
+            source = field.source or name
+            if not source.isidentifier() or keyword.iskeyword(source):
+                raise ValueError(f'Atributo no válido en el esquema {self.name}: {source}')
+            value = f'obj.{source}'
+            if field.convert is not None:
+                namespace[f'_convert{index}'] = field.convert
+                value = f'_convert{index}({value})'
+            items.append(f'{name!r}: {value}')
+        code = 'def serialize(obj):\n    return {' + ', '.join(items) + '}\n'
+        exec(compile(code, f'<schema {self.name}>', 'exec'), namespace)
+        return namespace['serialize']
+
+    def dump(self, obj):
+        if not self.cached or obj.updated_at is None:
+            return self.serialize(obj)
+        key = (self.name, obj.id, obj.updated_at)
+        data = serializer_cache.get(key)
+        metrics.count_cache('serializer', data is not None)
+        if data is None:
+            data = self.serialize(obj)
+            serializer_cache.set(key, data)
+        return data
+
+    def dump_many(self, objs):
+        return [self.dump(obj) for obj in objs]
+
+    def dump_query(self, query):
+        """
+        Serializar el resultado de una consulta del modelo consultando primero solo
+        (id, updated_at): únicamente las filas que no están en la cache se cargan.
+        """
+        if not self.cached:
+            return self.dump_many(query.all())
+
+        model = self.model
+        versions = query.with_entities(model.id, model.updated_at).all()
+        results = [serializer_cache.get((self.name, item_id, updated_at)) for item_id, updated_at in versions]
+        missing = [item_id for (item_id, _), data in zip(versions, results) if data is None]
+        metrics.count_cache('serializer', True, len(versions) - len(missing))
+        if not missing:
+            return results
+
+        metrics.count_cache('serializer', False, len(missing))
+        loaded = {}
+        for start in range(0, len(missing), LOAD_CHUNK):
+            chunk = missing[start:start + LOAD_CHUNK]
+            for obj in model.query.filter(model.id.in_(chunk)):
+                data = self.serialize(obj)
+                if obj.updated_at is not None:
+                    serializer_cache.set((self.name, obj.id, obj.updated_at), data)
+                loaded[obj.id] = data
+        # Una fila borrada entre las dos consultas se omite
+        return [data if data is not None else loaded.get(item_id)
+                for (item_id, _), data in zip(versions, results)
+                if data is not None or item_id in loaded]
+
+# Un esquema por modelo; las versiones de detalle agregan los campos largos
+
+post_schema = Schema('post', BlogPost, {
+    'id': 'id',
+    'title': 'title',
+    'slug': 'slug',
+    'summary': 'summary',
+    'created_at': Field(convert=isoformat),
+    'updated_at': Field(convert=isoformat),
+})
+post_detail_schema = post_schema.extend('post_detail', {'content': 'content'})
+
+# Los modelos no tienen resumen propio: se deriva de la descripción
+course_schema = Schema('course', Course, {
+    'id': 'id',
+    'title': 'title',
+    'slug': 'slug',
+    'short_description': Field('description', short_text),
+    'price': 'price',
+    'duration': 'duration',
+    'level': 'level',
+    'featured': 'featured',
+    'created_at': Field(convert=isoformat),
+})
+course_detail_schema = course_schema.extend('course_detail', {'description': 'description'})
+
+project_schema = Schema('project', Project, {
+    'id': 'id',
+    'title': 'title',
+    'slug': 'slug',
+    'short_description': Field('description', short_text),
+    'category': 'category',
+    'technologies': Field(convert=comma_list),
+    'github_url': 'github_url',
+    'demo_url': 'demo_url',
+    'featured': 'featured',
+    'created_at': Field(convert=isoformat),
+})
+project_detail_schema = project_schema.extend('project_detail', {'description': 'description'})
+
+site_config_schema = Schema('site_config', SiteConfig, {
+    'site_name': 'site_name',
+    'site_description': 'site_description',
+    'hero_title': 'hero_title',
+    'hero_subtitle': 'hero_subtitle',
+    'about_text': 'about_text',
+    'contact_email': 'contact_email',
+    'linkedin_url': 'linkedin_url',
+    'github_url': 'github_url',
+    'twitter_url': 'twitter_url',
+})
+
+# Sin updated_at (marcar como leído no lo cambia): se serializa siempre
+contact_message_schema = Schema('contact_message', ContactMessage, {
+    'id': 'id',
+    'name': 'name',
+    'email': 'email',
+    'subject': 'subject',
+    'message': 'message',
+    'read': 'read',
+    'created_at': Field(convert=date_format('%d/%m/%Y %H:%M')),
+})
+
+def init_serializers(app):
+    serializer_cache.configure(app.config.get('SERIALIZER_CACHE_SIZE', DEFAULT_SERIALIZER_CACHE_SIZE))
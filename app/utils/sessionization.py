@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from app.extensions import db
+from app.models.analytics import AnalyticsWatermark, PageView, VisitorStats
+
+# Minutos de inactividad que cierran una sesión
+DEFAULT_SESSION_GAP = 30
+
+# Filas leídas por bloque del cursor
+DEFAULT_SESSION_CHUNK = 5000
+
+WATERMARK_NAME = 'sessions'
+
+# Los días son UTC (created_at.date()), igual que en el tracker (analytics.utc_today)
+
+class DayTotals:
+    """
+    Acumuladores de un día: sesiones, rebotes, duración, vistas y visitantes,
+    ponderados por el peso de muestreo de las visitas
+    """
+
+    __slots__ = ('sessions', 'bounces', 'duration', 'views', 'visitors')
+
+    def __init__(self):
+        self.sessions = 0
+        self.bounces = 0
+        self.duration = 0.0
+        self.views = 0
+        self.visitors = 0
+
+class Sessionizer:
+    """
+    Agrupa en sesiones las visitas de una secuencia ordenada por (visitante, hora).
+    Solo guarda el estado del visitante actual y los totales por día, así que la
+    memoria no depende del tamaño de la tabla.
+    """
+
+    def __init__(self, gap, since=None):
+        self.gap = gap
+        # Las visitas anteriores a `since` solo sirven para continuar sesiones ya empezadas
+        self.since = since
+        self.days = {}
+        self.visitor = None
+        # Día -> menor peso de las visitas del visitante ese día
+        self.visitor_days = {}
+        self.session_start = None
+        self.session_last = None
+        self.session_hits = 0
+        self.session_weight = 1
+
+    def _day(self, day):
+        totals = self.days.get(day)
+        if totals is None:
+            totals = self.days[day] = DayTotals()
+        return totals
+
+    def _close_session(self):
+        # Una sesión cuenta en el día de su primera visita
+        if self.session_start is not None and (self.since is None or self.session_start >= self.since):
+            # La sesión pesa lo que su primera visita
+            totals = self._day(self.session_start.date())
+            totals.sessions += self.session_weight
+            if self.session_hits == 1:
+                totals.bounces += self.session_weight
+            totals.duration += (self.session_last - self.session_start).total_seconds() * self.session_weight
+        self.session_start = None
+        self.session_hits = 0
+
+    def _close_visitor(self):
+        self._close_session()
+        for day, weight in self.visitor_days.items():
+            self._day(day).visitors += weight
+        self.visitor_days.clear()
+
+    def add(self, visitor, moment, weight=1):
+        if visitor != self.visitor:
+            self._close_visitor()
+            self.visitor = visitor
+        elif moment - self.session_last > self.gap:
+            self._close_session()
+
+        if self.session_start is None:
+            self.session_start = moment
+            self.session_weight = weight
+        self.session_last = moment
+        self.session_hits += 1
+
+        if self.since is None or moment >= self.since:
+            day = moment.date()
+            self._day(day).views += weight
+            self.visitor_days[day] = min(weight, self.visitor_days.get(day, weight))
+
+    def finish(self):
+        self._close_visitor()
+        return self.days
+
+def sessionize(full=False, gap_minutes=DEFAULT_SESSION_GAP, chunk_size=DEFAULT_SESSION_CHUNK):
+    """
+    Calcular rebote y duración media por día agrupando las visitas en sesiones.
+    En modo incremental se recalculan solo los días desde la marca de agua
+    (menos el margen de inactividad, para cerrar las sesiones que quedaron abiertas).
+    Retorna (días actualizados, visitas leídas).
+    """
+    gap = timedelta(minutes=gap_minutes)
+    watermark = db.session.get(AnalyticsWatermark, WATERMARK_NAME)
+    if watermark is None:
+        watermark = AnalyticsWatermark(name=WATERMARK_NAME)
+        db.session.add(watermark)
+
+    since = None
+    if not full and watermark.position is not None:
+        since = datetime.combine((watermark.position - gap).date(), datetime.min.time())
+
+    query = select(PageView.ip_address, PageView.created_at, PageView.sample_weight).where(
+        PageView.ip_address.isnot(None),
+        PageView.created_at.isnot(None)
+    )
+    if since is not None:
+        query = query.where(PageView.created_at >= since - gap)
+    query = query.order_by(PageView.ip_address, PageView.created_at)
+
+    sessionizer = Sessionizer(gap, since=since)
+    latest = watermark.position
+    hits = 0
+    # yield_per usa un cursor del servidor y lee las filas por bloques
+    for visitor, moment, weight in db.session.execute(query.execution_options(yield_per=chunk_size)):
+        sessionizer.add(visitor, moment, weight)
+        hits += 1
+        if latest is None or moment > latest:
+            latest = moment
+    days = sessionizer.finish()
+
+    existing = {
+        stats.date: stats
+        for stats in VisitorStats.query.filter(VisitorStats.date.in_(list(days)))
+    } if days else {}
+    for day, totals in days.items():
+        stats = existing.get(day)
+        if stats is None:
+            stats = VisitorStats(date=day, top_pages='{}')
+            db.session.add(stats)
+        stats.page_views = totals.views
+        stats.unique_visitors = totals.visitors
+        stats.bounce_rate = round(totals.bounces * 100.0 / totals.sessions, 2) if totals.sessions else 0.0
+        stats.avg_session_duration = round(totals.duration / totals.sessions, 2) if totals.sessions else 0.0
+
+    watermark.position = latest
+    db.session.commit()
+    return len(days), hits
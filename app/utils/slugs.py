@@ -0,0 +1,81 @@
+import re
+from sqlalchemy import or_
+
+# Bases por consulta al reservar slugs en lote
+SLUG_QUERY_CHUNK = 500
+
+def slugify(text):
+    """Convierte un texto en un slug válido para URLs"""
+    # Convertir a minúsculas
+    text = text.lower()
+    # Reemplazar espacios y caracteres especiales con guiones
+    text = re.sub(r'[^\w\s-]', '', text)
+    text = re.sub(r'[-\s]+', '-', text)
+    # Eliminar guiones al inicio y final
+    return text.strip('-')
+
+def _escape_like(value):
+    """Escapar los comodines de LIKE ('_' es válido en un slug)"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def existing_slugs(model_class, base_slugs, exclude_id=None):
+    """Slugs ya usados que coinciden con alguna base o base-N, en una consulta por bloque"""
+    taken = set()
+    base_slugs = list(dict.fromkeys(base_slugs))
+
+    for start in range(0, len(base_slugs), SLUG_QUERY_CHUNK):
+        chunk = base_slugs[start:start + SLUG_QUERY_CHUNK]
+        conditions = [model_class.slug.in_(chunk)]
+        conditions.extend(
+            model_class.slug.like(f'{_escape_like(base)}-%', escape='\\') for base in chunk
+        )
+        query = model_class.query.with_entities(model_class.slug).filter(or_(*conditions))
+        if exclude_id:
+            query = query.filter(model_class.id != exclude_id)
+        taken.update(slug for (slug,) in query)
+
+    return taken
+
+def next_free_slug(base_slug, taken, counters=None):
+    """
+    Primer slug libre entre base, base-1, base-2... y lo marca como usado.
+    `counters` recuerda el último sufijo por base para no repetir la búsqueda.
+    """
+    slug = base_slug
+    counter = counters.get(base_slug, 1) if counters is not None else 1
+    while slug in taken:
+        slug = f"{base_slug}-{counter}"
+        counter += 1
+    if counters is not None:
+        counters[base_slug] = counter
+    taken.add(slug)
+    return slug
+
+def allocate_unique_slugs(model_class, base_slugs, exclude_id=None):
+    """
+    Asignar un slug único a cada base, en orden, agregando -1, -2... si es necesario.
+    También evita duplicados dentro del propio lote.
+    """
+    taken = existing_slugs(model_class, base_slugs, exclude_id=exclude_id)
+    return [next_free_slug(base_slug, taken) for base_slug in base_slugs]
+
+class SlugAllocator:
+    """
+    Reserva de slugs para importaciones masivas: carga los slugs existentes con una
+    sola consulta y asigna el resto en memoria, bloque tras bloque.
+    """
+
+    def __init__(self, model_class):
+        self.model_class = model_class
+        self._taken = None
+        self._counters = {}
+
+    def allocate(self, base_slugs):
+        if self._taken is None:
+            query = self.model_class.query.with_entities(self.model_class.slug)
+            self._taken = {slug for (slug,) in query}
+        return [next_free_slug(base_slug, self._taken, self._counters) for base_slug in base_slugs]
+
+def generate_unique_slug(base_slug, model_class, exclude_id=None):
+    """Genera un slug único agregando un número si es necesario"""
+    return allocate_unique_slugs(model_class, [base_slug], exclude_id=exclude_id)[0]
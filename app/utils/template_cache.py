@@ -0,0 +1,114 @@
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from app.utils.metrics import metrics
+
+# Fragmentos renderizados que se guardan por proceso
+DEFAULT_FRAGMENT_CACHE_SIZE = 1000
+
+# Segundos que vive un fragmento (0 = hasta que cambien sus dependencias)
+DEFAULT_FRAGMENT_CACHE_TIMEOUT = 0
+
+DEFAULT_BYTECODE_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'codexsoto-jinja')
+
+class FragmentCache:
+    """LRU en memoria de HTML ya renderizado, indexado por nombre y dependencias"""
+
+    def __init__(self, size=DEFAULT_FRAGMENT_CACHE_SIZE, timeout=DEFAULT_FRAGMENT_CACHE_TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.clear()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, html = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return html
+
+    def set(self, key, html):
+        expires_at = time.monotonic() + self.timeout if self.timeout else 0
+        with self._lock:
+            self._entries[key] = (expires_at, html)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+fragment_cache = FragmentCache()
+
+def cache_version(obj):
+    """Dependencia de un registro para {% cache %}: (tabla, id, updated_at), o None"""
+    if obj is None:
+        return None
+    table = getattr(obj, '__tablename__', None)
+    if table is None:
+        # Sin `config` de la vista, Jinja recibe el Config de Flask: cuenta como un valor fijo
+        return type(obj).__name__
+    return (table, obj.id, obj.updated_at)
+
+class FragmentCacheExtension(Extension):
+    """
+    {% cache 'nombre', dep1, dep2 %}...{% endcache %}
+
+    Guarda el HTML del bloque y lo reutiliza mientras las dependencias sean iguales.
+    Todo lo que cambie el resultado (versión de SiteConfig, ids, usuario autenticado...)
+    tiene que figurar en las dependencias; deben ser valores hashables.
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        # La plantilla y la línea evitan choques entre bloques con el mismo nombre
+        parts = [nodes.Const(parser.name), nodes.Const(lineno), parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_render_cached', [nodes.Tuple(parts, 'load')]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render_cached(self, key, caller):
+        if not fragment_cache.size:
+            return caller()
+        html = fragment_cache.get(key)
+        metrics.count_cache('fragment', html is not None)
+        if html is None:
+            html = caller()
+            fragment_cache.set(key, html)
+        return Markup(html)
+
+def init_template_cache(app):
+    """Registrar {% cache %} y la cache de bytecode de las plantillas en disco"""
+    fragment_cache.configure(
+        app.config.get('FRAGMENT_CACHE_SIZE', DEFAULT_FRAGMENT_CACHE_SIZE),
+        app.config.get('FRAGMENT_CACHE_TIMEOUT', DEFAULT_FRAGMENT_CACHE_TIMEOUT)
+    )
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.globals['cache_version'] = cache_version
+
+    # Los workers nuevos cargan las plantillas compiladas en lugar de recompilarlas
+    bytecode_dir = app.config.get('JINJA_BYTECODE_CACHE_DIR', DEFAULT_BYTECODE_CACHE_DIR)
+    if bytecode_dir:
+        os.makedirs(bytecode_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(bytecode_dir)
@@ -0,0 +1,148 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+from app.extensions import db
+from app.models.analytics import PageViewRollup
+from app.utils.analytics import hour_bucket
+
+# Granularidad -> horas por punto de la serie
+GRANULARITY_HOURS = {'hour': 1, 'day': 24, 'week': 24 * 7}
+
+# Las semanas empiezan en lunes: 1970-01-05 es el primer lunes tras la época
+WEEK_ORIGIN_HOUR = 4 * 24
+
+# Límite de puntos por respuesta
+MAX_POINTS = 5000
+
+# Segundos entre recargas completas de los buckets (recogen cargas históricas)
+DEFAULT_TIMESERIES_RELOAD = 3600
+
+# Dimensiones filtrables, codificadas como enteros en memoria
+DIMENSIONS = ('page', 'device', 'browser')
+
+EPOCH = datetime(1970, 1, 1)
+
+class RollupArrays:
+    """
+    Copia en memoria de page_view_rollup como arrays de NumPy, por proceso.
+    Las horas ya cerradas se cargan una vez; en cada consulta solo se releen
+    las horas desde la última carga, que son las que aún reciben visitas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.hours = np.empty(0, dtype=np.int64)
+        self.views = np.empty(0, dtype=np.int64)
+        self.columns = {name: np.empty(0, dtype=np.int32) for name in DIMENSIONS}
+        self.codes = {name: {} for name in DIMENSIONS}
+        self.cutoff = None
+        self.loaded_at = 0
+
+    def _fetch(self, min_hour=None):
+        """Leer buckets (desde min_hour) y codificarlos como arrays"""
+        query = select(
+            PageViewRollup.hour, PageViewRollup.page, PageViewRollup.device,
+            PageViewRollup.browser, PageViewRollup.views
+        )
+        if min_hour is not None:
+            query = query.where(PageViewRollup.hour >= min_hour)
+        rows = db.session.execute(query).all()
+
+        count = len(rows)
+        hours = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+        views = np.fromiter((row[4] for row in rows), dtype=np.int64, count=count)
+        columns = {}
+        for position, name in enumerate(DIMENSIONS, start=1):
+            codes = self.codes[name]
+            columns[name] = np.fromiter(
+                (codes.setdefault(row[position], len(codes)) for row in rows),
+                dtype=np.int32, count=count
+            )
+        return hours, views, columns
+
+    def refresh(self, reload_seconds=DEFAULT_TIMESERIES_RELOAD):
+        with self._lock:
+            cutoff = hour_bucket(datetime.utcnow())
+            if self.cutoff is None or time.monotonic() - self.loaded_at > reload_seconds:
+                self._clear()
+                self.hours, self.views, self.columns = self._fetch()
+                self.loaded_at = time.monotonic()
+            else:
+                # Conservar las horas cerradas y releer desde la última carga
+                keep = self.hours < self.cutoff
+                hours, views, columns = self._fetch(self.cutoff)
+                self.hours = np.concatenate((self.hours[keep], hours))
+                self.views = np.concatenate((self.views[keep], views))
+                self.columns = {
+                    name: np.concatenate((self.columns[name][keep], columns[name]))
+                    for name in DIMENSIONS
+                }
+            self.cutoff = cutoff
+            return self.hours, self.views, self.columns, self.codes
+
+rollup_arrays = RollupArrays()
+
+def _origin(granularity):
+    return WEEK_ORIGIN_HOUR if granularity == 'week' else 0
+
+def hour_range(start, end):
+    """Horas [inicial, final) que cubren el intervalo; una hora empezada cuenta entera"""
+    end_hour = hour_bucket(end)
+    if end > EPOCH + timedelta(hours=end_hour):
+        end_hour += 1
+    return hour_bucket(start), end_hour
+
+def bucket_range(start_hour, end_hour, granularity):
+    """Primer bucket y número de buckets que cubren las horas [start_hour, end_hour)"""
+    step = GRANULARITY_HOURS[granularity]
+    origin = _origin(granularity)
+    first = (start_hour - origin) // step
+    last = (end_hour - 1 - origin) // step
+    return first, max(last - first + 1, 0)
+
+def bucket_start(index, granularity):
+    hours = index * GRANULARITY_HOURS[granularity] + _origin(granularity)
+    return EPOCH + timedelta(hours=hours)
+
+def get_timeseries(start, end, granularity='day', **filters):
+    """
+    Serie de vistas entre start y end (exclusivo) agregada con NumPy.
+    `filters` acepta page, device y browser. Los buckets se suman con bincount
+    sobre los arrays en memoria en lugar de un GROUP BY por petición.
+    """
+    step = GRANULARITY_HOURS[granularity]
+    origin = _origin(granularity)
+    start_hour, end_hour = hour_range(start, end)
+    first, count = bucket_range(start_hour, end_hour, granularity)
+    if count > MAX_POINTS:
+        raise ValueError(f'El rango genera más de {MAX_POINTS} puntos')
+
+    hours, views, columns, codes = rollup_arrays.refresh(
+        current_app.config.get('TIMESERIES_RELOAD_SECONDS', DEFAULT_TIMESERIES_RELOAD)
+    )
+    mask = (hours >= start_hour) & (hours < end_hour)
+    for name in DIMENSIONS:
+        value = filters.get(name)
+        if value:
+            # Un valor nunca visto no tiene código: ninguna fila coincide
+            mask &= columns[name] == codes[name].get(value, -1)
+
+    indexes = (hours[mask] - origin) // step - first
+    totals = np.bincount(indexes, weights=views[mask], minlength=count).astype(np.int64)
+
+    return {
+        'granularity': granularity,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'total': int(totals.sum()),
+        'points': [
+            {'t': bucket_start(first + index, granularity).isoformat(), 'views': total}
+            for index, total in enumerate(totals.tolist())
+        ]
+    }
@@ -0,0 +1,100 @@
+import threading
+import time
+from flask_login import UserMixin
+from sqlalchemy import event
+from app.extensions import db
+from app.models.user import User
+from app.utils.metrics import metrics
+
+# Segundos que un usuario cacheado es válido en este proceso
+DEFAULT_USER_CACHE_TTL = 60
+
+class CachedUser(UserMixin):
+    """Copia ligera de un User para current_user, sin sesión de base de datos"""
+
+    __slots__ = ('id', 'username', 'email', 'is_admin')
+
+    def __init__(self, id, username, email, is_admin):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.is_admin = is_admin
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.email, bool(user.is_admin))
+
+    def __repr__(self):
+        return f'<CachedUser {self.username}>'
+
+class UserCache:
+    """Cache TTL por proceso de usuarios autenticados, indexada por id"""
+
+    def __init__(self, ttl=DEFAULT_USER_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, snapshot = entry
+        if expires_at < time.monotonic():
+            self.invalidate(user_id)
+            return None
+        return snapshot
+
+    def set(self, user_id, snapshot):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, snapshot)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+user_cache = UserCache()
+
+def load_cached_user(user_id):
+    """Obtener el usuario de la cache o, si no está, de la base de datos"""
+    user_id = int(user_id)
+    snapshot = user_cache.get(user_id)
+    metrics.count_cache('user', snapshot is not None)
+    if snapshot is not None:
+        return snapshot
+
+    user = User.query.get(user_id)
+    if user is None:
+        return None
+
+    snapshot = CachedUser.from_user(user)
+    user_cache.set(user_id, snapshot)
+    return snapshot
+
+def has_admin_rights(user):
+    """
+    Comprobar is_admin contra la base de datos y no contra la copia cacheada: la
+    invalidación solo llega al proceso que hizo el cambio, y un admin degradado o
+    borrado seguiría siéndolo en los demás workers hasta que caduque su entrada.
+    """
+    if not user.is_authenticated or not user.is_admin:
+        return False
+    is_admin = db.session.query(User.is_admin).filter_by(id=user.id).scalar()
+    if not is_admin:
+        user_cache.invalidate(user.id)
+        return False
+    return True
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_cached_user(mapper, connection, target):
+    """Descartar la copia cacheada cuando el usuario cambia"""
+    user_cache.invalidate(target.id)
+
+def init_user_cache(app):
+    """Configurar la cache de usuarios del proceso"""
+    user_cache.ttl = app.config.get('USER_CACHE_TTL', DEFAULT_USER_CACHE_TTL)
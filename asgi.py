@@ -0,0 +1,16 @@
+"""
+Punto de entrada ASGI de la API de solo lectura (uvicorn)
+
+    uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 2
+
+Sirve los endpoints públicos de /api con SQLAlchemy async; el resto de la
+aplicación sigue en Flask detrás de gunicorn (wsgi.py).
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.asgi import create_asgi_app  # noqa: E402
+
+app = create_asgi_app()
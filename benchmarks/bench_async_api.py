@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Concurrencia de la API: gunicorn (sync y gthread) frente a la API ASGI (uvicorn)
+
+Levanta cada servidor con el mismo número de procesos sobre una base SQLite
+temporal con contenido, y mide peticiones por segundo y por proceso (por core)
+y latencias a varias concurrencias. Con --slow-clients se agregan conexiones
+que tardan en enviar las cabeceras, como un cliente móvil lento sin nginx
+delante: un worker sync queda bloqueado esperándolas y uno async no. Uso:
+
+    python benchmarks/bench_async_api.py --workers 1 --concurrency 16,64,256
+    python benchmarks/bench_async_api.py --slow-clients 8 --slow-seconds 2
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_serving import run_load, wait_for_port  # noqa: E402
+
+GUNICORN = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+
+SERVERS = {
+    'sync': (GUNICORN, {'GUNICORN_WORKER_CLASS': 'sync'}),
+    'gthread': (GUNICORN, {'GUNICORN_WORKER_CLASS': 'gthread'}),
+    'asgi': ([sys.executable, '-m', 'uvicorn', 'asgi:app', '--log-level', 'warning', '--no-access-log'], {}),
+}
+
+
+def seed_database(database_url, posts):
+    """Crea las tablas y el contenido con la app Flask, como `flask bootstrap`"""
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['FEEDS_AUTO_REGENERATE'] = 'False'
+    import wsgi
+    from app.cli import bootstrap_database
+    from app.extensions import db
+    from app.models.blog import BlogPost
+
+    with wsgi.app.app_context():
+        bootstrap_database()
+        db.session.add_all([
+            BlogPost(title=f'Post {index}', slug=f'post-{index}', content='x' * 2000,
+                     summary=f'Resumen del post {index}', published=True)
+            for index in range(posts)
+        ])
+        db.session.commit()
+
+
+def start_server(name, port, workers, database_url):
+    command, extra_env = SERVERS[name]
+    env = dict(os.environ)
+    env.update(extra_env)
+    env.update({
+        'DATABASE_URL': database_url,
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'GUNICORN_WORKERS': str(workers),
+        'GUNICORN_ACCESS_LOG': '',
+    })
+    if name == 'asgi':
+        command = command + ['--port', str(port), '--workers', str(workers)]
+    return subprocess.Popen(command, cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def slow_client(port, path, seconds, stop):
+    """Envía la petición en dos partes separadas por `seconds` y repite"""
+    while not stop.is_set():
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=seconds + 30) as conn:
+                conn.sendall(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n'.encode())
+                stop.wait(seconds)
+                conn.sendall(b'Connection: close\r\n\r\n')
+                while conn.recv(65536):
+                    pass
+        except OSError:
+            stop.wait(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--servers', default='sync,gthread,asgi', help='Servidores (sync, gthread, asgi)')
+    parser.add_argument('--workers', type=int, default=1, help='Procesos por servidor')
+    parser.add_argument('--concurrency', default='16,64,256', help='Conexiones simultáneas (coma)')
+    parser.add_argument('--slow-clients', type=int, default=0,
+                        help='Conexiones lentas simultáneas durante la medición')
+    parser.add_argument('--slow-seconds', type=float, default=2.0,
+                        help='Segundos que tarda cada conexión lenta en completar la petición')
+    parser.add_argument('--path', default='/api/posts')
+    parser.add_argument('--posts', type=int, default=50)
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+
+    levels = [int(value) for value in args.concurrency.split(',')]
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed_database(database_url, args.posts)
+
+        print(f'{args.workers} proceso(s) por servidor, {args.slow_clients} conexiones lentas, '
+              f'GET {args.path}')
+        print(f"{'servidor':<9} {'conex.':>6} {'req/s':>9} {'req/s/proc':>10} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errores':>8}")
+        for name in args.servers.split(','):
+            name = name.strip()
+            process = start_server(name, args.port, args.workers, database_url)
+            try:
+                if not wait_for_port('127.0.0.1', args.port):
+                    print(f'{name}: el servidor no arrancó')
+                    continue
+                url = f'http://127.0.0.1:{args.port}{args.path}'
+                # Calentar conexiones y la cache de serializadores
+                run_load(url, 2, 1.0)
+                for concurrency in levels:
+                    stop = threading.Event()
+                    slow = [threading.Thread(target=slow_client,
+                                             args=(args.port, args.path, args.slow_seconds, stop))
+                            for _ in range(args.slow_clients)]
+                    for thread in slow:
+                        thread.start()
+                    result = run_load(url, concurrency, args.duration)
+                    stop.set()
+                    for thread in slow:
+                        thread.join()
+                    if not result['requests']:
+                        print(f"{name:<9} {concurrency:>6} sin respuestas ({result['errors']} errores)")
+                        continue
+                    print(f"{name:<9} {concurrency:>6} {result['rps']:>9.1f} "
+                          f"{result['rps'] / args.workers:>10.1f} {result['p50_ms']:>8.1f} "
+                          f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>8}")
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark de GeoIP: carga de la base de rangos y coste por búsqueda
+
+Genera un CSV sintético de rangos IPv4 e IPv6 (como los de DB-IP o IP2Location),
+lo carga en los arrays ordenados de app.utils.geoip y mide el coste por IP
+sin cache (búsqueda binaria) y con cache (IPs repetidas, lo habitual en el
+tracker). Uso:
+
+    python benchmarks/bench_geoip.py --v4-ranges 300000 --v6-ranges 100000
+"""
+
+import argparse
+import ipaddress
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.geoip import GeoIPDatabase  # noqa: E402
+
+COUNTRIES = ['US', 'ES', 'MX', 'AR', 'CO', 'DE', 'FR', 'GB', 'BR', 'CL', 'PE', 'JP']
+
+
+def write_ranges(path, v4_ranges, v6_ranges, rng):
+    with open(path, 'w') as f:
+        f.write('ip_start,ip_end,country\n')
+        step = (2 ** 32) // v4_ranges
+        for index in range(v4_ranges):
+            start = index * step
+            f.write(f'{ipaddress.IPv4Address(start)},{ipaddress.IPv4Address(start + step - 1)},'
+                    f'{rng.choice(COUNTRIES)}\n')
+        base = int(ipaddress.IPv6Address('2000::'))
+        step = (2 ** 125) // v6_ranges
+        for index in range(v6_ranges):
+            start = base + index * step
+            f.write(f'{ipaddress.IPv6Address(start)},{ipaddress.IPv6Address(start + step - 1)},'
+                    f'{rng.choice(COUNTRIES)}\n')
+
+
+def per_lookup_ns(fn, addresses):
+    start = time.perf_counter()
+    for address in addresses:
+        fn(address)
+    return (time.perf_counter() - start) / len(addresses) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--v4-ranges', type=int, default=300000)
+    parser.add_argument('--v6-ranges', type=int, default=100000)
+    parser.add_argument('--lookups', type=int, default=200000)
+    parser.add_argument('--distinct-ips', type=int, default=5000,
+                        help='IPs distintas en la prueba con cache')
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    path = os.path.join(tempfile.mkdtemp(), 'geoip.csv')
+    write_ranges(path, args.v4_ranges, args.v6_ranges, rng)
+
+    database = GeoIPDatabase()
+    start = time.perf_counter()
+    database.load_csv(path)
+    load_s = time.perf_counter() - start
+    memory = sum(
+        column.itemsize * len(column) for column in (
+            database.v4_starts, database.v4_ends, database.v4_countries,
+            database.v6_starts_hi, database.v6_starts_lo, database.v6_ends_hi,
+            database.v6_ends_lo, database.v6_countries,
+        )
+    )
+    print(f'{len(database)} rangos cargados en {load_s:.2f}s ({memory / 1e6:.1f} MB en arrays)')
+
+    v4 = [str(ipaddress.IPv4Address(rng.getrandbits(32))) for _ in range(args.lookups)]
+    v6 = [str(ipaddress.IPv6Address(int(ipaddress.IPv6Address('2000::')) + rng.getrandbits(125)))
+          for _ in range(args.lookups)]
+    repeated = [rng.choice(v4[:args.distinct_ips]) for _ in range(args.lookups)]
+
+    print(f'IPv4 sin cache: {per_lookup_ns(database._lookup, v4):8.0f} ns/búsqueda')
+    print(f'IPv6 sin cache: {per_lookup_ns(database._lookup, v6):8.0f} ns/búsqueda')
+    database.lookup.cache_clear()
+    per_lookup_ns(database.lookup, repeated)
+    print(f'Con cache ({args.distinct_ips} IPs): {per_lookup_ns(database.lookup, repeated):8.0f} ns/búsqueda')
+
+
+if __name__ == '__main__':
+    main()
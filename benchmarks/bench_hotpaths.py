@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks de las funciones más usadas, con resultados en JSON
+
+Mide con fixtures generados a partir de una semilla (siempre los mismos datos):
+parse_user_agent, is_trackable_path, slugify, generate_unique_slug,
+optimize_image (imagen típica y peor caso), los serializadores de api_bp y
+get_analytics_summary con varios tamaños de page_view. Guarda los resultados
+en JSON y compara dos ejecuciones marcando las regresiones. Uso:
+
+    python benchmarks/bench_hotpaths.py --output base.json
+    python benchmarks/bench_hotpaths.py --pageviews 10000 --output nuevo.json --baseline base.json
+    python benchmarks/bench_hotpaths.py --compare base.json nuevo.json --threshold 10
+    python benchmarks/bench_hotpaths.py --only slug,summary --list
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_PAGEVIEWS = '10000,1000000,10000000'
+
+USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_5) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Safari/605.1.15',
+    'Mozilla/5.0 (X11; Linux x86_64; rv:127.0) Gecko/20100101 Firefox/127.0',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148',
+    'Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Mobile Safari/537.36',
+    'Mozilla/5.0 (iPad; CPU OS 17_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36 Edg/126.0',
+    'Opera/9.80 (Windows NT 6.1) Presto/2.12.388 Version/12.18',
+)
+
+PATHS = (
+    '/', '/blog', '/blog/{slug}', '/cursos', '/cursos/{slug}', '/proyectos/{slug}', '/contacto',
+    '/admin/dashboard', '/api/posts', '/static/css/style.css', '/static/js/main.js',
+    '/uploads/{slug}.jpg', '/favicon.ico', '/_debug',
+)
+
+WORDS = (
+    'Introducción', 'a', 'Python', 'análisis', 'de', 'datos', 'con', 'NumPy', '¿Qué', 'es',
+    'Flask?', 'automatización', 'y', 'machine', 'learning', 'guía', 'práctica', '2024',
+    'C++', '&', 'Rust', 'visión', 'por', 'computadora', '—', 'parte', 'II', '(avanzado)',
+)
+
+# Tamaños de imagen: típica (foto de cámara de móvil reducida) y peor caso (RGBA enorme)
+IMAGE_CASES = {
+    'typical': ((1600, 1067), 'JPEG', 'RGB'),
+    'worst': ((6000, 4000), 'PNG', 'RGBA'),
+}
+
+# Filas de page_view por sentencia al generar el fixture
+PAGEVIEW_CHUNK = 500000
+
+# Hash multiplicativo de Knuth: mismo valor para la misma fila y semilla, sin random() de SQLite
+PAGEVIEW_FIXTURE_SQL = """
+INSERT INTO page_view (ip_address, user_agent, page, referrer, country, device, browser, created_at)
+WITH RECURSIVE seq(n) AS (
+    SELECT :first UNION ALL SELECT n + 1 FROM seq WHERE n < :last
+), hashed AS (
+    SELECT n, ((n + :seed) * 2654435761) % 4294967296 AS h FROM seq
+)
+SELECT
+    '10.' || (h % 64) || '.' || ((h / 64) % 256) || '.' || ((h / 16384) % 250),
+    CASE h % 5 WHEN 0 THEN :ua0 WHEN 1 THEN :ua1 WHEN 2 THEN :ua2 WHEN 3 THEN :ua3 ELSE :ua4 END,
+    '/blog/post-' || ((h / 7) % 200),
+    CASE WHEN h % 3 = 0 THEN 'https://www.google.com/' ELSE '' END,
+    CASE (h / 11) % 6 WHEN 0 THEN 'ES' WHEN 1 THEN 'MX' WHEN 2 THEN 'AR' WHEN 3 THEN 'CO' WHEN 4 THEN 'US' ELSE NULL END,
+    CASE WHEN h % 10 < 6 THEN 'desktop' WHEN h % 10 < 9 THEN 'mobile' ELSE 'tablet' END,
+    CASE (h / 13) % 5 WHEN 0 THEN 'chrome' WHEN 1 THEN 'firefox' WHEN 2 THEN 'safari' WHEN 3 THEN 'edge' ELSE 'other' END,
+    strftime('%Y-%m-%d %H:%M:%f', :anchor, '-' || ((h / 3) % 7776000) || ' seconds')
+FROM hashed
+"""
+
+
+def measure(fn, repeat, min_time):
+    """Mediana y mínimo por llamada, calibrando las vueltas como `python -m timeit`"""
+    timer = timeit.Timer(fn)
+    loops = 1
+    while True:
+        elapsed = timer.timeit(loops)
+        if elapsed >= min_time:
+            break
+        loops *= 10
+    samples = [elapsed / loops] + [timer.timeit(loops) / loops for _ in range(repeat - 1)]
+    return {
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'loops': loops,
+        'repeat': repeat,
+    }
+
+
+def format_seconds(value):
+    for unit, scale in (('s', 1), ('ms', 1e3), ('µs', 1e6)):
+        if value * scale >= 1:
+            return f'{value * scale:.2f} {unit}'
+    return f'{value * 1e9:.0f} ns'
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_titles(rng, count):
+    return [' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))) for _ in range(count)]
+
+
+def make_image(rng, size, image_format, mode):
+    """Imagen con degradado y ruido: comprime como una foto, no como un color liso"""
+    from PIL import Image
+
+    width, height = size
+    noise = Image.effect_noise(size, 40 + rng.random() * 20)
+    gradient = Image.linear_gradient('L').resize(size)
+    bands = [Image.blend(noise, gradient, alpha) for alpha in (0.3, 0.5, 0.7)]
+    if mode == 'RGBA':
+        bands.append(gradient)
+    image = Image.merge(mode, bands)
+    output = io.BytesIO()
+    image.save(output, format=image_format)
+    return output.getvalue()
+
+
+def seed_content(db, rng, args):
+    from app.models.blog import BlogPost
+    from app.models.course import Course
+    from app.models.project import Project
+
+    now = datetime.utcnow()
+    titles = make_titles(rng, args.posts + args.courses + args.projects)
+    for index in range(args.posts):
+        db.session.add(BlogPost(
+            title=titles.pop(), slug=f'post-{index}', content='Contenido ' * rng.randint(50, 500),
+            summary='Resumen del post', published=True, created_at=now, updated_at=now
+        ))
+    for index in range(args.courses):
+        db.session.add(Course(
+            title=titles.pop(), slug=f'curso-{index}', description='Descripción del curso',
+            price=rng.choice((0, 19.99, 49.0)), duration=rng.randint(1, 40), level='Intermedio',
+            published=True, created_at=now, updated_at=now
+        ))
+    for index in range(args.projects):
+        db.session.add(Project(
+            title=titles.pop(), slug=f'proyecto-{index}', description='Descripción del proyecto',
+            category=rng.choice(('research', 'automation')), technologies='Python,Flask,NumPy',
+            github_url='https://github.com/ejemplo/proyecto', published=True, created_at=now, updated_at=now
+        ))
+    # Peor caso de generate_unique_slug: la base y base-1..base-N ya están usadas
+    for index in range(args.slug_collisions + 1):
+        slug = 'slug-repetido' if index == 0 else f'slug-repetido-{index}'
+        db.session.add(BlogPost(title='Slug repetido', slug=slug, content='x', published=False))
+    db.session.commit()
+
+
+def grow_pageviews(db, seed, first, last):
+    """Agregar las filas first..last del fixture de page_view (deterministas por semilla)"""
+    from sqlalchemy import text
+
+    anchor = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    agents = {f'ua{index}': USER_AGENTS[index] for index in range(5)}
+    for start in range(first, last + 1, PAGEVIEW_CHUNK):
+        stop = min(start + PAGEVIEW_CHUNK - 1, last)
+        db.session.execute(text(PAGEVIEW_FIXTURE_SQL),
+                           {'first': start, 'last': stop, 'seed': seed, 'anchor': anchor, **agents})
+        db.session.commit()
+
+
+def run_benchmarks(args):
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f'sqlite:///{tmp}/bench.db'
+    # Solo se miden las funciones; el tracker no debe escribir durante los serializadores
+    os.environ['ANALYTICS_TRACKER_ENABLED'] = 'false'
+
+    import wsgi
+    from app.cli import bootstrap_database
+    from app.extensions import db
+    from app.models.blog import BlogPost
+    from app.utils.analytics import get_analytics_summary, is_trackable_path, parse_user_agent
+    from app.utils.file_upload import optimize_image
+    from app.utils.slugs import generate_unique_slug, slugify
+    from app.blueprints import api
+
+    app = wsgi.app
+    rng = random.Random(args.seed)
+    only = [name for name in args.only.split(',') if name] if args.only else []
+    results = {}
+
+    def selected(name):
+        return not only or any(pattern in name for pattern in only)
+
+    def bench(name, fn, repeat=None):
+        if not selected(name):
+            return
+        if args.list:
+            print(name)
+            return
+        try:
+            result = measure(fn, repeat or args.repeat, args.min_time)
+        except Exception as e:
+            # Un caso que falla se guarda como error y no detiene el resto
+            result = {'error': f'{type(e).__name__}: {e}'}
+            print(f'{name:<40}ERROR {result["error"]}')
+        else:
+            print(f'{name:<40}{format_seconds(result["median"]):>12}{format_seconds(result["min"]):>12}'
+                  f'{result["loops"]:>10}')
+        results[name] = result
+
+    user_agents = [rng.choice(USER_AGENTS) for _ in range(1000)]
+    paths = [rng.choice(PATHS).format(slug=slugify(title)) for title in make_titles(rng, 1000)]
+    titles = make_titles(rng, 1000)
+
+    if not args.list:
+        print(f'{"caso":<40}{"mediana":>12}{"mínimo":>12}{"vueltas":>10}')
+
+    with app.app_context():
+        bootstrap_database()
+        seed_content(db, rng, args)
+
+        bench('parse_user_agent[x1000]', lambda: [parse_user_agent(agent) for agent in user_agents])
+
+        # Solo el filtro de rutas: un test_request_context por ruta costaría mucho más
+        bench('is_trackable_path[x1000]', lambda: [is_trackable_path(path) for path in paths])
+        bench('slugify[x1000]', lambda: [slugify(title) for title in titles])
+        bench('generate_unique_slug[free]', lambda: generate_unique_slug('slug-libre', BlogPost))
+        bench(f'generate_unique_slug[{args.slug_collisions}-collisions]',
+              lambda: generate_unique_slug('slug-repetido', BlogPost))
+
+        for label, (size, image_format, mode) in IMAGE_CASES.items():
+            name = f'optimize_image[{label}-{size[0]}x{size[1]}-{image_format.lower()}]'
+            if not selected(name) or args.list:
+                bench(name, None)
+                continue
+            data = make_image(rng, size, image_format, mode)
+            bench(name, lambda: optimize_image(io.BytesIO(data)))
+
+        for endpoint, view in (('posts', api.get_posts), ('courses', api.get_courses),
+                               ('projects', api.get_projects)):
+            def serialize(endpoint=endpoint, view=view):
+                with app.test_request_context(f'/api/{endpoint}'):
+                    return view()
+            bench(f'api.get_{endpoint}[{getattr(args, endpoint)}]', serialize)
+
+        def serialize_post():
+            with app.test_request_context('/api/posts/post-0'):
+                return api.get_post('post-0')
+
+        bench('api.get_post', serialize_post)
+
+        # Cada tamaño agrega filas al anterior; la fila n es la misma en todos los tamaños
+        loaded = 0
+        for size in sorted(args.pageviews):
+            name = f'get_analytics_summary[{size}]'
+            if selected(name) and not args.list:
+                start = time.perf_counter()
+                grow_pageviews(db, args.seed, loaded + 1, size)
+                loaded = size
+                print(f'  (page_view con {size} filas en {time.perf_counter() - start:.1f} s)')
+            bench(name, get_analytics_summary, repeat=args.heavy_repeat)
+
+    return {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'pageviews': sorted(args.pageviews),
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """Imprimir la diferencia de medianas; retorna los casos que empeoraron más del umbral"""
+    regressions = []
+    missing = 0
+    print(f'{"caso":<40}{"antes":>12}{"ahora":>12}{"cambio":>10}')
+    for name, before in baseline['results'].items():
+        after = current['results'].get(name)
+        if after is None:
+            # Ejecución parcial (--only, otros tamaños): no hay con qué comparar
+            missing += 1
+            continue
+        if 'error' in after or 'error' in before:
+            # Un caso que antes funcionaba y ahora falla también es una regresión
+            if 'error' in after and 'error' not in before:
+                regressions.append(name)
+            status = after.get('error', 'ya no falla')
+            print(f'{name:<40}{"-":>12}{"-":>12}{"":>10}  {status}')
+            continue
+        change = (after['median'] - before['median']) * 100 / before['median']
+        mark = ''
+        if change > threshold:
+            mark = '  REGRESIÓN'
+            regressions.append(name)
+        elif change < -threshold:
+            mark = '  mejora'
+        print(f'{name:<40}{format_seconds(before["median"]):>12}{format_seconds(after["median"]):>12}'
+              f'{change:>+9.1f}%{mark}')
+    new_cases = [name for name in current['results'] if name not in baseline['results']]
+    if missing or new_cases:
+        print(f'Sin comparar: {missing} casos solo en la base, {len(new_cases)} solo en la ejecución nueva')
+    print(f'Regresiones (> {threshold:g}%): {", ".join(regressions) if regressions else "ninguna"}')
+    return regressions
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--output', help='Archivo JSON donde guardar los resultados')
+    parser.add_argument('--baseline', help='JSON de una ejecución anterior con el que comparar')
+    parser.add_argument('--compare', nargs=2, metavar=('ANTES', 'AHORA'),
+                        help='Comparar dos JSON guardados sin ejecutar nada')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Porcentaje de empeoramiento de la mediana que cuenta como regresión')
+    parser.add_argument('--only', help='Ejecutar solo los casos que contienen alguno de estos textos (coma)')
+    parser.add_argument('--list', action='store_true', help='Listar los casos sin ejecutarlos')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--pageviews', type=lambda value: [int(size) for size in value.split(',')],
+                        default=DEFAULT_PAGEVIEWS, help=f'Tamaños de page_view (por defecto {DEFAULT_PAGEVIEWS})')
+    parser.add_argument('--posts', type=int, default=200)
+    parser.add_argument('--courses', type=int, default=50)
+    parser.add_argument('--projects', type=int, default=100)
+    parser.add_argument('--slug-collisions', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--heavy-repeat', type=int, default=3,
+                        help='Repeticiones de get_analytics_summary')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='Segundos mínimos por repetición al calibrar las vueltas')
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(load_results(args.compare[0]), load_results(args.compare[1]), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    current = run_benchmarks(args)
+    if args.list:
+        return
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2, ensure_ascii=False)
+        print(f'Resultados guardados en {args.output}')
+    if args.baseline:
+        print()
+        regressions = compare(load_results(args.baseline), current, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
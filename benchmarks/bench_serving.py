@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Comparación de rendimiento entre el servidor de desarrollo y gunicorn
+
+Levanta cada servidor con una base de datos SQLite temporal, lanza peticiones
+concurrentes con conexiones keep-alive y muestra peticiones por segundo y
+latencias. Uso:
+
+    python benchmarks/bench_serving.py --servers dev,gunicorn --concurrency 32
+    python benchmarks/bench_serving.py --url http://localhost/ --duration 30
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER_COMMANDS = {
+    'dev': [sys.executable, 'app.py'],
+    'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+}
+
+
+def wait_for_port(host, port, timeout=30):
+    """Espera a que el servidor acepte conexiones"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def worker(url, deadline, latencies, errors):
+    """Envía peticiones secuenciales reutilizando la conexión"""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers={'User-Agent': 'codexsoto-bench'})
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(response.status)
+            latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    conn.close()
+
+
+def run_load(url, concurrency, duration):
+    """Ejecuta la carga y devuelve las métricas agregadas"""
+    latencies = []
+    errors = []
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=worker, args=(url, deadline, latencies, errors))
+        for _ in range(concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    if not latencies:
+        return {'requests': 0, 'errors': len(errors), 'rps': 0.0}
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / elapsed,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+    }
+
+
+def start_server(name, port, database_url):
+    """Arranca el servidor indicado en segundo plano"""
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': database_url,
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'GUNICORN_ACCESS_LOG': '',
+        'PORT': str(port),
+        'FLASK_DEBUG': env.get('FLASK_DEBUG', '1'),
+        # Todas las peticiones salen de una IP: sin el filtro de bots se mide el tracker completo
+        'BOT_FILTER_ENABLED': env.get('BOT_FILTER_ENABLED', 'False'),
+    })
+    return subprocess.Popen(
+        SERVER_COMMANDS[name], cwd=ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def print_result(name, result):
+    if not result['requests']:
+        print(f"{name:<10} sin respuestas ({result['errors']} errores)")
+        return
+    print(
+        f"{name:<10} {result['rps']:>9.1f} req/s  "
+        f"media {result['mean_ms']:.1f} ms  p50 {result['p50_ms']:.1f} ms  "
+        f"p95 {result['p95_ms']:.1f} ms  p99 {result['p99_ms']:.1f} ms  "
+        f"errores {result['errors']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--servers', default='dev,gunicorn',
+                        help='Servidores a comparar (dev, gunicorn)')
+    parser.add_argument('--url', help='Medir un servidor ya levantado en lugar de arrancarlos')
+    parser.add_argument('--path', default='/', help='Ruta a solicitar')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=15.0)
+    args = parser.parse_args()
+
+    if args.url:
+        print_result('externo', run_load(args.url, args.concurrency, args.duration))
+        return
+
+    for name in args.servers.split(','):
+        name = name.strip()
+        with tempfile.TemporaryDirectory() as tmp:
+            database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            process = start_server(name, args.port, database_url)
+            try:
+                if not wait_for_port('127.0.0.1', args.port):
+                    print(f'{name}: el servidor no arrancó')
+                    continue
+                url = f'http://127.0.0.1:{args.port}{args.path}'
+                # Calentar plantillas y conexiones antes de medir
+                run_load(url, 2, 1.0)
+                print_result(name, run_load(url, args.concurrency, args.duration))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+
+if __name__ == '__main__':
+    main()
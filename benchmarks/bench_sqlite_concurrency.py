@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark de concurrencia en SQLite: lecturas mientras se registran páginas vistas
+
+Varios procesos escriben páginas vistas como lo hace el tracker (insert +
+actualización de estadísticas + commit) mientras otros procesos leen
+contenido. Se compara el journal por defecto (DELETE) con WAL usando las
+mismas opciones de motor que la aplicación. Uso:
+
+    python benchmarks/bench_sqlite_concurrency.py --writers 4 --readers 4 --duration 10
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+SCHEMA = [
+    'CREATE TABLE page_view (id INTEGER PRIMARY KEY, ip_address VARCHAR(45), '
+    'page VARCHAR(255), created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)',
+    'CREATE TABLE visitor_stats (id INTEGER PRIMARY KEY, page_views INTEGER)',
+    'CREATE TABLE blog_post (id INTEGER PRIMARY KEY, title VARCHAR(200), '
+    'content TEXT, published BOOLEAN)',
+]
+
+
+def make_engine(database_path, journal_mode):
+    """Crea el motor con las opciones y pragmas de la aplicación"""
+    os.environ['SQLITE_JOURNAL_MODE'] = journal_mode
+    from app.utils.database import build_engine_options  # registra los pragmas
+
+    uri = f'sqlite:///{database_path}'
+    return create_engine(uri, **build_engine_options(uri))
+
+
+def setup_database(database_path, journal_mode):
+    engine = make_engine(database_path, journal_mode)
+    with engine.begin() as conn:
+        for statement in SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(text('INSERT INTO visitor_stats (id, page_views) VALUES (1, 0)'))
+        conn.execute(
+            text('INSERT INTO blog_post (title, content, published) VALUES (:t, :c, 1)'),
+            [{'t': f'Post {i}', 'c': 'x' * 2000} for i in range(200)],
+        )
+    engine.dispose()
+
+
+def writer(database_path, journal_mode, deadline, results):
+    engine = make_engine(database_path, journal_mode)
+    rng = random.Random(os.getpid())
+    writes = 0
+    failures = 0
+    while time.time() < deadline:
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text('INSERT INTO page_view (ip_address, page) VALUES (:ip, :page)'),
+                    {'ip': f'10.0.0.{rng.randint(1, 250)}', 'page': f'/blog/{rng.randint(1, 200)}'},
+                )
+                conn.execute(text('UPDATE visitor_stats SET page_views = page_views + 1 WHERE id = 1'))
+                conn.execute(text('SELECT COUNT(DISTINCT ip_address) FROM page_view')).scalar()
+            writes += 1
+        except Exception:
+            failures += 1
+    results.put(('writer', writes, failures, []))
+
+
+def reader(database_path, journal_mode, deadline, results):
+    engine = make_engine(database_path, journal_mode)
+    rng = random.Random(os.getpid())
+    latencies = []
+    failures = 0
+    while time.time() < deadline:
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(
+                    text('SELECT id, title, content FROM blog_post WHERE published = 1 '
+                         'ORDER BY id DESC LIMIT 6 OFFSET :offset'),
+                    {'offset': rng.randint(0, 190)},
+                ).fetchall()
+            latencies.append(time.perf_counter() - start)
+        except Exception:
+            failures += 1
+    results.put(('reader', len(latencies), failures, latencies))
+
+
+def run(journal_mode, writers, readers, duration):
+    with tempfile.TemporaryDirectory() as tmp:
+        database_path = os.path.join(tmp, 'bench.db')
+        setup_database(database_path, journal_mode)
+
+        results = multiprocessing.Queue()
+        deadline = time.time() + duration
+        processes = [
+            multiprocessing.Process(target=writer, args=(database_path, journal_mode, deadline, results))
+            for _ in range(writers)
+        ] + [
+            multiprocessing.Process(target=reader, args=(database_path, journal_mode, deadline, results))
+            for _ in range(readers)
+        ]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    writes = sum(r[1] for r in collected if r[0] == 'writer')
+    write_failures = sum(r[2] for r in collected if r[0] == 'writer')
+    reads = sum(r[1] for r in collected if r[0] == 'reader')
+    read_failures = sum(r[2] for r in collected if r[0] == 'reader')
+    latencies = sorted(l for r in collected if r[0] == 'reader' for l in r[3])
+
+    def percentile(p):
+        if not latencies:
+            return float('nan')
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    print(
+        f'{journal_mode:<7} escrituras {writes / duration:8.1f}/s (fallos {write_failures})  '
+        f'lecturas {reads / duration:8.1f}/s (fallos {read_failures})  '
+        f'lectura p50 {percentile(0.50):.2f} ms  p99 {percentile(0.99):.2f} ms  '
+        f'máx {percentile(1.0):.2f} ms'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--modes', default='DELETE,WAL')
+    args = parser.parse_args()
+
+    for mode in args.modes.split(','):
+        run(mode.strip().upper(), args.writers, args.readers, args.duration)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque: tiempo de import y de create_app() en un proceso nuevo
+
+Cada repetición lanza un intérprete limpio (como un worker recién creado),
+mide el import de la aplicación y create_app(), y comprueba que el arranque
+no abre conexiones a la base de datos. Uso:
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --importtime 15
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r'''
+import json, sys, time
+start = time.perf_counter()
+import importlib.util
+spec = importlib.util.spec_from_file_location('codexsoto_app', 'app.py')
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+imported = time.perf_counter()
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+statements = []
+event.listen(Engine, 'before_cursor_execute',
+             lambda conn, cursor, statement, *args: statements.append(statement))
+
+app = module.create_app()
+created = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'total_ms': (created - start) * 1000,
+    'statements': len(statements),
+    'pil_loaded': 'PIL.Image' in sys.modules,
+}))
+'''
+
+
+def run_probe(env):
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def show_importtime(env, top):
+    """Muestra los módulos con mayor tiempo de import acumulado"""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line.split(':', 1)[1].split('|')]
+        rows.append((int(cumulative_us), int(self_us), name))
+    rows.sort(reverse=True)
+    print(f'\nMódulos con mayor tiempo de import acumulado (top {top}):')
+    for cumulative_us, self_us, name in rows[:top]:
+        print(f'  {cumulative_us / 1000:8.1f} ms  (propio {self_us / 1000:6.1f} ms)  {name}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--importtime', type=int, default=0, metavar='N',
+                        help='Mostrar los N imports más lentos')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_path = os.path.join(tmp, 'startup.db')
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{database_path}')
+
+        results = [run_probe(env) for _ in range(args.runs)]
+        for key in ('import_ms', 'create_app_ms', 'total_ms'):
+            values = [r[key] for r in results]
+            print(f'{key:<14} mediana {statistics.median(values):7.1f} ms  '
+                  f'mín {min(values):7.1f} ms  máx {max(values):7.1f} ms')
+
+        statements = max(r['statements'] for r in results)
+        print(f"sentencias SQL durante el arranque: {statements}")
+        print(f"base de datos creada: {'sí' if os.path.exists(database_path) else 'no'}")
+        print(f"PIL cargado: {'sí' if any(r['pil_loaded'] for r in results) else 'no'}")
+
+        if args.importtime:
+            show_importtime(env, args.importtime)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la serie temporal de analytics: buckets + NumPy frente a GROUP BY
+
+Llena una base SQLite temporal con buckets horarios (páginas x dispositivos x
+navegadores) y mide get_timeseries (arrays en memoria + bincount) contra un
+GROUP BY por hora/día/semana sobre page_view. También muestra el coste de la
+primera carga de los buckets en cada proceso. Uso:
+
+    python benchmarks/bench_timeseries.py --days 180 --pages 30
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEVICES = ('desktop', 'mobile', 'tablet')
+BROWSERS = ('chrome', 'firefox', 'safari', 'edge', 'other')
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--pages', type=int, default=30)
+    parser.add_argument('--raw-views', type=int, default=200000,
+                        help='Páginas vistas para la comparación con GROUP BY')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f'sqlite:///{tmp}/bench.db'
+
+    import wsgi
+    from sqlalchemy import func, insert
+    from app.cli import bootstrap_database
+    from app.extensions import db
+    from app.models.analytics import PageView, PageViewRollup
+    from app.utils.analytics import hour_bucket
+    from app.utils.timeseries import get_timeseries
+
+    app = wsgi.app
+    rng = random.Random(1)
+    end = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=args.days)
+
+    with app.app_context():
+        bootstrap_database()
+        first_hour = hour_bucket(start)
+        rows = [
+            {'hour': hour, 'page': f'/blog/post-{page}', 'device': device, 'browser': browser,
+             'views': rng.randint(1, 20)}
+            for hour in range(first_hour, first_hour + args.days * 24)
+            for page in range(args.pages)
+            for device in DEVICES
+            for browser in BROWSERS
+            if rng.random() < 0.1
+        ]
+        db.session.execute(insert(PageViewRollup), rows)
+
+        span = (end - start).total_seconds()
+        db.session.execute(insert(PageView), [
+            {'page': f'/blog/post-{rng.randrange(args.pages)}', 'device': rng.choice(DEVICES),
+             'browser': rng.choice(BROWSERS), 'ip_address': '127.0.0.1',
+             'created_at': start + timedelta(seconds=rng.random() * span)}
+            for _ in range(args.raw_views)
+        ])
+        db.session.commit()
+
+        cold_ms = timed(lambda: get_timeseries(start, end, 'day'), 1)
+        print(f'Buckets horarios: {len(rows)}  |  páginas vistas: {args.raw_views}')
+        print(f'Carga inicial de los buckets en memoria: {cold_ms:.1f} ms')
+        print(f'{"consulta":<34}{"numpy (ms)":>12}{"group by (ms)":>15}')
+
+        cases = [
+            ('diaria, todo el rango', 'day', {}),
+            ('semanal, todo el rango', 'week', {}),
+            ('por hora, todo el rango', 'hour', {}),
+            ('diaria, una página', 'day', {'page': '/blog/post-1'}),
+        ]
+        formats = {'hour': '%Y-%m-%d %H', 'day': '%Y-%m-%d', 'week': '%Y-%W'}
+        for label, granularity, filters in cases:
+            numpy_ms = timed(lambda: get_timeseries(start, end, granularity, **filters), args.runs)
+
+            def group_by():
+                bucket = func.strftime(formats[granularity], PageView.created_at)
+                query = db.session.query(bucket, func.count(PageView.id)).filter(
+                    PageView.created_at >= start, PageView.created_at < end)
+                for column, value in filters.items():
+                    query = query.filter(getattr(PageView, column) == value)
+                return query.group_by(bucket).all()
+
+            group_ms = timed(group_by, args.runs)
+            print(f'{label:<34}{numpy_ms:>12.1f}{group_ms:>15.1f}')
+
+
+if __name__ == '__main__':
+    main()
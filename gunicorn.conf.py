@@ -0,0 +1,122 @@
+"""
+Configuración de gunicorn para CodexSoto
+
+Gunicorn carga este archivo automáticamente desde el directorio de trabajo.
+Todos los valores se pueden ajustar con variables de entorno:
+
+    GUNICORN_BIND               Dirección de escucha (0.0.0.0:5000)
+    GUNICORN_WORKER_CLASS       sync, gthread o gevent (gthread)
+    GUNICORN_WORKERS            Número de workers (2 * CPUs + 1 para sync)
+    GUNICORN_THREADS            Hilos por worker con gthread (4)
+    GUNICORN_WORKER_CONNECTIONS Conexiones por worker con gevent (1000)
+    GUNICORN_MAX_REQUESTS       Reciclar el worker tras N peticiones (1000)
+    GUNICORN_MAX_REQUESTS_JITTER Variación aleatoria del reciclado (100)
+    GUNICORN_TIMEOUT            Segundos antes de matar un worker bloqueado (30)
+    GUNICORN_KEEPALIVE          Segundos de keep-alive (65, igual que nginx)
+    GUNICORN_ACCESS_LOG         Archivo del log de accesos, '-' para stdout, vacío para desactivarlo
+    PROMETHEUS_MULTIPROC_DIR    Directorio de las métricas compartidas entre workers
+                                (/tmp/codexsoto-metrics; solo con METRICS_ENABLED)
+"""
+
+import glob
+import multiprocessing
+import os
+import tempfile
+
+SUPPORTED_WORKER_CLASSES = ('sync', 'gthread', 'gevent')
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _resolve_worker_class():
+    """Obtiene el tipo de worker y recurre a gthread si gevent no está instalado"""
+    worker = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread').lower()
+    if worker not in SUPPORTED_WORKER_CLASSES:
+        raise ValueError(
+            f"GUNICORN_WORKER_CLASS debe ser uno de {', '.join(SUPPORTED_WORKER_CLASSES)}"
+        )
+
+    if worker == 'gevent':
+        try:
+            import gevent  # noqa: F401
+        except ImportError:
+            print('gevent no está instalado, usando workers gthread')
+            worker = 'gthread'
+
+    return worker
+
+
+def _default_workers(worker):
+    """Calcula los workers a partir de los CPUs disponibles"""
+    cpus = multiprocessing.cpu_count()
+    if worker == 'sync':
+        # Cada worker sync atiende una petición a la vez
+        return cpus * 2 + 1
+    # gthread y gevent atienden concurrencia dentro del proceso
+    return cpus + 1
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+worker_class = _resolve_worker_class()
+workers = _env_int('GUNICORN_WORKERS', _default_workers(worker_class))
+
+if worker_class == 'gthread':
+    threads = _env_int('GUNICORN_THREADS', 4)
+elif worker_class == 'gevent':
+    worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 1000)
+
+# Cargar la aplicación una sola vez en el master y compartirla con los workers
+preload_app = True
+
+# Reciclar workers periódicamente para acotar fugas de memoria; el jitter evita
+# que todos se reinicien a la vez
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+
+# Igual que keepalive_timeout en nginx.conf
+keepalive = _env_int('GUNICORN_KEEPALIVE', 65)
+
+# Nginx termina la conexión del cliente y reenvía las cabeceras de proxy
+forwarded_allow_ips = os.environ.get('GUNICORN_FORWARDED_ALLOW_IPS', '*')
+
+# Cadena vacía desactiva el log de accesos (nginx ya lo registra)
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+# Métricas de Prometheus: cada worker escribe sus valores en archivos de este
+# directorio y /metrics los suma. Tiene que existir antes del preload de la aplicación.
+if os.environ.get('METRICS_ENABLED', 'True').lower() in ('1', 'true', 'yes') and \
+        'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+    metrics_dir = os.path.join(tempfile.gettempdir(), 'codexsoto-metrics')
+    os.makedirs(metrics_dir, exist_ok=True)
+    # Los contadores empiezan de cero en cada arranque (un reload con HUP ya tiene la variable)
+    for path in glob.glob(os.path.join(metrics_dir, '*.db')):
+        os.remove(path)
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = metrics_dir
+
+
+def child_exit(server, worker):
+    """Marca como muerto al worker que termina para que sus gauges dejen de contar"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    """Descarta las conexiones heredadas del master tras el preload"""
+    from app.extensions import db
+
+    app = worker.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,18 @@
+"""
+Punto de entrada WSGI para servidores de producción (gunicorn)
+
+El paquete ``app/`` oculta al módulo ``app.py`` en los imports, así que la
+fábrica se carga directamente desde el archivo.
+"""
+
+import importlib.util
+import os
+
+_app_module_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+_spec = importlib.util.spec_from_file_location('codexsoto_app', _app_module_path)
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+
+create_app = _module.create_app
+
+app = create_app()